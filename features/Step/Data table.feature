@@ -28,3 +28,34 @@ Feature: Steps could have docstrings
       Then pytest outcome must contain tests with statuses:
         |passed|failed|
         |     1|     0|
+
+  Scenario: Data table columns
+    Data table is also available column by column as `step.table`, mapping column names to tuples of cell values;
+    it could be converted to NumPy structured array by `step.table.to_numpy()` or to pandas data frame by
+    `step.table.to_pandas()` if those libraries are installed.
+
+      Given File "Steps.feature" with content:
+        """gherkin
+        Feature:
+          Scenario:
+            Given I check step datatable columns
+              |first|second|
+              |    a|     b|
+              |    c|     d|
+
+        """
+      And File "conftest.py" with content:
+        """python
+        from pytest_bdd import given
+
+        @given('I check step datatable columns')
+        def _(step):
+          assert list(step.table) == ["first", "second"]
+          assert step.table["first"] == ("a", "c")
+          assert step.table["second"] == ("b", "d")
+          assert list(step.table.rows) == [("a", "b"), ("c", "d")]
+        """
+      When run pytest
+      Then pytest outcome must contain tests with statuses:
+        |passed|failed|
+        |     1|     0|
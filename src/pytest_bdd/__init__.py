@@ -2,7 +2,7 @@
 from pytest_bdd.packaging import get_distribution_version
 from pytest_bdd.scenario import FeaturePathType, scenario, scenarios
 from pytest_bdd.steps import given, step, then, when
-from pytest_bdd.warning_types import PytestBDDStepDefinitionWarning
+from pytest_bdd.warning_types import PytestBDDAmbiguousStepDefinitionWarning, PytestBDDStepDefinitionWarning
 
 __version__ = str(get_distribution_version("pytest-bdd-ng"))
 
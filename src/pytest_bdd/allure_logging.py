@@ -1,6 +1,4 @@
-import json
 import os
-from unittest.mock import patch
 
 import pytest
 from attr import asdict
@@ -10,6 +8,7 @@ from pydantic import BaseModel as PydanticBaseModel
 
 from pytest_bdd.compatibility.allure import ALLURE_INSTALLED
 from pytest_bdd.compatibility.pytest import PYTEST81
+from pytest_bdd.model import CompactPickle
 
 if ALLURE_INSTALLED:
     from allure_commons import hookimpl
@@ -23,6 +22,22 @@ else:
     hookimpl = HookimplMarker("allure")
 
 
+def _serialize_attrs_value(instance, field, value):
+    return value.model_dump(mode="json") if isinstance(value, PydanticBaseModel) else value
+
+
+def to_allure_value(value):
+    """JSON compatible representation of pydantic models, also nested into attrs classes, for allure results"""
+    if isinstance(value, CompactPickle):
+        value = value.to_message()
+    if isinstance(value, PydanticBaseModel):
+        return value.model_dump(mode="json")
+    try:
+        return asdict(value, recurse=True, value_serializer=_serialize_attrs_value)
+    except NotAnAttrsClassError:
+        return value
+
+
 class AllurePytestBDD:
     def __init__(self, allure_logger, allure_cache):
         self.allure_logger = allure_logger
@@ -47,34 +62,6 @@ class AllurePytestBDD:
             bdd_listener.pytest_plugin_name = pluginmanager.register(bdd_listener)
             return bdd_listener
 
-    @hookimpl(hookwrapper=True)
-    def report_result(self, result):
-        def patched_asdict(*args, recurse=True, value_serializer=None, **kwargs):
-            def patched_value_serializer(instance, field, value):
-                if isinstance(value, PydanticBaseModel):
-                    # Maybe possible to speedup; Some values are not serialized when used value.dict()
-                    return json.loads(value.model_dump_json())
-                elif value_serializer is not patched_value_serializer:
-                    return value_serializer(instance, field, value)
-                else:
-                    if recurse:
-                        try:
-                            return patched_asdict(
-                                value, *args[1:], recurse=True, value_serializer=patched_value_serializer, **kwargs
-                            )
-                        except NotAnAttrsClassError:
-                            return value
-                    else:
-                        return value
-
-            if value_serializer is None:
-                value_serializer = patched_value_serializer
-
-            return asdict(*args, value_serializer=patched_value_serializer, **kwargs)
-
-        with patch("allure_commons.logger.asdict", new=patched_asdict):
-            yield
-
     def unregister(self, config):
         pluginmanager = config.pluginmanager
         allure_accessible = pluginmanager.hasplugin("allure_pytest") and config.option.allure_report_dir
@@ -82,10 +69,21 @@ class AllurePytestBDD:
             allure_plugin_manager.unregister(name=self.allure_plugin_name)
             pluginmanager.unregister(name=self.pytest_plugin_name)
 
-    @pytest.hookimpl
-    def pytest_bdd_before_step_call(self, request, feature, scenario, step, step_func, step_func_args, step_definition):
-        """Called before step function is set up."""
-        step_definition.func = StepContext(f"{step.keyword} {step.text}", step_func_args)(step_func)
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_bdd_get_step_caller(self, request, feature, scenario, step, step_func, step_func_args, step_definition):
+        """Report step call as allure step; shared step definition is not modified"""
+        outcome = yield
+        step_caller = outcome.get_result()
+        if step_caller is None:
+            return
+        title = f"{step.keyword} {step.text}"
+
+        def allure_step_caller():
+            __tracebackhide__ = True
+            with StepContext(title, step_func_args):
+                return step_caller()
+
+        outcome.force_result(allure_step_caller)
 
     @pytest.hookimpl
     def pytest_bdd_before_scenario(self, request, feature, scenario):
@@ -130,7 +128,7 @@ class AllurePytestBDD:
     def get_params(node):
         if hasattr(node, "callspec"):
             params = node.callspec.params
-            return [Parameter(name=name, value=value) for name, value in params.items()]
+            return [Parameter(name=name, value=to_allure_value(value)) for name, value in params.items()]
 
     @staticmethod
     def get_name(node, scenario):
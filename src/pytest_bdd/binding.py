@@ -0,0 +1,138 @@
+"""Ahead-of-time binding of steps to step definitions.
+
+If enabled, steps of selected scenarios are bound to step definitions right after the collection, so scenarios are
+executed without steps matching. Step registries visible to items are resolved statically; every typed step text is
+matched once per step registries chain and definitions of fixtures used by matching (e.g. the parameter type
+registry) for the whole suite. Step arguments are still parsed at every execution, as parameter types could produce
+stateful objects. Steps which can't be bound are reported as collection errors, all at once.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+from attr import Factory, attrib, attrs
+
+from messages import Pickle, PickleStep  # type:ignore[attr-defined]
+from pytest_bdd.compatibility.pytest import Config, Item, Parser
+from pytest_bdd.const import SCENARIO_BATCH_MARK
+from pytest_bdd.model import Feature, StepType
+from pytest_bdd.runner import STEP_BINDINGS_ATTR, StaticFixtureRequest, StepBinding, build_static_step_registry
+from pytest_bdd.steps import StepHandler
+from pytest_bdd.utils import get_item_feature_pickle
+
+
+def add_options(parser: Parser) -> None:
+    """Add pytest-bdd options."""
+    group = parser.getgroup("bdd", "Steps binding")
+    group.addoption(
+        "--bdd-bind-steps",
+        action="store_true",
+        dest="bdd_bind_steps",
+        default=None,
+        help="Bind steps of selected scenarios to step definitions at collection time.",
+    )
+    parser.addini(
+        "bdd_bind_steps",
+        default=False,
+        type="bool",
+        help="Bind steps of selected scenarios to step definitions at collection time.",
+    )
+
+
+def configure(config: Config) -> None:
+    is_enabled = config.option.bdd_bind_steps
+    if is_enabled is None:
+        is_enabled = config.getini("bdd_bind_steps")
+    if is_enabled:
+        config.pluginmanager.register(StepBindingPlugin(config=config), name="pytest_bdd_step_binding")  # type: ignore[call-arg]
+
+
+def unconfigure(config: Config) -> None:
+    plugin = config.pluginmanager.getplugin("pytest_bdd_step_binding")
+    if plugin is not None:
+        config.pluginmanager.unregister(plugin)
+
+
+@attrs(eq=False)
+class StepBindingPlugin:
+    config: Config = attrib()
+    step_registries: Dict[Tuple[int, ...], Any] = attrib(default=Factory(dict), init=False)
+    # Step bindings (None for undefined steps) by step registries chain, step type and text; every binding is kept
+    # together with definitions of fixtures used to match the step, as they could be overridden for some items
+    matches: Dict[Tuple[Any, ...], List[Tuple[Dict[str, Any], Optional[StepBinding]]]] = attrib(
+        default=Factory(dict), init=False
+    )
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config: Config, items: List[Item]):
+        for item in items:
+            feature, pickle = get_item_feature_pickle(item)
+            if feature is None or pickle is None:
+                continue
+            batch_mark = item.get_closest_marker(SCENARIO_BATCH_MARK)
+            try:
+                undefined_step_errors = self.bind_item(
+                    item, feature, [pickle] if batch_mark is None else batch_mark.args[0]
+                )
+            except StaticFixtureRequest.FixtureNotResolvedError:
+                # Some fixtures required to match steps can't be resolved statically; steps are matched at execution
+                continue
+            if undefined_step_errors:
+                report = pytest.CollectReport(
+                    nodeid=item.nodeid,
+                    outcome="failed",
+                    longrepr="Steps can't be bound to step definitions:\n" + "\n".join(undefined_step_errors),
+                    result=[],
+                )
+                session.ihook.pytest_collectreport(report=report)
+
+    def bind_item(self, item: Item, feature: Feature, pickles: List[Pickle]) -> List[str]:
+        """Bind steps of item pickles to step definitions
+
+        :return: Errors of steps which are not bound
+        """
+        chain_key, step_registry = build_static_step_registry(item, self.step_registries)
+        request = StaticFixtureRequest(item=item, step_registry=step_registry)  # type: ignore[call-arg]
+        bindings: Dict[int, StepBinding] = {}
+        undefined_step_errors = []
+        for pickle in pickles:
+            previous_step = None
+            for step in pickle.steps:
+                # Steps of unknown type are matched in the context of the previous ones, so they are not cached
+                match_key = (chain_key, step.type, step.text)
+                is_cached, binding = self.get_cached_binding(request, match_key)
+                if not is_cached:
+                    binding = self.bind_step(request, feature, pickle, step, previous_step)
+                    if step.type is not StepType.unknown:
+                        self.matches.setdefault(match_key, []).append((dict(request.fixturedefs), binding))
+                if binding is None:
+                    undefined_step_errors.append(
+                        f'Step definition is not found: "{step.text}". '
+                        f"Line {feature._get_step_line_number(step)} "
+                        f'in scenario "{pickle.name}" '
+                        f'in the feature "{feature.uri}"'
+                    )
+                else:
+                    bindings[id(step)] = binding
+                previous_step = step
+        setattr(item, STEP_BINDINGS_ATTR, bindings)
+        return undefined_step_errors
+
+    def get_cached_binding(
+        self, request: StaticFixtureRequest, match_key: Tuple[Any, ...]
+    ) -> Tuple[bool, Optional[StepBinding]]:
+        """Binding made for another item which sees the same definitions of fixtures used for matching"""
+        for fixturedefs, binding in self.matches.get(match_key, ()):
+            if all(request.get_fixturedef(name) is fixturedef for name, fixturedef in fixturedefs.items()):
+                return True, binding
+        return False, None
+
+    def bind_step(
+        self, request, feature: Feature, pickle: Pickle, step: PickleStep, previous_step
+    ) -> Optional[StepBinding]:
+        try:
+            step_definition = self.config.hook.pytest_bdd_match_step_definition_to_step(
+                request=request, feature=feature, scenario=pickle, step=step, previous_step=previous_step
+            )
+        except StepHandler.Matcher.MatchNotFoundError:
+            return None
+        return StepBinding(step_definition=step_definition)  # type: ignore[call-arg]
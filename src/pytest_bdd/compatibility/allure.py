@@ -1,7 +1,4 @@
-try:
-    import allure_commons
-    import allure_pytest
-except ImportError:
-    ALLURE_INSTALLED = False
-else:
-    ALLURE_INSTALLED = True
+from importlib.util import find_spec
+
+# Allure packages are imported only if the allure plugin is active
+ALLURE_INSTALLED = find_spec("allure_commons") is not None and find_spec("allure_pytest") is not None
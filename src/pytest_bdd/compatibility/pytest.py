@@ -6,7 +6,7 @@ from __future__ import annotations
 import sys
 from operator import ge
 from pathlib import Path
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, Sequence, cast
 
 from _pytest.config import Config, PytestPluginManager
 from _pytest.config.argparsing import Parser
@@ -38,6 +38,7 @@ __all__ = [
     "FixtureLookupError",
     "FixtureRequest",
     "get_config_root_path",
+    "get_item_fixturedefs",
     "Mark",
     "MarkDecorator",
     "Metafunc",
@@ -46,6 +47,8 @@ __all__ = [
     "PytestPluginManager",
     "PYTEST6",
     "PYTEST7",
+    "setup_item_function_scope",
+    "teardown_item_function_scope",
     "RunResult",
     "Session",
     "TerminalReporter",
@@ -109,11 +112,13 @@ else:
 # endregion
 
 if TYPE_CHECKING:  # pragma: no cover
+    from _pytest.fixtures import FuncFixtureInfo
     from _pytest.nodes import Item as BaseItem
     from _pytest.pytester import RunResult
 
     class Item(BaseItem):
         _request: FixtureRequest
+        _fixtureinfo: FuncFixtureInfo
 
 else:
     from _pytest.nodes import Item
@@ -198,3 +203,43 @@ else:
 
 def get_metafunc_call_arg(call, arg):
     return call.params[arg] if PYTEST8 else call.funcargs[arg]
+
+
+def get_item_fixturedefs(item: Item, argname: str) -> Sequence[FixtureDef]:
+    """Definitions of the fixture visible to the item, overriding ones are the last"""
+    # Fixture manager API differs between pytest versions
+    fixturemanager: Any = item.session._fixturemanager
+    return fixturemanager.getfixturedefs(argname, item if PYTEST81 else item.nodeid) or ()
+
+
+def teardown_item_function_scope(item: Item) -> None:
+    """Teardown function scoped fixtures of the item, so they could be set up again for one more run of the item.
+
+    It's a full teardown of the item by pytest setup state internals; the item is left torn down even if some
+    finalizers fail
+    """
+    setupstate = item.session._setupstate  # type: ignore[attr-defined]
+    if isinstance(setupstate.stack, dict):
+        finalizers, _ = setupstate.stack.pop(item)
+        exceptions = []
+        while finalizers:
+            fin = finalizers.pop()
+            try:
+                fin()
+            except Exception as e:
+                exceptions.append(e)
+        if exceptions:
+            raise exceptions[0]
+    else:  # pragma: no cover
+        # pytest<7 keeps stack of nodes as a list and finalizers separately
+        setupstate._pop_and_teardown()
+
+
+def setup_item_function_scope(item: Item) -> None:
+    """Set up function scoped fixtures of the item torn down by `teardown_item_function_scope`"""
+    setupstate = item.session._setupstate  # type: ignore[attr-defined]
+    item._initrequest()  # type: ignore[attr-defined]
+    if isinstance(setupstate.stack, dict):
+        setupstate.setup(item)
+    else:  # pragma: no cover
+        setupstate.prepare(item)
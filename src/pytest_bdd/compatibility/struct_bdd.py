@@ -1,6 +1,4 @@
-try:
-    from pytest_bdd.struct_bdd.parser import StructBDDParser
-except ImportError:
-    STRUCT_BDD_INSTALLED = False
-else:
-    STRUCT_BDD_INSTALLED = True
+from importlib.util import find_spec
+
+# StructBDD models are imported on first use; document loaders import their backends lazily
+STRUCT_BDD_INSTALLED = find_spec("pydantic") is not None
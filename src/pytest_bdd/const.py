@@ -4,3 +4,6 @@ TAG_PREFIX = "@"
 
 PYTHON_REPLACE_REGEX = re.compile(r"\W")
 ALPHA_REGEX = re.compile(r"^\d+_*")
+
+SCENARIO_BATCH_MARK = "pytest_bdd_scenario_batch"
+SINGLE_ITEM_TAG = "single_item"
@@ -202,10 +202,12 @@ class LogBDDCucumberJSON:
 
         :param step: `StepHandler` step we get result for
         :param report: pytest `Report` object
-        :return: `dict` in form {"status": "<passed|failed|skipped>", ["error_message": "<error_message>"]}
+        :return: `dict` in form {"status": "<passed|failed|skipped|undefined>", ["error_message": "<error_message>"]}
         """
         result: Dict[str, Any] = {}
-        if report.passed or not step["failed"]:  # ignore setup/teardown
+        if "status" in step:  # e.g. undefined steps or steps skipped by the dry run
+            result = {"status": step["status"]}
+        elif report.passed or not step["failed"]:  # ignore setup/teardown
             result = {"status": "passed"}
         elif report.failed and step["failed"]:
             result = {"status": "failed", "error_message": str(report.longrepr) if error_message else ""}
@@ -235,7 +237,15 @@ class LogBDDCucumberJSON:
             # skip reporting for non-bdd tests
             return
 
-        if not scenario["steps"] or report.when != "call":
+        if report.when != "call":
+            return
+
+        # Several scenarios could be executed as a single item
+        for scenario in getattr(report, "scenarios", [scenario]):
+            self._log_scenario(scenario, report)
+
+    def _log_scenario(self, scenario: Dict[str, Any], report: TestReport) -> None:
+        if not scenario["steps"]:
             # skip if there isn't a result or scenario has no steps
             return
 
@@ -0,0 +1,69 @@
+"""Dry run of scenarios.
+
+Steps of selected scenarios are bound to step definitions, but neither step functions nor fixtures are called and
+items are not set up. Scenarios having undefined or ambiguous steps fail; such steps are reported with corresponding
+statuses to the messages stream and cucumber json report. Every typed step is matched once per step registries
+chain; dry run could be distributed by pytest-xdist as usual.
+"""
+from functools import partial
+from typing import Any, Callable, Dict, List, Literal, Tuple
+
+import pytest
+from attr import Factory, attrib, attrs
+
+from pytest_bdd.compatibility.pytest import CallInfo, Config, Item, Parser
+from pytest_bdd.utils import get_item_feature_pickle
+
+
+def add_options(parser: Parser) -> None:
+    """Add pytest-bdd options."""
+    group = parser.getgroup("bdd", "Dry run")
+    group.addoption(
+        "--bdd-dry-run",
+        action="store_true",
+        dest="bdd_dry_run",
+        default=False,
+        help="Bind steps of scenarios to step definitions without executing them; non-bdd tests are skipped.",
+    )
+
+
+def configure(config: Config) -> None:
+    if config.option.bdd_dry_run:
+        config.pluginmanager.register(DryRunPlugin(config=config), name="pytest_bdd_dry_run")  # type: ignore[call-arg]
+
+
+def unconfigure(config: Config) -> None:
+    plugin = config.pluginmanager.getplugin("pytest_bdd_dry_run")
+    if plugin is not None:
+        config.pluginmanager.unregister(plugin)
+
+
+@attrs(eq=False)
+class DryRunPlugin:
+    config: Config = attrib()
+    step_registries: Dict[Tuple[int, ...], Any] = attrib(default=Factory(dict), init=False)
+    matches: Dict[Tuple[Any, ...], Any] = attrib(default=Factory(dict), init=False)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_protocol(self, item: Item, nextitem):
+        feature, pickle = get_item_feature_pickle(item)
+        phases: List[Tuple[Literal["setup", "call", "teardown"], Callable[[], Any]]]
+        if feature is None or pickle is None:
+            phases = [("setup", partial(pytest.skip, "Non-bdd test is skipped by the dry run"))]
+        else:
+            runner = self.config.pluginmanager.getplugin("pytest_bdd_runner")
+            phases = [("setup", noop), ("call", partial(runner.dry_run, item, self.step_registries, self.matches))]
+        phases.append(("teardown", noop))
+
+        ihook = item.ihook
+        ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        for when, func in phases:
+            call = CallInfo.from_call(func, when=when, reraise=(pytest.exit.Exception, KeyboardInterrupt))
+            report = ihook.pytest_runtest_makereport(item=item, call=call)
+            ihook.pytest_runtest_logreport(report=report)
+        ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+        return True
+
+
+def noop():
+    ...
@@ -29,6 +29,14 @@ class StepDefinitionNotFoundError(Exception):
     """StepHandler definition not found."""
 
 
+class AmbiguousStepDefinitionError(Exception):
+    """Several step definitions are matching the step."""
+
+    def __init__(self, message, step_definitions):
+        super().__init__(message)
+        self.step_definitions = step_definitions
+
+
 class NoScenariosFound(Exception):
     """No scenarios found."""
 
@@ -41,3 +49,11 @@ class FeatureError(Exception):
     def __str__(self):
         """String representation."""
         return self.message.format(*self.args)
+
+
+class ScenarioBatchError(Exception):
+    """Several scenarios executed as a single item failed."""
+
+
+class DryRunError(Exception):
+    """Steps of scenarios could not be bound to step definitions during the dry run."""
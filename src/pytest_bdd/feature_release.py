@@ -0,0 +1,65 @@
+"""Release of per-feature state.
+
+Outstanding items are tracked per feature; once the last selected item of a feature has finished, gherkin document
+nodes, AST registry and pickles of the feature are dropped, so only the feature header sufficient for reporting
+stays alive till the end of the session. Under pytest-xdist every worker tracks items it has collected, so features
+are released by workers only if all their items are run by the same worker (e.g. ``--dist loadfile``).
+"""
+from typing import Dict
+
+import pytest
+from attr import Factory, attrib, attrs
+
+from pytest_bdd.compatibility.pytest import Config, Item, Parser
+from pytest_bdd.model import Feature
+from pytest_bdd.utils import get_item_feature_pickle
+
+
+def add_options(parser: Parser) -> None:
+    """Add pytest-bdd options."""
+    parser.addini(
+        "bdd_release_features",
+        default=True,
+        type="bool",
+        help="Release gherkin documents, AST registries and pickles of features once their last scenario has finished.",
+    )
+
+
+def configure(config: Config) -> None:
+    # Features are kept warm between runs of watch mode
+    if config.getini("bdd_release_features") and not config.option.bdd_watch:
+        config.pluginmanager.register(FeatureReleasePlugin(), name="pytest_bdd_feature_release")
+
+
+def unconfigure(config: Config) -> None:
+    plugin = config.pluginmanager.getplugin("pytest_bdd_feature_release")
+    if plugin is not None:
+        config.pluginmanager.unregister(plugin)
+
+
+@attrs(eq=False)
+class FeatureReleasePlugin:
+    features: Dict[int, Feature] = attrib(default=Factory(dict))
+    # Items which are not finished yet, by feature id
+    outstanding_items: Dict[int, int] = attrib(default=Factory(dict))
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_finish(self, session):
+        self.features.clear()
+        self.outstanding_items.clear()
+        for item in session.items:
+            feature, _ = get_item_feature_pickle(item)
+            if feature is not None:
+                self.features[id(feature)] = feature
+                self.outstanding_items[id(feature)] = self.outstanding_items.get(id(feature), 0) + 1
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: Item, nextitem):
+        yield
+        feature, _ = get_item_feature_pickle(item)
+        if feature is None or id(feature) not in self.outstanding_items:
+            return
+        self.outstanding_items[id(feature)] -= 1
+        if not self.outstanding_items[id(feature)]:
+            del self.outstanding_items[id(feature)]
+            self.features.pop(id(feature)).release()
@@ -0,0 +1,70 @@
+"""Session-level store of feature sources.
+
+Items reference features only; feature sources are kept by URI until they are emitted after the collection and then
+released, so feature texts aren't pinned in memory for the whole session. Sources of released local features are
+read again on demand; sources which can't be read again as they were (features loaded by URL, files in other encodings
+or converted by parsers) are kept.
+"""
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Union, cast
+
+from attr import Factory, attrib, attrs
+
+from messages import Source  # type:ignore[attr-defined]
+from pytest_bdd.compatibility.pytest import Config
+from pytest_bdd.utils import setdefaultattr
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pytest_bdd.model import Feature
+
+
+@attrs(eq=False)
+class FeatureSourceStore:
+    sources: Dict[str, Optional[Source]] = attrib(default=Factory(dict))
+    # Media types of released sources, by URI
+    released: Dict[str, Optional[str]] = attrib(default=Factory(dict))
+    # Feature filenames of stored sources, by URI
+    filenames: Dict[str, str] = attrib(default=Factory(dict))
+
+    def add(self, feature: "Feature", source: Optional[Source]) -> None:
+        if feature.uri not in self.released and feature.uri not in self.sources:
+            self.sources[feature.uri] = source
+            self.filenames[feature.uri] = feature.filename
+
+    def get(self, feature: "Feature") -> Optional[Source]:
+        """Get feature source; sources of released features are read again if they are local files"""
+        try:
+            return self.sources[feature.uri]
+        except KeyError:
+            pass
+        if feature.uri not in self.released:
+            return None
+        data = self._read(feature.filename)
+        if data is None:
+            return None
+        return Source(uri=feature.uri, data=data, media_type=self.released[feature.uri])  # type: ignore[call-arg]
+
+    def release(self) -> None:
+        """Release stored sources which could be read again from their feature files"""
+        kept_sources = {}
+        for uri, source in self.sources.items():
+            if source is not None and self._read(self.filenames[uri]) != source.data:
+                kept_sources[uri] = source
+            else:
+                self.released[uri] = None if source is None else source.media_type
+        self.sources = kept_sources
+        self.filenames.clear()
+
+    @staticmethod
+    def _read(filename: str) -> Optional[str]:
+        try:
+            return Path(filename).read_text(encoding="utf-8")
+        except (OSError, TypeError, ValueError):
+            return None
+
+
+def get_feature_source_store(config: Union[Config, object]) -> FeatureSourceStore:
+    return cast(
+        FeatureSourceStore,
+        setdefaultattr(config, "pytest_bdd_feature_source_store", value_factory=FeatureSourceStore),
+    )
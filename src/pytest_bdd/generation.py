@@ -1,20 +1,26 @@
-"""pytest-bdd missing test code generation."""
+"""pytest-bdd missing test code generation.
+
+Missing steps are found statically: step registries visible to the collected items are resolved from the step
+registry fixtures definitions, so items aren't set up; every unique step is matched once per registries chain.
+"""
 import argparse
 import os.path
-from itertools import chain, filterfalse, zip_longest
+from itertools import chain, zip_longest
 from operator import lt, methodcaller
 from pathlib import Path
-from typing import Iterable, Optional, Sequence, Tuple, Union, cast
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union, cast
 
 import py
-from mako.template import Template
 
 from messages import Pickle, PickleStep  # type:ignore[attr-defined]
 from pytest_bdd.compatibility.importlib.resources import as_file, files
+from pytest_bdd.compatibility.path import relpath
 from pytest_bdd.compatibility.pytest import Config, ExitCode, FixtureRequest, Item, Parser, Session, wrap_session
+from pytest_bdd.const import SCENARIO_BATCH_MARK
 from pytest_bdd.model import Feature, StepType
 from pytest_bdd.packaging import compare_distribution_version
 from pytest_bdd.parser import GherkinParser
+from pytest_bdd.runner import StaticFixtureRequest, build_static_step_registry
 from pytest_bdd.steps import StepHandler
 from pytest_bdd.utils import make_python_name
 
@@ -87,6 +93,8 @@ def generate_code(
     feature_pickle_steps: Sequence[Tuple[Tuple[Feature, Pickle], PickleStep]],
 ) -> str:
     """Generate test code for the given filenames."""
+    from mako.template import Template
+
     with as_file(files("pytest_bdd.template").joinpath("test.py.mak")) as path:
         template = Template(filename=str(path))
     code = template.render(
@@ -101,6 +109,87 @@ def generate_code(
     return cast(str, code)
 
 
+def match_missing_steps_statically(
+    item: Item,
+    feature: Feature,
+    pickles: Sequence[Pickle],
+    step_registries: Dict[Tuple[int, ...], Optional[StepHandler.Registry]],
+    matches: Dict[Tuple[Tuple[int, ...], Any, str], bool],
+) -> List[Tuple[Tuple[Feature, Pickle], PickleStep]]:
+    """Find steps of item pickles which are not matched to any step definition; fixtures are not set up"""
+    chain_key, step_registry = build_static_step_registry(item, step_registries)
+    request = StaticFixtureRequest(item=item, step_registry=step_registry)  # type: ignore[call-arg]
+    non_matched_feature_pickle_steps = []
+    for pickle in pickles:
+        previous_step = None
+        for step in pickle.steps:
+            # Steps of unknown type are matched in the context of the previous ones, so they are not cached
+            match_key = (chain_key, step.type, step.text)
+            is_matched = matches.get(match_key) if step.type is not StepType.unknown else None
+            if is_matched is None:
+                try:
+                    item.config.hook.pytest_bdd_match_step_definition_to_step(
+                        request=request, feature=feature, scenario=pickle, step=step, previous_step=previous_step
+                    )
+                except StepHandler.Matcher.MatchNotFoundError:
+                    is_matched = False
+                else:
+                    is_matched = True
+                if step.type is not StepType.unknown:
+                    matches[match_key] = is_matched
+            if not is_matched:
+                non_matched_feature_pickle_steps.append(((feature, pickle), step))
+            previous_step = step
+    return non_matched_feature_pickle_steps
+
+
+def match_missing_steps_with_setup(
+    item: Item, feature: Feature, pickles: Sequence[Pickle]
+) -> List[Tuple[Tuple[Feature, Pickle], PickleStep]]:
+    """Find steps of item pickles which are not matched to any step definition; item fixtures are set up"""
+    is_legacy_pytest = compare_distribution_version("pytest", "7.0", lt)
+
+    method_name = "prepare" if is_legacy_pytest else "setup"
+    methodcaller(method_name, item)(item.session._setupstate)
+
+    item_request: FixtureRequest = item._request
+    non_matched_feature_pickle_steps = []
+    try:
+        for pickle in pickles:
+            previous_step = None
+            for step in pickle.steps:
+                try:
+                    item_request.config.hook.pytest_bdd_match_step_definition_to_step(
+                        request=item_request, feature=feature, scenario=pickle, step=step, previous_step=previous_step
+                    )
+                except StepHandler.Matcher.MatchNotFoundError:
+                    non_matched_feature_pickle_steps.append(((feature, pickle), step))
+                finally:
+                    previous_step = step
+    finally:
+        item.session._setupstate.teardown_exact(*((item,) if is_legacy_pytest else ()), None)  # type: ignore[call-arg]
+    return non_matched_feature_pickle_steps
+
+
+def get_features_from_paths(config: Config, paths: Sequence[Path], known_features: Iterable[Feature]):
+    """Get features for given paths; already parsed features are reused"""
+    features_by_path = {Path(feature.filename).resolve(): feature for feature in known_features}
+    parser = GherkinParser()
+    features_base_dir = Path.cwd()
+    features: Dict[Path, Feature] = {}
+    for path in paths:
+        path = path if path.is_absolute() else features_base_dir / path
+        for file_path in map(Path, parser.glob(path)) if path.is_dir() else [path]:
+            resolved_file_path = file_path.resolve()
+            if resolved_file_path in features:
+                continue
+            feature = features_by_path.get(resolved_file_path)
+            if feature is None:
+                feature, _ = parser.parse(config, file_path, "file:" + relpath(str(file_path), str(features_base_dir)))
+            features[resolved_file_path] = feature
+    return sorted(features.values(), key=lambda feature: str(feature.name or feature.filename))
+
+
 def generate_and_print_missing_code(config: Config) -> Union[int, ExitCode]:
     """Wrap pytest session to show missing code."""
 
@@ -114,72 +203,59 @@ def generate_and_print_missing_code(config: Config) -> Union[int, ExitCode]:
             session.exitstatus = 100
             return
 
-        seen_feature_pickles_ids = set()
+        seen_feature_pickles_ids: Set[Tuple[Path, str]] = set()
+        collected_features: Dict[int, Feature] = {}
         non_matched_feature_pickle_steps = []
+        step_registries: Dict[Tuple[int, ...], Optional[StepHandler.Registry]] = {}
+        matches: Dict[Tuple[Tuple[int, ...], Any, str], bool] = {}
 
         for item in session.items:
-            is_legacy_pytest = compare_distribution_version("pytest", "7.0", lt)
-
-            method_name = "prepare" if is_legacy_pytest else "setup"
-            methodcaller(method_name, item)(item.session._setupstate)
-
             item = cast(Item, item)
-            item_request: FixtureRequest = item._request
-            pickle: Pickle = item_request.getfixturevalue("scenario")
-            feature: Feature = item_request.getfixturevalue("feature")
-
-            seen_feature_pickles_ids.add((feature.uri, pickle.name))
-
-            previous_step = None
-            for step in pickle.steps:
-                try:
-                    item_request.config.hook.pytest_bdd_match_step_definition_to_step(
-                        request=item_request, feature=feature, scenario=pickle, step=step, previous_step=previous_step
-                    )
-                except StepHandler.Matcher.MatchNotFoundError:
-                    non_matched_feature_pickle_steps.append(((feature, pickle), step))
-                finally:
-                    previous_step = step
-
-            item.session._setupstate.teardown_exact(  # type: ignore[call-arg]
-                *((item,) if is_legacy_pytest else ()), None
+            params = getattr(getattr(item, "callspec", None), "params", {})
+            feature: Optional[Feature] = params.get("feature")
+            pickle: Optional[Pickle] = params.get("scenario")
+            if feature is None or pickle is None:
+                continue
+            batch_mark = item.get_closest_marker(SCENARIO_BATCH_MARK)
+            pickles = [pickle] if batch_mark is None else batch_mark.args[0]
+
+            collected_features[id(feature)] = feature
+            seen_feature_pickles_ids.update(
+                (Path(feature.filename).resolve(), batch_pickle.name) for batch_pickle in pickles
             )
 
-        features = GherkinParser().get_from_paths(config, list(map(Path, config.option.features)))
+            try:
+                non_matched_feature_pickle_steps.extend(
+                    match_missing_steps_statically(item, feature, pickles, step_registries, matches)
+                )
+            except StaticFixtureRequest.FixtureNotResolvedError:
+                # Some fixtures required for the steps matching can't be resolved statically
+                non_matched_feature_pickle_steps.extend(match_missing_steps_with_setup(item, feature, pickles))
 
-        seen_features_uris = set()
-        for feature_uri, pickle_name in seen_feature_pickles_ids:
-            if feature_uri not in seen_features_uris:
-                seen_features_uris.add(feature_uri)
+        features = get_features_from_paths(config, list(map(Path, config.option.features)), collected_features.values())
 
-        non_seen_features = list(filterfalse(lambda feature: feature.uri in seen_features_uris, features))
+        seen_features_paths = {feature_path for feature_path, _ in seen_feature_pickles_ids}
 
-        non_seen_feature_pickles = list(
-            filter(
-                lambda feature_pickle: (feature_pickle[0].uri, feature_pickle[1].name) not in seen_feature_pickles_ids,
-                chain.from_iterable(map(lambda feature: zip_longest((), feature.pickles, fillvalue=feature), features)),
-            )
-        )
+        non_seen_features = [
+            feature for feature in features if Path(feature.filename).resolve() not in seen_features_paths
+        ]
 
-        unique_step_defs_ids = {(step.type, step.text) for _, step in non_matched_feature_pickle_steps}
-        unique_non_matched_feature_pickle_steps = list(
-            map(
-                lambda step_def_id: next(
-                    filter(
-                        lambda feature_pickle_step: (
-                            feature_pickle_step[1].type == step_def_id[0]
-                            and feature_pickle_step[1].text == step_def_id[1]
-                        ),
-                        non_matched_feature_pickle_steps,
-                    )
-                ),
-                unique_step_defs_ids,
-            )
-        )
+        non_seen_feature_pickles = [
+            (feature, pickle)
+            for feature in features
+            for pickle in feature.pickles
+            if (Path(feature.filename).resolve(), pickle.name) not in seen_feature_pickles_ids
+        ]
+
+        unique_non_matched_feature_pickle_steps_by_ids: Dict[Tuple[Any, str], Any] = {}
+        for feature_pickle_step in non_matched_feature_pickle_steps:
+            _, step = feature_pickle_step
+            unique_non_matched_feature_pickle_steps_by_ids.setdefault((step.type, step.text), feature_pickle_step)
+        unique_non_matched_feature_pickle_steps = list(unique_non_matched_feature_pickle_steps_by_ids.values())
 
         print_missing_code(
             non_seen_features,
-            non_seen_feature_pickles,  # type: ignore[arg-type]
+            non_seen_feature_pickles,
             non_matched_feature_pickle_steps,
             unique_non_matched_feature_pickle_steps,
         )
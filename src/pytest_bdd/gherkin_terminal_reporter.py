@@ -1,6 +1,19 @@
-from typing import Any
+"""Gherkin formatted terminal output.
 
-from pytest_bdd.compatibility.pytest import Config, Parser, TerminalReporter, TestReport
+Scenario reports (also ones transferred from xdist workers) are rendered as Gherkin by a plugin which coexists with
+the standard terminal reporter and other terminal plugins: only the verbose status line of scenario items is
+suppressed while the report is logged. Rendered scenarios are buffered and written grouped by features; under xdist
+writes are rate-limited, so output of parallel workers is not interleaved line by line.
+"""
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytest
+from attr import Factory, attrib, attrs
+
+from pytest_bdd.compatibility.pytest import Config, Parser, TestReport
+
+DISTRIBUTED_FLUSH_INTERVAL = 0.5
 
 
 def add_options(parser: Parser) -> None:
@@ -15,58 +28,109 @@ def add_options(parser: Parser) -> None:
 
 
 def configure(config: Config) -> None:
-    if config.option.gherkin_terminal_reporter:
-        # Get the standard terminal reporter plugin and replace it with our
-        current_reporter = config.pluginmanager.getplugin("terminalreporter")
-        if current_reporter.__class__ != TerminalReporter:
-            raise Exception(
-                "gherkin-terminal-reporter is not compatible with any other terminal reporter."
-                "You can use only one terminal reporter."
-                "Currently '{0}' is used."
-                "Please decide to use one by deactivating {0} or gherkin-terminal-reporter.".format(
-                    current_reporter.__class__
-                )
-            )
-        gherkin_reporter = GherkinTerminalReporter(config)
-        config.pluginmanager.unregister(current_reporter)
-        config.pluginmanager.register(gherkin_reporter, "terminalreporter")
-        if config.pluginmanager.getplugin("dsession"):
-            raise Exception("gherkin-terminal-reporter is not compatible with 'xdist' plugin.")
-
-
-class GherkinTerminalReporter(TerminalReporter):  # type: ignore
-    def __init__(self, config: Config) -> None:
-        super().__init__(config)
-
-    def pytest_runtest_logreport(self, report: TestReport) -> Any:
-        rep = report
-        res = self.config.hook.pytest_report_teststatus(report=rep, config=self.config)
-        cat, letter, word = res
+    # Workers of xdist transfer reports to the controller, which renders them
+    if not config.option.gherkin_terminal_reporter or hasattr(config, "workerinput"):
+        return
+    terminal_reporter = config.pluginmanager.getplugin("terminalreporter")
+    if terminal_reporter is None:
+        return
+    is_distributed = config.pluginmanager.getplugin("dsession") is not None
+    config.pluginmanager.register(
+        GherkinTerminalReporter(  # type: ignore[call-arg]
+            config=config,
+            terminal_reporter=terminal_reporter,
+            flush_interval=DISTRIBUTED_FLUSH_INTERVAL if is_distributed else 0,
+        ),
+        name="pytest_bdd_gherkin_terminal_reporter",
+    )
+
+
+def unconfigure(config: Config) -> None:
+    plugin = config.pluginmanager.getplugin("pytest_bdd_gherkin_terminal_reporter")
+    if plugin is not None:
+        config.pluginmanager.unregister(plugin)
 
+
+@attrs(eq=False)
+class GherkinTerminalReporter:
+    config: Config = attrib()
+    terminal_reporter: Any = attrib()
+    flush_interval: float = attrib(default=0)
+
+    # Rendered scenarios by feature filename, in order of arrival
+    buffer: Dict[str, List[str]] = attrib(default=Factory(dict), init=False)
+    feature_headers: Dict[str, str] = attrib(default=Factory(dict), init=False)
+    last_flush: float = attrib(default=Factory(time.monotonic), init=False)
+    last_feature: Optional[str] = attrib(default=None, init=False)
+    logged_report: Optional[TestReport] = attrib(default=None, init=False)
+    logged_status: Optional[Tuple[str, Dict[str, bool]]] = attrib(default=None, init=False)
+
+    @property
+    def verbosity(self) -> int:
+        return self.terminal_reporter.verbosity  # type: ignore[no-any-return]
+
+    @pytest.hookimpl(hookwrapper=True, tryfirst=True)
+    def pytest_runtest_logreport(self, report: TestReport):
+        if self.verbosity <= 0 or not hasattr(report, "scenario"):
+            yield
+            return
+        self.logged_report, self.logged_status = report, None
+        try:
+            yield
+        finally:
+            self.logged_report = None
+        if self.logged_status is not None:
+            self.add_report(report, *self.logged_status)
+            if time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_report_teststatus(self, report: TestReport, config: Config):
+        outcome = yield
+        if report is not self.logged_report:
+            return
+        category, letter, word = outcome.get_result()
         if not letter and not word:
             # probably passed setup/teardown
             return
-
         if isinstance(word, tuple):
             word, word_markup = word
+        elif report.passed:
+            word_markup = {"green": True}
+        elif report.failed:
+            word_markup = {"red": True}
         else:
-            if rep.passed:
-                word_markup = {"green": True}
-            elif rep.failed:
-                word_markup = {"red": True}
-            elif rep.skipped:
-                word_markup = {"yellow": True}
-        scenario_markup = word_markup
+            word_markup = {"yellow": True}
+        self.logged_status = word, word_markup
+        # Status line of the standard terminal reporter is replaced by the gherkin one
+        outcome.force_result((category, "", ""))
 
-        if self.verbosity <= 0 or not hasattr(report, "scenario"):
-            return super().pytest_runtest_logreport(report)
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self, session):
+        self.flush()
 
-        scenario = report.scenario
-        self.ensure_newline()
-        self._tw.write(f"Feature: {scenario['feature']['name']}\n", blue=True)
-        self._tw.write(f"    Scenario: {scenario['name']}", **scenario_markup)
+    def add_report(self, report: TestReport, word: str, word_markup: Dict[str, bool]) -> None:
+        feature = report.scenario["feature"]  # type: ignore[attr-defined]
+        feature_key = feature["filename"]
+        self.feature_headers.setdefault(feature_key, f"Feature: {feature['name']}")
+        rendered_scenarios = self.buffer.setdefault(feature_key, [])
+
+        # Several scenarios could be executed as a single item
+        scenarios = getattr(report, "scenarios", None)
+        if scenarios is None:
+            rendered_scenarios.append(self.render_scenario(report.scenario, word, word_markup))  # type: ignore[attr-defined]
+        else:
+            for scenario in scenarios:
+                if any(step["failed"] for step in scenario["steps"]):
+                    rendered_scenarios.append(self.render_scenario(scenario, "FAILED", {"red": True}))
+                else:
+                    rendered_scenarios.append(self.render_scenario(scenario, "PASSED", {"green": True}))
+
+    def render_scenario(self, scenario: Dict[str, Any], word: str, word_markup: Dict[str, bool]) -> str:
+        markup: Callable[..., str] = self.terminal_reporter._tw.markup
+        rendered = markup(f"    Scenario: {scenario['name']}", **word_markup)
         if self.verbosity > 1:
-            self._tw.write("\n")
+            rendered += "\n"
             has_already_failed = False
             for step in scenario["steps"]:
                 step_markup = {"red" if step["failed"] else "green": True}
@@ -75,6 +139,21 @@ class GherkinTerminalReporter(TerminalReporter):  # type: ignore
                     step_markup["bold"] = True
                     has_already_failed = True
                 step_status_text = "(FAILED)" if step["failed"] else "(PASSED)"
-                self._tw.write(f"        {step['keyword']} {step['name']} {step_status_text}\n", **step_markup)
-        self._tw.write(f"    {word}\n", **word_markup)
-        self.stats.setdefault(cat, []).append(rep)
+                rendered += markup(f"        {step['keyword']} {step['name']} {step_status_text}\n", **step_markup)
+        return rendered + markup(f"    {word}\n", **word_markup)
+
+    def flush(self) -> None:
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+        markup = self.terminal_reporter._tw.markup
+        output = ""
+        for feature_key, rendered_scenarios in self.buffer.items():
+            if feature_key != self.last_feature:
+                output += markup(f"{self.feature_headers[feature_key]}\n", blue=True)
+            output += "".join(rendered_scenarios)
+            self.last_feature = feature_key
+        self.buffer.clear()
+        self.terminal_reporter.ensure_newline()
+        self.terminal_reporter._tw.write(output)
+        self.terminal_reporter._tw.flush()
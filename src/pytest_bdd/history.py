@@ -0,0 +1,397 @@
+"""Scenario and step definition duration history.
+
+Durations and outcomes of executed scenarios (keyed by stable pickle identity) and of step definitions used by them
+are stored into a local SQLite database after every run with ``--bdd-history``. ``--bdd-perf-regressions`` compares
+durations of the current run with the rolling baseline (median over previous runs) and reports scenarios and step
+definitions which became slower by the given factor. ``DurationHistory`` could be used directly to query the store.
+"""
+import argparse
+import sqlite3
+import time
+from inspect import getfile, getsourcelines
+from pathlib import Path
+from statistics import mean, median
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import pytest
+from attr import Factory, attrib, attrs
+
+from pytest_bdd.compatibility.path import relpath
+from pytest_bdd.compatibility.pytest import (
+    CallInfo,
+    Config,
+    ExitCode,
+    Item,
+    Parser,
+    TerminalReporter,
+    TestReport,
+    get_config_root_path,
+)
+from pytest_bdd.utils import get_item_feature_pickle
+
+HISTORY_CACHE_DIR = "pytest_bdd"
+HISTORY_FILENAME = "history.sqlite3"
+# Baseline of less runs is too noisy to compare with
+MIN_BASELINE_RUNS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scenario_durations (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    scenario_key TEXT NOT NULL,
+    duration REAL NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scenario_durations_key ON scenario_durations (scenario_key, outcome, run_id);
+CREATE TABLE IF NOT EXISTS step_durations (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    scenario_key TEXT NOT NULL,
+    step_definition TEXT NOT NULL,
+    step_text TEXT NOT NULL,
+    duration REAL NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS step_durations_definition ON step_durations (step_definition, outcome, run_id);
+"""
+
+
+def positive_float(value: str) -> float:
+    try:
+        result = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value} is not a number")
+    if result <= 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number")
+    return result
+
+
+def add_options(parser: Parser) -> None:
+    """Add pytest-bdd options."""
+    group = parser.getgroup("bdd", "Duration history")
+    group.addoption(
+        "--bdd-history",
+        action="store",
+        dest="bdd_history_path",
+        metavar="path",
+        nargs="?",
+        const="",
+        default=None,
+        help="Store scenario and step definition durations into SQLite database at given path "
+        "(pytest cache directory by default).",
+    )
+    group.addoption(
+        "--bdd-perf-regressions",
+        action="store",
+        dest="bdd_perf_regressions",
+        nargs="?",
+        const="report",
+        default=None,
+        choices=["report", "fail"],
+        help="Report scenarios and step definitions slower than their baseline from the duration history; "
+        "'fail' additionally fails the run if any are found.",
+    )
+    group.addoption(
+        "--bdd-perf-factor",
+        action="store",
+        dest="bdd_perf_factor",
+        type=positive_float,
+        default=2.0,
+        help="Duration to baseline ratio considered as a performance regression (default: %(default)s).",
+    )
+    group.addoption(
+        "--bdd-perf-window",
+        action="store",
+        dest="bdd_perf_window",
+        type=int,
+        default=10,
+        help="Number of previous runs used to calculate the baseline (default: %(default)s).",
+    )
+    group.addoption(
+        "--bdd-perf-min-duration",
+        action="store",
+        dest="bdd_perf_min_duration",
+        type=float,
+        default=0.01,
+        help="Durations shorter than this number of seconds are not checked for regressions (default: %(default)s).",
+    )
+
+
+def configure(config: Config) -> None:
+    option = config.option
+    path = option.bdd_history_path
+    # Durations of the dry run are neither recorded nor compared
+    if path is None and option.bdd_perf_regressions is None or option.bdd_dry_run:
+        return
+    if not path:
+        cache = getattr(config, "cache", None)
+        if cache is None:
+            raise pytest.UsageError("--bdd-history requires a path if the cacheprovider plugin is disabled")
+        make_cache_dir = getattr(cache, "mkdir", None) or cache.makedir
+        path = None if hasattr(config, "workerinput") else Path(make_cache_dir(HISTORY_CACHE_DIR)) / HISTORY_FILENAME
+    config.pluginmanager.register(
+        DurationHistoryPlugin(config=config, path=path),  # type: ignore[call-arg]
+        name="pytest_bdd_history",
+    )
+
+
+def unconfigure(config: Config) -> None:
+    plugin = config.pluginmanager.getplugin("pytest_bdd_history")
+    if plugin is not None:
+        config.pluginmanager.unregister(plugin)
+
+
+@attrs(frozen=True)
+class Regression:
+    kind: str = attrib()
+    key: str = attrib()
+    duration: float = attrib()
+    baseline: float = attrib()
+
+    @property
+    def ratio(self) -> float:
+        return self.duration / self.baseline
+
+
+@attrs(eq=False)
+class DurationHistory:
+    """SQLite store of scenario and step definition durations.
+
+    Scenarios are stored as mappings with "key", "duration", "outcome" and "steps" items; every step is a mapping
+    with "step_definition" location, "text", "duration" and "outcome" items.
+    """
+
+    path: Union[str, Path] = attrib()
+    _connection: Optional[sqlite3.Connection] = attrib(default=None, init=False)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(str(self.path))
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> "DurationHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record_run(self, scenarios: Iterable[Dict[str, Any]], started: Optional[float] = None) -> int:
+        """Store durations of the run; identifier of the stored run is returned"""
+        with self.connection as connection:
+            run_id = connection.execute(
+                "INSERT INTO runs (started) VALUES (?)", (time.time() if started is None else started,)
+            ).lastrowid
+            for scenario in scenarios:
+                connection.execute(
+                    "INSERT INTO scenario_durations VALUES (?, ?, ?, ?)",
+                    (run_id, scenario["key"], scenario["duration"], scenario["outcome"]),
+                )
+                connection.executemany(
+                    "INSERT INTO step_durations VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            run_id,
+                            scenario["key"],
+                            step["step_definition"],
+                            step["text"],
+                            step["duration"],
+                            step["outcome"],
+                        )
+                        for step in scenario["steps"]
+                    ],
+                )
+        return int(run_id)  # type: ignore[arg-type]
+
+    def get_run_ids(self, limit: Optional[int] = None) -> List[int]:
+        """Identifiers of stored runs, the latest first"""
+        return [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT id FROM runs ORDER BY id DESC LIMIT ?", (-1 if limit is None else limit,)
+            )
+        ]
+
+    def get_scenario_durations(self, key: str, runs: int = 10, outcome: str = "passed") -> List[float]:
+        """Durations of the scenario in the latest runs where it had the given outcome, the latest first"""
+        return [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT duration FROM scenario_durations WHERE scenario_key = ? AND outcome = ? "
+                "ORDER BY run_id DESC LIMIT ?",
+                (key, outcome, runs),
+            )
+        ]
+
+    def get_step_definition_durations(self, location: str, runs: int = 10, outcome: str = "passed") -> List[float]:
+        """Mean durations of the step definition calls in the latest runs where it had the given outcome"""
+        return [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT AVG(duration) FROM step_durations WHERE step_definition = ? AND outcome = ? "
+                "GROUP BY run_id ORDER BY run_id DESC LIMIT ?",
+                (location, outcome, runs),
+            )
+        ]
+
+    def get_scenario_baseline(self, key: str, runs: int = 10) -> Optional[float]:
+        durations = self.get_scenario_durations(key, runs=runs)
+        return median(durations) if len(durations) >= min(runs, MIN_BASELINE_RUNS) else None
+
+    def get_step_definition_baseline(self, location: str, runs: int = 10) -> Optional[float]:
+        durations = self.get_step_definition_durations(location, runs=runs)
+        return median(durations) if len(durations) >= min(runs, MIN_BASELINE_RUNS) else None
+
+    def find_regressions(
+        self, scenarios: Sequence[Dict[str, Any]], factor: float = 2.0, runs: int = 10, min_duration: float = 0.0
+    ) -> List[Regression]:
+        """Passed scenarios and step definitions of not yet recorded run which are slower than their baseline"""
+        candidates: List[Tuple[str, str, float, Callable[..., Optional[float]]]] = []
+        step_definition_durations: Dict[str, List[float]] = {}
+        for scenario in scenarios:
+            if scenario["outcome"] != "passed":
+                continue
+            candidates.append(("scenario", scenario["key"], scenario["duration"], self.get_scenario_baseline))
+            for step in scenario["steps"]:
+                if step["outcome"] == "passed":
+                    step_definition_durations.setdefault(step["step_definition"], []).append(step["duration"])
+        candidates.extend(
+            ("step definition", location, mean(durations), self.get_step_definition_baseline)
+            for location, durations in step_definition_durations.items()
+        )
+
+        regressions = []
+        for kind, key, duration, get_baseline in candidates:
+            if duration < min_duration:
+                continue
+            baseline = get_baseline(key, runs=runs)
+            if baseline is not None and duration > baseline * factor:
+                regressions.append(
+                    Regression(kind=kind, key=key, duration=duration, baseline=baseline)  # type: ignore[call-arg]
+                )
+        return sorted(regressions, key=lambda regression: -regression.ratio)
+
+
+@attrs(eq=False)
+class DurationHistoryPlugin:
+    config: Config = attrib()
+    path: Optional[Union[str, Path]] = attrib()
+    scenarios: List[Dict[str, Any]] = attrib(default=Factory(list), init=False)
+    regressions: List[Regression] = attrib(default=Factory(list), init=False)
+
+    current_scenarios: List[Dict[str, Any]] = attrib(default=Factory(list), init=False)
+    current_step: Optional[Dict[str, Any]] = attrib(default=None, init=False)
+    step_definition_location_cache: Dict[int, str] = attrib(default=Factory(dict), init=False)
+
+    @property
+    def is_controller(self):
+        return not hasattr(self.config, "workerinput")
+
+    def get_step_definition_location(self, step_definition) -> str:
+        try:
+            return self.step_definition_location_cache[id(step_definition)]
+        except KeyError:
+            func = step_definition.func
+            filename = relpath(getfile(func), str(get_config_root_path(self.config)))
+            location = f"{filename}:{getsourcelines(func)[1]}"
+            self.step_definition_location_cache[id(step_definition)] = location
+            return location
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item: Item):
+        self.current_scenarios = []
+        self.current_step = None
+
+    def pytest_bdd_before_scenario(self, request, feature, scenario):
+        self.current_scenarios.append(
+            {
+                "key": feature.build_pickle_key(scenario),
+                "duration": time.perf_counter(),
+                "outcome": "passed",
+                "steps": [],
+            }
+        )
+
+    def pytest_bdd_after_scenario(self, request, feature, scenario):
+        if self.current_scenarios:
+            current_scenario = self.current_scenarios[-1]
+            current_scenario["duration"] = time.perf_counter() - current_scenario["duration"]
+
+    def pytest_bdd_before_step_call(self, request, feature, scenario, step, step_func, step_func_args, step_definition):
+        self.current_step = {
+            "step_definition": self.get_step_definition_location(step_definition),
+            "text": step.text,
+            "duration": time.perf_counter(),
+            "outcome": "passed",
+        }
+
+    def pytest_bdd_after_step(self, request, feature, scenario, step, step_func, step_func_args, step_definition):
+        self.finalize_step(outcome="passed")
+
+    def pytest_bdd_step_error(self, request, feature, scenario, step, step_func, step_func_args, exception):
+        self.finalize_step(outcome="failed")
+
+    def pytest_bdd_step_func_lookup_error(self, request, feature, scenario, step, exception):
+        if self.current_scenarios:
+            self.current_scenarios[-1]["outcome"] = "failed"
+
+    def finalize_step(self, outcome: str):
+        if self.current_step is None or not self.current_scenarios:
+            return
+        current_step, self.current_step = self.current_step, None
+        current_step["duration"] = time.perf_counter() - current_step["duration"]
+        current_step["outcome"] = outcome
+        current_scenario = self.current_scenarios[-1]
+        current_scenario["steps"].append(current_step)
+        if outcome != "passed":
+            current_scenario["outcome"] = outcome
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: Item, call: CallInfo):
+        outcome = yield
+        if call.when != "call" or not self.current_scenarios:
+            return
+        feature, pickle = get_item_feature_pickle(item)
+        if feature is None or pickle is None:
+            return
+        # Transferred to the controller under xdist to be stored there
+        outcome.get_result().bdd_history = self.current_scenarios
+        self.current_scenarios = []
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        if self.is_controller:
+            self.scenarios.extend(getattr(report, "bdd_history", ()))
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        if not self.is_controller or self.path is None or not self.scenarios:
+            return
+        option = self.config.option
+        with DurationHistory(self.path) as history:  # type: ignore[call-arg]
+            if option.bdd_perf_regressions is not None:
+                self.regressions = history.find_regressions(
+                    self.scenarios,
+                    factor=option.bdd_perf_factor,
+                    runs=option.bdd_perf_window,
+                    min_duration=option.bdd_perf_min_duration,
+                )
+            history.record_run(self.scenarios)
+        if self.regressions and option.bdd_perf_regressions == "fail" and session.exitstatus == ExitCode.OK:
+            session.exitstatus = ExitCode.TESTS_FAILED
+
+    def pytest_terminal_summary(self, terminalreporter: TerminalReporter) -> None:
+        if self.config.option.bdd_perf_regressions is None or not self.is_controller:
+            return
+        terminalreporter.write_sep("=", f"bdd performance regressions: {len(self.regressions)}")
+        for regression in self.regressions:
+            terminalreporter.write_line(
+                f"{regression.kind} {regression.key}: {regression.duration:.3f}s "
+                f"is {regression.ratio:.1f}x slower than baseline {regression.baseline:.3f}s"
+            )
@@ -1,4 +1,5 @@
 from io import BufferedIOBase, TextIOBase
+from os import PathLike
 from pathlib import Path
 from typing import Any, Iterable, Optional, Union
 
@@ -92,9 +93,13 @@ def pytest_bdd_get_mimetype(config: Config, path: Path):
     """Get parser for specific file path"""
 
 
+def pytest_bdd_get_feature_file_suffixes(config: Config):
+    """Get suffixes of feature files which mimetypes are detected by `pytest_bdd_get_mimetype` hook"""
+
+
 def pytest_bdd_attach(
     request: FixtureRequest,
-    attachment: Union[str, bytes, bytearray, BufferedIOBase, TextIOBase, Any],
+    attachment: Union[str, bytes, bytearray, BufferedIOBase, TextIOBase, PathLike, Any],
     media_type: Optional[str],
     file_name: Optional[str],
 ):
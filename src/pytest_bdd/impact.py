@@ -0,0 +1,226 @@
+"""Change-based scenario selection.
+
+After every run an impact map is stored into the pytest cache: for every executed scenario it keeps the hash of its
+feature source and source locations and hashes of step definitions used by it. ``--bdd-affected`` selects only
+scenarios which are new, failed previously, or whose feature or used step definitions were changed since.
+"""
+import linecache
+from hashlib import sha1
+from inspect import getblock, getfile, getsourcelines
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, cast
+
+import pytest
+from attr import Factory, attrib, attrs
+
+from pytest_bdd.compatibility.path import relpath
+from pytest_bdd.compatibility.pytest import CallInfo, Config, Item, Parser, TestReport, get_config_root_path
+from pytest_bdd.feature_sources import get_feature_source_store
+from pytest_bdd.model import Feature
+from pytest_bdd.utils import get_item_feature_pickles
+
+IMPACT_MAP_CACHE_KEY = "pytest_bdd/impact_map"
+
+
+def add_options(parser: Parser) -> None:
+    """Add pytest-bdd options."""
+    group = parser.getgroup("bdd", "Impact")
+    group.addoption(
+        "--bdd-affected",
+        action="store_true",
+        dest="bdd_affected",
+        default=False,
+        help="Run only new, previously failed scenarios and scenarios affected by feature or step definition changes.",
+    )
+
+
+def configure(config: Config) -> None:
+    # Impact map is stored in the pytest cache, so it is not available if cacheprovider is disabled
+    if getattr(config, "cache", None) is not None:
+        config.pluginmanager.register(ImpactMapPlugin(config=config), name="pytest_bdd_impact_map")  # type: ignore[call-arg]
+
+
+def unconfigure(config: Config) -> None:
+    plugin = config.pluginmanager.getplugin("pytest_bdd_impact_map")
+    if plugin is not None:
+        config.pluginmanager.unregister(plugin)
+
+
+def hash_text(text: str) -> str:
+    return sha1(text.encode("utf-8")).hexdigest()
+
+
+def get_source_block_hash(filename: str, line: int) -> Optional[str]:
+    """Hash of the code block (e.g. decorated function) starting at the given line of the file"""
+    linecache.checkcache(filename)
+    lines = linecache.getlines(filename)
+    if not 0 < line <= len(lines):
+        return None
+    return hash_text("".join(getblock(lines[line - 1 :])))
+
+
+def get_item_feature_hash(item: Item) -> Optional[str]:
+    params = getattr(getattr(item, "callspec", None), "params", {})
+    feature = params.get("feature")
+    feature_data = (
+        None if feature is None else getattr(get_feature_source_store(item.config).get(feature), "data", None)
+    )
+    if feature_data is None:
+        if feature is None:
+            return None
+        try:
+            feature_data = Path(feature.filename).read_text(encoding="utf-8")
+        except (TypeError, OSError):
+            return None
+    return hash_text(feature_data)
+
+
+@attrs(eq=False)
+class ImpactMapPlugin:
+    config: Config = attrib()
+    scenarios: Dict[str, Dict[str, Any]] = attrib(default=Factory(dict), init=False)
+    step_definitions: Dict[str, Optional[str]] = attrib(default=Factory(dict), init=False)
+    failed_scenarios: Set[str] = attrib(default=Factory(set), init=False)
+
+    # Step definitions used by scenarios of the current item, by ids of scenarios; items could run batches of them
+    scenario_step_definitions: Dict[int, Dict[int, Any]] = attrib(default=Factory(dict), init=False)
+    current_step_definitions: Dict[int, Any] = attrib(default=Factory(dict), init=False)
+    step_definition_source_cache: Dict[int, Tuple[str, Optional[str]]] = attrib(default=Factory(dict), init=False)
+    feature_hash_cache: Dict[str, Optional[str]] = attrib(default=Factory(dict), init=False)
+
+    @property
+    def is_controller(self):
+        return not hasattr(self.config, "workerinput")
+
+    def get_step_definition_source(self, step_definition) -> Tuple[str, Optional[str]]:
+        """Source location and hash of step definition function; location is relative to the rootdir"""
+        try:
+            return self.step_definition_source_cache[id(step_definition)]
+        except KeyError:
+            func = step_definition.func
+            filename = getfile(func)
+            line = getsourcelines(func)[1]
+            location = f"{relpath(filename, str(get_config_root_path(self.config)))}:{line}"
+            source = self.step_definition_source_cache[id(step_definition)] = (
+                location,
+                get_source_block_hash(filename, line),
+            )
+            return source
+
+    def get_feature_hash(self, item: Item, feature: Feature) -> Optional[str]:
+        try:
+            return self.feature_hash_cache[feature.uri]
+        except KeyError:
+            feature_hash = self.feature_hash_cache[feature.uri] = get_item_feature_hash(item)
+            return feature_hash
+
+    def is_affected(self, item: Item, impact_map: Dict[str, Any]) -> bool:
+        feature, pickles = get_item_feature_pickles(item)
+        if feature is None:
+            return True
+        return any(self.is_scenario_affected(item, feature, pickle, impact_map) for pickle in pickles)
+
+    def is_scenario_affected(self, item: Item, feature: Feature, pickle, impact_map: Dict[str, Any]) -> bool:
+        scenario_impact = impact_map["scenarios"].get(feature.build_pickle_key(pickle))
+        if scenario_impact is None or scenario_impact.get("failed", True):
+            return True
+        if scenario_impact.get("feature_hash") != self.get_feature_hash(item, feature):
+            return True
+        return any(
+            self.is_step_definition_changed(location, impact_map["step_definitions"].get(location))
+            for location in scenario_impact.get("step_definitions", ())
+        )
+
+    def is_step_definition_changed(self, location: str, recorded_hash: Optional[str]) -> bool:
+        filename, _, line = location.rpartition(":")
+        path = Path(filename)
+        if not path.is_absolute():
+            path = get_config_root_path(self.config) / path
+        return recorded_hash is None or get_source_block_hash(str(path), int(line)) != recorded_hash
+
+    def load_impact_map(self) -> Dict[str, Any]:
+        impact_map = cast(Dict[str, Any], self.config.cache.get(IMPACT_MAP_CACHE_KEY, None) or {})  # type: ignore[attr-defined]
+        impact_map.setdefault("scenarios", {})
+        impact_map.setdefault("step_definitions", {})
+        return impact_map
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config: Config, items):
+        if not config.option.bdd_affected:
+            return
+        impact_map = self.load_impact_map()
+        if not impact_map["scenarios"]:
+            return
+
+        selected: List[Item] = []
+        deselected: List[Item] = []
+        for item in items:
+            (selected if self.is_affected(item, impact_map) else deselected).append(item)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+    def pytest_report_collectionfinish(self, config: Config, items):
+        if config.option.bdd_affected:
+            return f"bdd affected: {len(items)} items selected by impact map"
+
+    def pytest_bdd_before_scenario(self, request, feature, scenario):
+        self.current_step_definitions = self.scenario_step_definitions[id(scenario)] = {}
+
+    def pytest_bdd_before_step_call(self, request, feature, scenario, step, step_func, step_func_args, step_definition):
+        self.current_step_definitions[id(step_definition)] = step_definition
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: Item, call: CallInfo):
+        outcome = yield
+        # Steps of the dry run are not called, so the impact map is left as is
+        if self.config.option.bdd_dry_run:
+            return
+        feature, pickles = get_item_feature_pickles(item)
+        if feature is None:
+            return
+        report = outcome.get_result()
+        report.bdd_scenario_keys = [feature.build_pickle_key(pickle) for pickle in pickles]
+        if call.when == "call":
+            feature_hash = self.get_feature_hash(item, feature)
+            # Transferred to the controller under xdist to be stored there
+            report.bdd_impact = {
+                key: {
+                    "feature_hash": feature_hash,
+                    "step_definitions": dict(
+                        map(
+                            self.get_step_definition_source,
+                            self.scenario_step_definitions.get(id(pickle), {}).values(),
+                        )
+                    ),
+                }
+                for key, pickle in zip(report.bdd_scenario_keys, pickles)
+            }
+            self.scenario_step_definitions = {}
+            self.current_step_definitions = {}
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        if not self.is_controller:
+            return
+        impacts = getattr(report, "bdd_impact", None) or {}
+        for key in getattr(report, "bdd_scenario_keys", ()):
+            impact = impacts.get(key)
+            if impact is not None:
+                self.step_definitions.update(impact["step_definitions"])
+                self.scenarios[key] = {
+                    "feature_hash": impact["feature_hash"],
+                    "step_definitions": sorted(impact["step_definitions"].keys()),
+                }
+            if report.failed:
+                self.failed_scenarios.add(key)
+
+    def pytest_sessionfinish(self, session):
+        if not self.is_controller or not (self.scenarios or self.failed_scenarios):
+            return
+        impact_map = self.load_impact_map()
+        impact_map["step_definitions"].update(self.step_definitions)
+        for key, scenario_impact in self.scenarios.items():
+            impact_map["scenarios"][key] = {**scenario_impact, "failed": key in self.failed_scenarios}
+        for key in self.failed_scenarios.difference(self.scenarios.keys()):
+            impact_map["scenarios"][key] = {"failed": True}
+        self.config.cache.set(IMPACT_MAP_CACHE_KEY, impact_map)  # type: ignore[attr-defined]
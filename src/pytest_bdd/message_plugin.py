@@ -1,24 +1,24 @@
-import json
 import logging
+import mimetypes
 import os
 import sys
 from base64 import b64encode
+from functools import partial
 from inspect import getfile, getsourcelines
 from io import BufferedIOBase, TextIOBase
+from itertools import chain
 from pathlib import Path
 from platform import machine, processor, system, version
 from pprint import pformat
 from queue import Empty, Queue
 from threading import Event, Thread
 from time import sleep, time_ns
-from typing import Callable, Set, Union, cast
+from typing import Callable, List, Optional, Set, cast
 
-from attr import attrib, attrs
-from ci_environment import detect_ci_environment
+from attr import Factory, attrib, attrs
 from cucumber_expressions.parameter_type_registry import ParameterTypeRegistry
-from filelock import FileLock
 from pydantic import ValidationError
-from pytest import ExitCode, Session, hookimpl
+from pytest import ExitCode, Session, UsageError, hookimpl
 
 from messages import Attachment, Ci, ContentEncoding, Duration  # type:ignore[attr-defined]
 from messages import Envelope as Message  # type:ignore[attr-defined]
@@ -28,7 +28,6 @@ from messages import (  # type:ignore[attr-defined]
     Meta,
     ParameterType,
     Product,
-    Source,
     SourceReference,
     Status,
     TestCase,
@@ -45,16 +44,30 @@ from messages import (  # type:ignore[attr-defined]
 from pytest_bdd.compatibility.path import relpath
 from pytest_bdd.compatibility.pytest import (
     Config,
-    FixtureDef,
     FixtureRequest,
+    Item,
     Parser,
     get_config_root_path,
-    get_metafunc_call_arg,
-    is_set,
+    get_item_fixturedefs,
+)
+from pytest_bdd.const import SCENARIO_BATCH_MARK
+from pytest_bdd.exceptions import AmbiguousStepDefinitionError
+from pytest_bdd.feature_sources import get_feature_source_store
+from pytest_bdd.message_stream import (
+    CHUNK_SIZE,
+    DEFAULT_ATTACHMENT_SIZE_THRESHOLD,
+    MessagesFormat,
+    MessagesProfile,
+    MessageStreamWriter,
+    is_zstd_available,
+    resolve_format,
+    serialize_message,
 )
 from pytest_bdd.packaging import get_distribution_version
+from pytest_bdd.parsers import RegistryMode
+from pytest_bdd.runner import get_step_binding
 from pytest_bdd.steps import StepHandler
-from pytest_bdd.utils import PytestBDDIdGeneratorHandler, deepattrgetter
+from pytest_bdd.utils import PytestBDDIdGeneratorHandler, deepattrgetter, get_item_feature_pickle
 
 
 @attrs(eq=False)
@@ -62,13 +75,29 @@ class MessagePlugin:
     config: Config = attrib()
     current_test_case = attrib(default=None)
     current_test_case_step_to_definition_mapping = attrib(default=None)
-    parameter_type_registry: Set[int] = set()
-    hook_registry: Set[int] = set()
+    current_test_step_id: Optional[str] = attrib(default=None, init=False)
+    parameter_type_registry: Set[int] = attrib(default=Factory(set), init=False)
+    hook_registry: Set[int] = attrib(default=Factory(set), init=False)
+    feature_registry: Set[str] = attrib(default=Factory(set), init=False)
+    pickle_registry: Set[int] = attrib(default=Factory(set), init=False)
+    step_definition_registry: Set[int] = attrib(default=Factory(set), init=False)
+    step_definition_parameter_types_registry: Set[int] = attrib(default=Factory(set), init=False)
 
     def __attrs_post_init__(self):
         self.is_disabled = self.config.option.messages_ndjson_path is None
 
         if not self.is_disabled:
+            option = self.config.option
+            messages_format = resolve_format(option.messages_format, option.messages_ndjson_path)
+            if messages_format is MessagesFormat.ZSTD and not is_zstd_available():
+                raise UsageError("zstd messages format requires Python 3.14+ or 'zstandard' package")
+            self.messages_stream_writer = MessageStreamWriter(  # type: ignore[call-arg]
+                path=option.messages_ndjson_path,
+                messages_format=messages_format,
+                profile=MessagesProfile(option.messages_profile),
+                attachment_size_threshold=option.messages_attachment_threshold,
+                attachments_dir=option.messages_attachments_dir,
+            )
             self.process_messages_io_queue = Queue()
             self.process_messages_stop_event = Event()
             self.process_messages_thread = Thread(
@@ -76,7 +105,7 @@ class MessagePlugin:
                 args=(
                     self.process_messages_io_queue,
                     self.process_messages_stop_event,
-                    self.config.option.messages_ndjson_path,
+                    self.messages_stream_writer,
                 ),
                 daemon=True,
             )
@@ -84,33 +113,36 @@ class MessagePlugin:
             sleep(0)
 
     @staticmethod
-    def process_messages(queue: Queue, stop_event: Event, messages_file_path: Union[str, Path]):
+    def process_messages(queue: Queue, stop_event: Event, writer: MessageStreamWriter):
+        """Serialize, validate, compact and compress messages by batches out of the test thread"""
         last_enter = False
         while not (stop_event.is_set() and last_enter):  # give one more enter to take all left messages
             if stop_event.is_set():
                 last_enter = True
-            lock = FileLock(f"{messages_file_path}.lock")
-            with lock:
-                with Path(messages_file_path).open(mode="at+", buffering=1, encoding="utf-8") as f:
-                    lines = []
-                    while not queue.empty():
-                        try:
-                            message_json = queue.get(timeout=1)
-                        except Empty:
-                            sleep(0)
-                            continue
-
-                        try:
-                            Message.model_validate(json.loads(message_json))  # type: ignore[attr-defined] # migration to pydantic2
-                        except ValidationError:
-                            logging.exception(f"Failed to parse:\n{pformat(message_json)}\n", exc_info=True)
-                        else:
-                            lines.append(f"{message_json}\n")
-                        finally:
-                            queue.task_done()
-                        sleep(0)
-                    f.writelines(lines)
-                    f.flush()
+            message_jsons = []
+            while not queue.empty():
+                try:
+                    message = queue.get(timeout=1)
+                except Empty:
+                    sleep(0)
+                    continue
+
+                try:
+                    message_json = serialize_message(message)
+                    # Serialization templates and changes of messages by hooks bypass validation on construction
+                    Message.model_validate_json(message_json)
+                except ValidationError:
+                    logging.exception(f"Failed to parse:\n{pformat(message_json)}\n", exc_info=True)
+                except Exception:
+                    logging.exception(f"Failed to serialize:\n{pformat(message)}\n", exc_info=True)
+                else:
+                    message_jsons.append(message_json)
+                finally:
+                    queue.task_done()
+                sleep(0)
+            writer.write(message_jsons)
+            if not message_jsons:
+                sleep(0.01)
 
     def get_timestamp(self):
         timestamp = time_ns()
@@ -131,46 +163,97 @@ class MessagePlugin:
             default=None,
             help="messages ndjson report file at given path.",
         )
+        group.addoption(
+            "--messages-format",
+            action="store",
+            dest="messages_format",
+            choices=[messages_format.value for messages_format in MessagesFormat],
+            default=MessagesFormat.AUTO.value,
+            help="Compression of messages report; auto format is chosen by the file suffix (.gz, .zst).",
+        )
+        group.addoption(
+            "--messages-profile",
+            action="store",
+            dest="messages_profile",
+            choices=[profile.value for profile in MessagesProfile],
+            default=MessagesProfile.FULL.value,
+            help="Compact profile references feature files instead of embedding them "
+            "and stores big attachments into side files.",
+        )
+        group.addoption(
+            "--messages-attachment-threshold",
+            action="store",
+            dest="messages_attachment_threshold",
+            metavar="bytes",
+            type=int,
+            default=DEFAULT_ATTACHMENT_SIZE_THRESHOLD,
+            help="Size of attachment to be stored into the attachments directory instead of the message body.",
+        )
+        group.addoption(
+            "--messages-attachments-dir",
+            action="store",
+            dest="messages_attachments_dir",
+            metavar="path",
+            default=None,
+            help="Directory of attachments referenced by messages; <messages path>.attachments by default.",
+        )
 
-    @hookimpl(hookwrapper=True)
-    def pytest_generate_tests(self, metafunc):
-        yield
+    @hookimpl(trylast=True)
+    def pytest_collection_finish(self, session: Session):
+        """Emit sources, documents, pickles, step definitions, parameter types and hooks of selected items once"""
         if self.is_disabled:
             return
 
-        if all(
-            [
-                "feature" in metafunc.fixturenames,
-                "scenario" in metafunc.fixturenames,
-                "feature_source" in metafunc.fixturenames,
-                metafunc._calls,
-            ]
-        ):
-            config = metafunc.config
-
-            feature_registry = set()
-            pickle_registry = set()
-            for call in metafunc._calls:
-                feature = get_metafunc_call_arg(call, "feature")
-                pickle = get_metafunc_call_arg(call, "scenario")
-                feature_source: Source = get_metafunc_call_arg(call, "feature_source")
-
-                if is_set(feature) and hasattr(feature_source, "uri") and feature_source.uri not in feature_registry:
-                    feature_registry.add(feature_source.uri)
-                    cast(Config, config).hook.pytest_bdd_message(config=config, message=Message(source=feature_source))
-
-                    cast(Config, config).hook.pytest_bdd_message(
-                        config=config, message=Message(gherkin_document=feature.gherkin_document)
-                    )
-                if is_set(pickle) and id(pickle) not in pickle_registry:
-                    cast(Config, config).hook.pytest_bdd_message(config=config, message=Message(pickle=pickle))
+        config = session.config
+        feature_source_store = get_feature_source_store(config)
+        step_registries = {}
+        hook_funcs = {}
+        for item in cast(List[Item], session.items):
+            feature, pickle = get_item_feature_pickle(item)
+            if feature is None or pickle is None:
+                continue
+
+            if feature.uri not in self.feature_registry:
+                self.feature_registry.add(feature.uri)
+                feature_source = feature_source_store.get(feature)
+                if feature_source is not None:
+                    self.messages_stream_writer.source_paths[feature_source.uri] = feature.filename
+                    config.hook.pytest_bdd_message(config=config, message=Message(source=feature_source))
+                config.hook.pytest_bdd_message(
+                    config=config, message=Message(gherkin_document=feature.gherkin_document)
+                )
+
+            batch_mark = item.get_closest_marker(SCENARIO_BATCH_MARK)
+            for pickle in [pickle] if batch_mark is None else batch_mark.args[0]:
+                if id(pickle) not in self.pickle_registry:
+                    self.pickle_registry.add(id(pickle))
+                    config.hook.pytest_bdd_message(config=config, message=Message(pickle=pickle.to_message()))
+
+            # Step registry is requested dynamically, so it is not a part of the item fixture closure
+            for fixturedef in get_item_fixturedefs(item, "step_registry"):
+                step_registry = getattr(fixturedef.func, "__pytest_bdd_step_registry__", None)
+                if step_registry is not None:
+                    step_registries[id(step_registry)] = step_registry
+
+            # Hooks are autouse fixtures
+            for fixturedefs in item._fixtureinfo.name2fixturedefs.values():
+                for fixturedef in fixturedefs:
+                    if hasattr(fixturedef.func, "__pytest_bdd_is_hook__"):
+                        hook_funcs[id(fixturedef.func)] = fixturedef.func
+
+        for step_registry in step_registries.values():
+            for step_definition in step_registry:
+                self.emit_step_definition(config, step_definition)
+
+        for hook_func in hook_funcs.values():
+            self.emit_hook(config, hook_func)
 
     def pytest_bdd_message(self, config: Config, message: Message):
         if self.is_disabled:
             return
 
-        message_json = message.model_dump_json(exclude_none=True, by_alias=True)  # type: ignore[attr-defined] # migration to pydantic2
-        self.process_messages_io_queue.put_nowait(message_json)
+        # Serialization is deferred to the writer thread
+        self.process_messages_io_queue.put_nowait(message)
 
     def pytest_runtestloop(self, session: Session):
         if self.is_disabled:
@@ -188,6 +271,8 @@ class MessagePlugin:
         if self.is_disabled:
             return
 
+        from ci_environment import detect_ci_environment
+
         config = session.config
         hook_handler = config.hook
 
@@ -228,44 +313,77 @@ class MessagePlugin:
         self.process_messages_stop_event.set()
         self.process_messages_thread.join()
 
-    @hookimpl(hookwrapper=True)
-    def pytest_fixture_setup(self, fixturedef: FixtureDef, request):
-        func = fixturedef.func
-        func_id = id(func)
-
-        if self.is_disabled or func_id in self.hook_registry:
-            yield
+    def emit_hook(self, config: Config, func: Callable):
+        if id(func) in self.hook_registry:
             return
+        self.hook_registry.add(id(func))
 
-        config = request.config
-        hook_handler = config.hook
+        hook_name = getattr(func, "__pytest_bdd_hook_name__", None)
+        hook_expression = getattr(func, "__pytest_bdd_hook_expression__", None)
+
+        config.hook.pytest_bdd_message(
+            config=config,
+            message=Message(
+                hook=Hook(
+                    id=cast(PytestBDDIdGeneratorHandler, config).pytest_bdd_id_generator.get_next_id(),
+                    **({"name": hook_name} if hook_name is not None else {}),
+                    source_reference=SourceReference(
+                        uri=relpath(
+                            getfile(func),
+                            str(get_config_root_path(config)),
+                        ),
+                        location=Location(line=getsourcelines(func)[1]),
+                    ),
+                    **({"tag_expression": hook_expression} if hook_expression is not None else {}),
+                )
+            ),
+        )
 
-        if hasattr(func, "__pytest_bdd_is_hook__"):
-            self.hook_registry.add(func_id)
+    def emit_step_definition(self, config: Config, step_definition, request: Optional[FixtureRequest] = None):
+        """Emit step definition and parameter types of its parser if they are not emitted yet.
+
+        Parameter type registry of some parsers is provided by a fixture, so their parameter types could be emitted
+        only in the test context.
+        """
+        step_definition_id = id(step_definition)
+        if step_definition_id not in self.step_definition_registry:
+            self.step_definition_registry.add(step_definition_id)
+            config.hook.pytest_bdd_message(
+                config=config, message=Message(step_definition=step_definition.as_message(config=config))
+            )
 
-            hook_name = getattr(func, "__pytest_bdd_hook_name__", None)
-            hook_expression = getattr(func, "__pytest_bdd_hook_expression__", None)
+        if step_definition_id in self.step_definition_parameter_types_registry:
+            return
+
+        parser = step_definition.parser
+        parameter_type_registry_getter: Optional[Callable[[FixtureRequest], ParameterTypeRegistry]] = deepattrgetter(
+            "_get_parameter_type_registry", default=None
+        )(parser)[0]
+        if parameter_type_registry_getter is None:
+            self.step_definition_parameter_types_registry.add(step_definition_id)
+            return
+        registry_mode = getattr(parser, "parameter_type_registry_like", None)
+        if request is None and registry_mode in (RegistryMode.FIXTURE, RegistryMode.FIXTURE.value):
+            return
+        self.step_definition_parameter_types_registry.add(step_definition_id)
 
-            hook_handler.pytest_bdd_message(
+        for parameter_type in parameter_type_registry_getter(request).parameter_types:  # type: ignore[arg-type]
+            if id(parameter_type) in self.parameter_type_registry:
+                continue
+            self.parameter_type_registry.add(id(parameter_type))
+            config.hook.pytest_bdd_message(
                 config=config,
                 message=Message(
-                    hook=Hook(
+                    parameter_type=ParameterType(
+                        name=parameter_type.name,
+                        regular_expressions=parameter_type.regexps,
+                        prefer_for_regular_expression_match=parameter_type._prefer_for_regexp_match,
+                        use_for_snippets=parameter_type._use_for_snippets,
                         id=cast(PytestBDDIdGeneratorHandler, config).pytest_bdd_id_generator.get_next_id(),
-                        **({"name": hook_name} if hook_name is not None else {}),
-                        source_reference=SourceReference(
-                            uri=relpath(
-                                getfile(func),
-                                str(get_config_root_path(cast(Config, config))),
-                            ),
-                            location=Location(line=getsourcelines(func)[1]),
-                        ),
-                        **({"tag_expression": hook_expression} if hook_expression is not None else {}),
-                    )
+                    ),
                 ),
             )
 
-        yield
-
     @hookimpl(hookwrapper=True)
     def pytest_runtest_setup(self, item):
         yield
@@ -273,70 +391,12 @@ class MessagePlugin:
         if self.is_disabled:
             return
 
-        session = item.session
-        config: Union[
-            Config, PytestBDDIdGeneratorHandler
-        ] = session.config  # https://github.com/python/typing/issues/213
-
-        hook_handler = cast(Config, config).hook
-
         request = item._request
-        scenario = request.getfixturevalue("scenario")
-        feature = request.getfixturevalue("feature")
-
-        step_registry = request.getfixturevalue("step_registry")
-        seen_steps = set()
-        while step_registry is not None:
-            for step_definition in step_registry:
-                if id(step_definition) not in seen_steps:
-                    seen_steps.add(id(step_definition))
-                    config.hook.pytest_bdd_message(
-                        config=config, message=Message(step_definition=step_definition.as_message(config=config))
-                    )
-            step_registry = step_registry.parent
-
-        step_registry = request.getfixturevalue("step_registry")
-        seen_steps = set()
-        while step_registry is not None:
-            for step_definition in step_registry:
-                if id(step_definition) not in seen_steps:
-                    parameter_type_registry_getter: Callable[[FixtureRequest], ParameterTypeRegistry] = deepattrgetter(
-                        "_get_parameter_type_registry", default=None
-                    )(step_definition.parser)[0]
-
-                    if parameter_type_registry_getter is None:
-                        break
+        self.emit_test_case(request, request.getfixturevalue("feature"), request.getfixturevalue("scenario"))
 
-                    parameter_type_registry = parameter_type_registry_getter(request)
-
-                    parameter_types = dict(
-                        map(
-                            lambda parameter_type: (id(parameter_type), parameter_type),
-                            parameter_type_registry.parameter_types,
-                        )
-                    )
-
-                    not_yet_registered_parameter_types = {
-                        key: parameter_type
-                        for key, parameter_type in parameter_types.items()
-                        if key not in self.parameter_type_registry
-                    }
-
-                    for parameter_type in not_yet_registered_parameter_types.values():
-                        hook_handler.pytest_bdd_message(
-                            config=config,
-                            message=Message(
-                                parameter_type=ParameterType(
-                                    name=parameter_type.name,
-                                    regular_expressions=parameter_type.regexps,
-                                    prefer_for_regular_expression_match=parameter_type._prefer_for_regexp_match,
-                                    use_for_snippets=parameter_type._use_for_snippets,
-                                    id=cast(PytestBDDIdGeneratorHandler, config).pytest_bdd_id_generator.get_next_id(),
-                                ),
-                            ),
-                        )
-                    self.parameter_type_registry |= not_yet_registered_parameter_types.keys()
-            step_registry = step_registry.parent
+    def emit_test_case(self, request, feature, scenario):
+        config = request.config
+        hook_handler = config.hook
 
         test_steps = []
         previous_step = None
@@ -344,17 +404,31 @@ class MessagePlugin:
         self.current_test_case_step_id_to_step_mapping = {}
 
         for step in scenario.steps:
+            step_binding = get_step_binding(request.node, step)
             try:
-                step_definition = hook_handler.pytest_bdd_match_step_definition_to_step(
-                    request=request,
-                    feature=feature,
-                    scenario=scenario,
-                    step=step,
-                    previous_step=previous_step,
+                step_definition = (
+                    hook_handler.pytest_bdd_match_step_definition_to_step(
+                        request=request,
+                        feature=feature,
+                        scenario=scenario,
+                        step=step,
+                        previous_step=previous_step,
+                    )
+                    if step_binding is None
+                    else step_binding.step_definition
+                )
+            except StepHandler.Matcher.MatchNotFoundError:
+                # Undefined steps are a part of the test case too, but aren't bound to any step definition
+                test_step = TestStep(
+                    id=cast(PytestBDDIdGeneratorHandler, config).pytest_bdd_id_generator.get_next_id(),
+                    pickle_step_id=step.id,
+                    step_definition_ids=[],
                 )
-            except StepHandler.Matcher.MatchNotFoundError as e:
-                pass
+                test_steps.append(test_step)
+                self.current_test_case_step_id_to_step_mapping[id(step)] = test_step
             else:
+                # Step definitions registered not in the step registries visible at collection are emitted lazily
+                self.emit_step_definition(config, step_definition, request)
                 test_step = TestStep(
                     id=cast(PytestBDDIdGeneratorHandler, config).pytest_bdd_id_generator.get_next_id(),
                     pickle_step_id=step.id,
@@ -384,6 +458,10 @@ class MessagePlugin:
         config = request.config
         hook_handler = config.hook
 
+        if self.current_test_case is None or self.current_test_case.pickle_id != scenario.id:
+            # Scenarios executed as a single item don't pass test setup
+            self.emit_test_case(request, feature, scenario)
+
         self.current_test_case_start = TestCaseStarted(
             attempt=getattr(request.node, "execution_count", 0),
             id=cast(PytestBDDIdGeneratorHandler, config).pytest_bdd_id_generator.get_next_id(),
@@ -429,12 +507,13 @@ class MessagePlugin:
         step_definition = self.current_test_case_step_id_to_step_mapping[id(step)]
 
         self.current_test_case_step_start_timestamp = self.get_timestamp()
+        self.current_test_step_id = step_definition.id
 
         hook_handler.pytest_bdd_message(
             config=config,
             message=Message(
                 test_step_started=TestStepStarted(
-                    test_case_started_id=self.current_test_case.id,
+                    test_case_started_id=self.current_test_case_start.id,
                     timestamp=self.current_test_case_step_start_timestamp,
                     test_step_id=step_definition.id,
                 )
@@ -451,6 +530,7 @@ class MessagePlugin:
         # TODO check behaviour if missing
         step_definition = self.current_test_case_step_id_to_step_mapping[id(step)]
         self.current_test_case_step_finish_timestamp = self.get_timestamp()
+        self.current_test_step_id = None
 
         current_test_case_step_duration_total_nanos = (
             self.current_test_case_step_finish_timestamp.seconds * 10**9
@@ -471,10 +551,13 @@ class MessagePlugin:
             config=config,
             message=Message(
                 test_step_finished=TestStepFinished(
-                    test_case_started_id=self.current_test_case.id,
+                    test_case_started_id=self.current_test_case_start.id,
                     timestamp=self.current_test_case_step_finish_timestamp,
                     test_step_id=step_definition.id,
-                    test_step_result=TestStepResult(duration=current_test_case_step_duration, status=Status.passed),
+                    test_step_result=TestStepResult(
+                        duration=current_test_case_step_duration,
+                        status=Status.skipped if config.option.bdd_dry_run else Status.passed,
+                    ),
                 )
             ),
         )
@@ -491,6 +574,7 @@ class MessagePlugin:
         # TODO check behaviour if missing
         step_definition = self.current_test_case_step_id_to_step_mapping[id(step)]
         self.current_test_case_step_finish_timestamp = self.get_timestamp()
+        self.current_test_step_id = None
 
         current_test_case_step_duration_total_nanos = (
             self.current_test_case_step_finish_timestamp.seconds * 10**9
@@ -511,7 +595,7 @@ class MessagePlugin:
             config=config,
             message=Message(
                 test_step_finished=TestStepFinished(
-                    test_case_started_id=self.current_test_case.id,
+                    test_case_started_id=self.current_test_case_start.id,
                     timestamp=self.current_test_case_step_finish_timestamp,
                     test_step_id=step_definition.id,
                     test_step_result=TestStepResult(duration=current_test_case_step_duration, status=Status.failed),
@@ -519,6 +603,47 @@ class MessagePlugin:
             ),
         )
 
+    def pytest_bdd_step_func_lookup_error(self, request, feature, scenario, step, exception):
+        if self.is_disabled:
+            return
+
+        config = request.config
+        hook_handler = config.hook
+
+        test_step = self.current_test_case_step_id_to_step_mapping.get(id(step))
+        if test_step is None:
+            return
+        timestamp = self.get_timestamp()
+        hook_handler.pytest_bdd_message(
+            config=config,
+            message=Message(
+                test_step_started=TestStepStarted(
+                    test_case_started_id=self.current_test_case_start.id,
+                    timestamp=timestamp,
+                    test_step_id=test_step.id,
+                )
+            ),
+        )
+        hook_handler.pytest_bdd_message(
+            config=config,
+            message=Message(
+                test_step_finished=TestStepFinished(
+                    test_case_started_id=self.current_test_case_start.id,
+                    timestamp=timestamp,
+                    test_step_id=test_step.id,
+                    test_step_result=TestStepResult(
+                        duration=Duration(seconds=0, nanos=0),
+                        status=(
+                            Status.ambiguous
+                            if isinstance(exception, AmbiguousStepDefinitionError)
+                            else Status.undefined
+                        ),
+                        message=str(exception),
+                    ),
+                )
+            ),
+        )
+
     def pytest_bdd_attach(self, request, attachment, media_type, file_name):
         if self.is_disabled:
             return
@@ -526,7 +651,17 @@ class MessagePlugin:
         config = request.config
         hook_handler = config.hook
 
-        if isinstance(attachment, (str, TextIOBase)):
+        writer = self.messages_stream_writer
+        threshold = writer.attachment_size_threshold
+        url = None
+        if isinstance(attachment, os.PathLike):
+            path = Path(attachment)
+            content_encoding = ContentEncoding.base64
+            _media_type = (
+                (mimetypes.guess_type(path.name)[0] or "application/octet-stream") if media_type is None else media_type
+            )
+            file_name = path.name if file_name is None else file_name
+        elif isinstance(attachment, (str, TextIOBase)):
             content_encoding = ContentEncoding.identity
             _media_type = "text/plain;charset=UTF-8" if media_type is None else media_type
         elif isinstance(attachment, (bytes, bytearray, BufferedIOBase)):
@@ -536,36 +671,46 @@ class MessagePlugin:
             content_encoding = ContentEncoding.identity
             _media_type = "text/plain;charset=UTF-8" if media_type is None else media_type
 
-        if isinstance(attachment, str):
+        # Big files and streams are stored into the attachments directory by chunks and referenced by url
+        if isinstance(attachment, os.PathLike):
+            if path.stat().st_size > threshold:
+                body, url = "", writer.store_attachment_file(path)
+            else:
+                body = b64encode(path.read_bytes()).decode("ascii")
+        elif isinstance(attachment, str):
             body = attachment
         elif isinstance(attachment, TextIOBase):
-            body = attachment.read()
-        elif isinstance(attachment, (bytes, bytearray, BufferedIOBase)):
-            if isinstance(attachment, bytes):
-                body_bytes = attachment
-            elif isinstance(attachment, bytearray):
-                body_bytes = bytes(attachment)
-            elif isinstance(attachment, BufferedIOBase):
-                body_bytes = attachment.read()
-            else:  # pragma: no cover
-                body_bytes = b""
-
-            body = b64encode(body_bytes).decode("ascii")
+            # Streams are drained before the attach returns, as they could be closed by the caller right after
+            text_head = attachment.read(threshold + 1)
+            if len(text_head) > threshold:
+                text_chunks = chain([text_head], iter(partial(attachment.read, CHUNK_SIZE), ""))
+                body, url = "", writer.store_attachment_chunks(chunk.encode("utf-8") for chunk in text_chunks)
+            else:
+                body = text_head
+        elif isinstance(attachment, (bytes, bytearray)):
+            body = b64encode(attachment).decode("ascii")
+        elif isinstance(attachment, BufferedIOBase):
+            head = attachment.read(threshold + 1)
+            if len(head) > threshold:
+                chunks = chain([head], iter(partial(attachment.read, CHUNK_SIZE), b""))
+                suffix = Path(file_name).suffix if file_name is not None else ""
+                body, url = "", writer.store_attachment_chunks(chunks, suffix)
+            else:
+                body = b64encode(head).decode("ascii")
         else:
             body = str(attachment)
 
-        hook_handler.pytest_bdd_message(
-            config=config,
-            message=Message(
-                attachment=Attachment(
-                    test_step_id=self.current_test_case.id,
-                    test_case_started_id=self.current_test_case.id,
-                    # TODO find a specification when it useful
-                    # source=,
-                    media_type=_media_type,
-                    **(dict(file_name=str(file_name)) if file_name is not None else {}),
-                    content_encoding=content_encoding,
-                    body=body,
-                )
-            ),
+        message = Message(
+            attachment=Attachment(
+                **(dict(test_step_id=self.current_test_step_id) if self.current_test_step_id is not None else {}),
+                test_case_started_id=self.current_test_case_start.id,
+                # TODO find a specification when it useful
+                # source=,
+                media_type=_media_type,
+                **(dict(file_name=str(file_name)) if file_name is not None else {}),
+                content_encoding=content_encoding,
+                body=body,
+                **(dict(url=url) if url is not None else {}),
+            )
         )
+        hook_handler.pytest_bdd_message(config=config, message=message)
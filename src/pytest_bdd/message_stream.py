@@ -0,0 +1,368 @@
+"""Formats of the Cucumber messages stream.
+
+Streams are NDJSON files, optionally compressed by gzip or zstd. Every write appends a complete gzip member or zstd
+frame, so several processes (e.g. xdist workers) could append into the same file, and the stream is still readable
+if the run was interrupted.
+
+Attachments bigger than the threshold which are attached as files, paths or streams are copied (or hard-linked) into
+the attachments directory by chunks and referenced by the ``Attachment.url``, so they never enter memory as a whole.
+The compact profile keeps streams small: ``Source.data`` is replaced by a reference to the feature file together
+with the data hash, and other attachments bigger than the threshold are moved into the attachments directory too.
+``iter_messages`` and ``rehydrate`` restore the standard stream for tools which require it; ``rehydrate`` encodes
+referenced attachments by chunks.
+
+Messages are serialized and validated by the writer thread; envelopes emitted for every step and scenario are
+serialized by templates producing the same JSON as pydantic does. Attachments are complete before they are emitted:
+small binary data is encoded and big files are stored when attached.
+"""
+import gzip
+import io
+import json
+import mimetypes
+import os
+import shutil
+from base64 import b64decode, b64encode
+from enum import Enum
+from hashlib import sha256
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Optional, Union, cast
+from uuid import uuid4
+
+from attr import Factory, attrib, attrs
+
+from messages import Envelope as Message  # type:ignore[attr-defined]
+from messages import Status  # type:ignore[attr-defined]
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+DEFAULT_ATTACHMENT_SIZE_THRESHOLD = 64 * 1024
+# Multiple of 3, so chunks are base64 encoded without padding in between
+CHUNK_SIZE = 3 * 64 * 1024
+SOURCE_DATA_REFERENCE_KEY = "dataReference"
+
+
+class MessagesFormat(Enum):
+    AUTO = "auto"
+    NDJSON = "ndjson"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+class MessagesProfile(Enum):
+    FULL = "full"
+    COMPACT = "compact"
+
+
+def resolve_format(messages_format: Union[MessagesFormat, str], path: Union[str, Path]) -> MessagesFormat:
+    """Format of the stream to be written; auto format is chosen by the file suffix"""
+    messages_format = MessagesFormat(messages_format)
+    if messages_format is not MessagesFormat.AUTO:
+        return messages_format
+    suffix = Path(path).suffix
+    if suffix == ".gz":
+        return MessagesFormat.GZIP
+    elif suffix in (".zst", ".zstd"):
+        return MessagesFormat.ZSTD
+    else:
+        return MessagesFormat.NDJSON
+
+
+def detect_format(path: Union[str, Path]) -> MessagesFormat:
+    """Format of the existing stream by its magic bytes"""
+    with Path(path).open(mode="rb") as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return MessagesFormat.GZIP
+    elif magic.startswith(ZSTD_MAGIC):
+        return MessagesFormat.ZSTD
+    else:
+        return MessagesFormat.NDJSON
+
+
+def _open_zstd(path: Union[str, Path], mode: str) -> IO[bytes]:
+    try:
+        from compression import zstd  # type: ignore[import]  # Python 3.14+
+    except ImportError:
+        try:
+            import zstandard  # type: ignore[import]
+        except ImportError as e:  # pragma: no cover
+            raise RuntimeError("zstd messages format requires Python 3.14+ or 'zstandard' package") from e
+        raw = Path(path).open(mode=mode)
+        if "r" in mode:
+            return io.BufferedReader(  # type: ignore[arg-type]
+                zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+            )
+        return cast(IO[bytes], zstandard.ZstdCompressor().stream_writer(raw, closefd=True))
+    else:
+        return zstd.open(path, mode)  # type: ignore[no-any-return]
+
+
+def is_zstd_available() -> bool:
+    try:
+        from compression import zstd  # type: ignore[import-not-found] # noqa: F401
+    except ImportError:
+        try:
+            import zstandard  # type: ignore[import] # noqa: F401
+        except ImportError:
+            return False
+    return True
+
+
+def open_stream(path: Union[str, Path], messages_format: MessagesFormat, mode: str = "rb") -> IO[bytes]:
+    """Open binary stream of the given format; "ab" mode appends a new gzip member or zstd frame"""
+    if messages_format is MessagesFormat.GZIP:
+        return gzip.open(path, mode)  # type: ignore[return-value]
+    elif messages_format is MessagesFormat.ZSTD:
+        return _open_zstd(path, mode)
+    else:
+        return Path(path).open(mode=mode)  # type: ignore[return-value]
+
+
+def _dump_string(value: str) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _dump_timestamp(timestamp) -> str:
+    return f'{{"seconds":{int(timestamp.seconds)},"nanos":{int(timestamp.nanos)}}}'
+
+
+def _dump_test_step_started(test_step_started) -> str:
+    return (
+        f'{{"testStepStarted":{{"testCaseStartedId":{_dump_string(test_step_started.test_case_started_id)},'
+        f'"testStepId":{_dump_string(test_step_started.test_step_id)},'
+        f'"timestamp":{_dump_timestamp(test_step_started.timestamp)}}}}}'
+    )
+
+
+def _dump_test_step_finished(test_step_finished) -> Optional[str]:
+    result = test_step_finished.test_step_result
+    if result.message is not None or result.exception is not None:
+        return None
+    return (
+        f'{{"testStepFinished":{{"testCaseStartedId":{_dump_string(test_step_finished.test_case_started_id)},'
+        f'"testStepId":{_dump_string(test_step_finished.test_step_id)},'
+        f'"testStepResult":{{"duration":{_dump_timestamp(result.duration)},'
+        f'"status":{_dump_string(Status(result.status).value)}}},'
+        f'"timestamp":{_dump_timestamp(test_step_finished.timestamp)}}}}}'
+    )
+
+
+def _dump_test_case_started(test_case_started) -> str:
+    worker_id = test_case_started.worker_id
+    worker_id_json = "" if worker_id is None else f'"workerId":{_dump_string(worker_id)},'
+    return (
+        f'{{"testCaseStarted":{{"attempt":{int(test_case_started.attempt)},'
+        f'"id":{_dump_string(test_case_started.id)},'
+        f'"testCaseId":{_dump_string(test_case_started.test_case_id)},'
+        f"{worker_id_json}"
+        f'"timestamp":{_dump_timestamp(test_case_started.timestamp)}}}}}'
+    )
+
+
+def _dump_test_case_finished(test_case_finished) -> str:
+    return (
+        f'{{"testCaseFinished":{{"testCaseStartedId":{_dump_string(test_case_finished.test_case_started_id)},'
+        f'"timestamp":{_dump_timestamp(test_case_finished.timestamp)},'
+        f'"willBeRetried":{"true" if test_case_finished.will_be_retried else "false"}}}}}'
+    )
+
+
+# Serializers of envelopes emitted for every step or scenario; None result falls back to pydantic serialization
+FAST_PATH_SERIALIZERS: Dict[str, Callable[[Any], Optional[str]]] = {
+    "test_step_started": _dump_test_step_started,
+    "test_step_finished": _dump_test_step_finished,
+    "test_case_started": _dump_test_case_started,
+    "test_case_finished": _dump_test_case_finished,
+}
+
+
+def serialize_message(message: Message) -> str:
+    """Serialize envelope into JSON the same way as ``model_dump_json(exclude_none=True, by_alias=True)``"""
+    fields_set = message.model_fields_set
+    if len(fields_set) == 1:
+        (field,) = fields_set
+        serializer = FAST_PATH_SERIALIZERS.get(field)
+        if serializer is not None:
+            message_json = serializer(getattr(message, field))
+            if message_json is not None:
+                return message_json
+    return message.model_dump_json(exclude_none=True, by_alias=True)  # type: ignore[no-any-return]
+
+
+@attrs(eq=False)
+class MessageStreamWriter:
+    """Appends messages into the stream; used from the writer thread of the messages plugin"""
+
+    path: Union[str, Path] = attrib()
+    messages_format: MessagesFormat = attrib(default=MessagesFormat.NDJSON)
+    profile: MessagesProfile = attrib(default=MessagesProfile.FULL)
+    attachment_size_threshold: int = attrib(default=DEFAULT_ATTACHMENT_SIZE_THRESHOLD)
+    attachments_dir: Optional[Union[str, Path]] = attrib(default=None)
+    # Feature file paths by source uri, filled by the messages plugin before sources are emitted
+    source_paths: Dict[str, str] = attrib(default=Factory(dict))
+
+    @property
+    def attachments_path(self) -> Path:
+        if self.attachments_dir is not None:
+            return Path(self.attachments_dir)
+        path = Path(self.path)
+        return path.with_name(f"{path.name}.attachments")
+
+    def get_attachment_url(self, attachment_path: Path) -> str:
+        """Attachment location relative to the stream if possible"""
+        try:
+            return Path(os.path.relpath(attachment_path, Path(self.path).parent)).as_posix()
+        except ValueError:  # pragma: no cover # different drives on Windows
+            return attachment_path.as_posix()
+
+    def new_attachment_path(self, suffix: str = "") -> Path:
+        self.attachments_path.mkdir(parents=True, exist_ok=True)
+        return self.attachments_path / f"{uuid4().hex}{suffix}"
+
+    def store_attachment_file(self, path: Union[str, Path]) -> str:
+        """Hard-link or copy the attached file into the attachments directory; returns attachment url"""
+        attachment_path = self.new_attachment_path(Path(path).suffix)
+        try:
+            os.link(path, attachment_path)
+        except OSError:
+            shutil.copyfile(path, attachment_path)
+        return self.get_attachment_url(attachment_path)
+
+    def store_attachment_chunks(self, chunks: Iterable[bytes], suffix: str = "") -> str:
+        """Write the attached stream into the attachments directory by chunks; returns attachment url"""
+        attachment_path = self.new_attachment_path(suffix)
+        with attachment_path.open(mode="wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return self.get_attachment_url(attachment_path)
+
+    def write(self, message_jsons: Iterable[str]) -> None:
+        if self.profile is MessagesProfile.COMPACT:
+            message_jsons = map(self.compact, message_jsons)
+        data = "".join(f"{message_json}\n" for message_json in message_jsons).encode("utf-8")
+        if not data:
+            return
+        from filelock import FileLock
+
+        with FileLock(f"{self.path}.lock"):
+            with open_stream(self.path, self.messages_format, mode="ab") as f:
+                f.write(data)
+
+    def compact(self, message_json: str) -> str:
+        if message_json.startswith('{"source"'):
+            message = json.loads(message_json)
+            if self.compact_source(message["source"]):
+                return json.dumps(message, separators=(",", ":"))
+        elif message_json.startswith('{"attachment"'):
+            message = json.loads(message_json)
+            if self.compact_attachment(message["attachment"]):
+                return json.dumps(message, separators=(",", ":"))
+        return message_json
+
+    def compact_source(self, source: Dict[str, Any]) -> bool:
+        path = self.source_paths.get(source["uri"])
+        if path is None:
+            return False
+        data = source["data"]
+        try:
+            is_same_data = Path(path).read_text(encoding="utf-8") == data
+        except (OSError, UnicodeDecodeError):
+            return False
+        if not is_same_data:
+            return False
+        del source["data"]
+        source[SOURCE_DATA_REFERENCE_KEY] = {"path": str(path), "sha256": sha256(data.encode("utf-8")).hexdigest()}
+        return True
+
+    def compact_attachment(self, attachment: Dict[str, Any]) -> bool:
+        body = attachment["body"]
+        if len(body) <= self.attachment_size_threshold:
+            return False
+        body_bytes = b64decode(body) if attachment.get("contentEncoding") == "BASE64" else body.encode("utf-8")
+        digest = sha256(body_bytes).hexdigest()
+        extension = Path(attachment.get("fileName") or "").suffix or (
+            mimetypes.guess_extension(attachment.get("mediaType", "").partition(";")[0]) or ""
+        )
+        attachment_path = self.attachments_path / f"{digest}{extension}"
+        if not attachment_path.exists():
+            attachment_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = attachment_path.with_name(f"{attachment_path.name}.tmp")
+            tmp_path.write_bytes(body_bytes)
+            tmp_path.replace(attachment_path)
+        attachment["body"] = ""
+        attachment["url"] = self.get_attachment_url(attachment_path)
+        return True
+
+
+def get_local_attachment_path(attachment: Dict[str, Any], base_path: Union[str, Path]) -> Optional[Path]:
+    """Path of the attachment stored into the attachments directory instead of the body"""
+    url = attachment.get("url")
+    if attachment.get("body") or url is None or "://" in url:
+        return None
+    return Path(base_path) / str(url)
+
+
+def iter_attachment_body_chunks(attachment: Dict[str, Any], path: Path) -> Iterator[str]:
+    """Body of the stored attachment encoded by chunks"""
+    if attachment.get("contentEncoding") == "BASE64":
+        with path.open(mode="rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield b64encode(chunk).decode("ascii")
+    else:
+        with path.open(mode="r", encoding="utf-8", newline="") as text_f:
+            while text_chunk := text_f.read(CHUNK_SIZE):
+                yield text_chunk
+
+
+def rehydrate_message(message: Dict[str, Any], base_path: Union[str, Path]) -> Dict[str, Any]:
+    """Restore data of the message compacted by the compact profile"""
+    source = message.get("source")
+    if source is not None and SOURCE_DATA_REFERENCE_KEY in source:
+        reference = source.pop(SOURCE_DATA_REFERENCE_KEY)
+        data = Path(reference["path"]).read_text(encoding="utf-8")
+        if sha256(data.encode("utf-8")).hexdigest() != reference["sha256"]:
+            raise ValueError(f"Source {source['uri']} was changed since the stream was written")
+        source["data"] = data
+        return message
+
+    attachment = message.get("attachment")
+    if attachment is not None:
+        attachment_path = get_local_attachment_path(attachment, base_path)
+        if attachment_path is not None:
+            attachment["body"] = "".join(iter_attachment_body_chunks(attachment, attachment_path))
+            del attachment["url"]
+    return message
+
+
+def iter_messages(path: Union[str, Path], rehydrate: bool = True) -> Iterator[Dict[str, Any]]:
+    """Read messages from the stream of any format, restoring compacted data if requested"""
+    base_path = Path(path).parent
+    with open_stream(path, detect_format(path), mode="rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            message = json.loads(line)
+            yield rehydrate_message(message, base_path) if rehydrate else message
+
+
+def rehydrate(path: Union[str, Path], output_path: Union[str, Path], output_format: Optional[MessagesFormat] = None):
+    """Convert the stream of any format and profile into the standard one; stored attachments are encoded by chunks"""
+    base_path = Path(path).parent
+    messages_format = resolve_format(MessagesFormat.AUTO if output_format is None else output_format, output_path)
+    with open_stream(output_path, messages_format, mode="wb") as f:
+        for message in iter_messages(path, rehydrate=False):
+            attachment = message.get("attachment")
+            attachment_path = get_local_attachment_path(attachment, base_path) if attachment is not None else None
+            if attachment is None or attachment_path is None:
+                message_json = json.dumps(rehydrate_message(message, base_path), separators=(",", ":"))
+                f.write(f"{message_json}\n".encode("utf-8"))
+                continue
+
+            del attachment["url"]
+            attachment["body"] = ""
+            # Body is the only empty string key, as quotes inside other strings are escaped
+            prefix, _, suffix = json.dumps(message, separators=(",", ":")).partition('"body":""')
+            f.write(f'{prefix}"body":"'.encode("utf-8"))
+            for chunk in iter_attachment_body_chunks(attachment, attachment_path):
+                f.write(json.dumps(chunk, ensure_ascii=False)[1:-1].encode("utf-8"))
+            f.write(f'"{suffix}\n'.encode("utf-8"))
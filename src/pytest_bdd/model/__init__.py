@@ -1,5 +1,18 @@
 from messages import Pickle, PickleStep, Step, Tag  # type:ignore[attr-defined]
 from messages import Type as StepType  # type:ignore[attr-defined]
+from pytest_bdd.model.compact import CompactPickle, CompactPickleStep, CompactPickleTag
 from pytest_bdd.model.gherkin_document import Feature
+from pytest_bdd.model.table import Table
 
-__all__ = ["Feature", "Pickle", "PickleStep", "Step", "StepType", "Tag"]
+__all__ = [
+    "CompactPickle",
+    "CompactPickleStep",
+    "CompactPickleTag",
+    "Feature",
+    "Pickle",
+    "PickleStep",
+    "Step",
+    "StepType",
+    "Table",
+    "Tag",
+]
@@ -0,0 +1,146 @@
+"""Compact runtime representation of pickles.
+
+Every collected item references its pickle, so pickles are kept as slotted records with interned strings instead of
+pydantic messages; the latter are materialized only on demand, e.g. to be emitted into the messages stream.
+Records expose the same attributes as corresponding messages, so they could be used interchangeably.
+Data table arguments of steps are kept as columnar tables built from the compiled pickle data.
+"""
+from sys import intern
+from typing import Any, Iterable, Mapping, Optional, Sequence, Tuple, Union
+
+from attr import attrib, attrs
+
+from messages import Pickle, PickleStep, PickleStepArgument, PickleTag  # type:ignore[attr-defined]
+from messages import Type as StepType  # type:ignore[attr-defined]
+from pytest_bdd.model.table import Table
+
+
+def _intern_all(strings: Sequence[str]) -> Tuple[str, ...]:
+    return tuple(map(intern, strings))
+
+
+@attrs(slots=True, frozen=True)
+class CompactPickleTag:
+    name: str = attrib(converter=intern)
+    ast_node_id: str = attrib(converter=intern)
+
+    def to_message(self) -> PickleTag:
+        return PickleTag(name=self.name, ast_node_id=self.ast_node_id)
+
+
+@attrs(slots=True)
+class CompactPickleStep:
+    id: str = attrib()
+    text: str = attrib(converter=intern)
+    type: Optional[StepType] = attrib()
+    ast_node_ids: Tuple[str, ...] = attrib(converter=_intern_all)
+    # Argument other than data table
+    _argument: Optional[PickleStepArgument] = attrib(default=None)
+    # Data table argument; the first row is the header
+    table: Optional[Table] = attrib(default=None)
+
+    # Linked from the gherkin document of the feature
+    keyword: Optional[str] = attrib(default=None, eq=False)
+    line_number: Optional[int] = attrib(default=None, eq=False)
+    doc_string: Any = attrib(default=None, eq=False)
+    data_table: Any = attrib(default=None, eq=False)
+
+    @property
+    def argument(self) -> Optional[PickleStepArgument]:
+        if self.table is None:
+            return self._argument
+        return PickleStepArgument(
+            doc_string=None if self._argument is None else self._argument.doc_string,
+            data_table=self.table.to_pickle_table(),
+        )
+
+    @classmethod
+    def load(cls, data: Union[Mapping[str, Any], PickleStep]) -> "CompactPickleStep":
+        if isinstance(data, PickleStep):
+            argument, table = data.argument, None
+            if argument is not None and argument.data_table is not None:
+                table = Table.from_data_table(argument.data_table)
+                argument = None if argument.doc_string is None else PickleStepArgument(doc_string=argument.doc_string)
+            return cls(  # type: ignore[call-arg]
+                id=data.id,
+                text=data.text,
+                type=data.type,
+                ast_node_ids=data.ast_node_ids,
+                argument=argument,
+                table=table,
+            )
+        argument_data, table = data.get("argument"), None
+        if argument_data is not None and "dataTable" in argument_data:
+            # Table is built from the compiled data without validation of every cell
+            table = Table.from_rows(
+                [[cell["value"] for cell in row["cells"]] for row in argument_data["dataTable"]["rows"]]
+            )
+            argument_data = {key: value for key, value in argument_data.items() if key != "dataTable"} or None
+        return cls(  # type: ignore[call-arg]
+            id=data["id"],
+            text=data["text"],
+            type=StepType(data["type"]) if "type" in data else None,
+            ast_node_ids=data["astNodeIds"],
+            argument=None if argument_data is None else PickleStepArgument.model_validate(argument_data),
+            table=table,
+        )
+
+    def to_message(self) -> PickleStep:
+        return PickleStep(
+            id=self.id, text=self.text, type=self.type, ast_node_ids=list(self.ast_node_ids), argument=self.argument
+        )
+
+
+def _to_steps(steps: Iterable[CompactPickleStep]) -> Tuple[CompactPickleStep, ...]:
+    return tuple(steps)
+
+
+def _to_tags(tags: Iterable[CompactPickleTag]) -> Tuple[CompactPickleTag, ...]:
+    return tuple(tags)
+
+
+@attrs(slots=True)
+class CompactPickle:
+    id: str = attrib()
+    uri: str = attrib(converter=intern)
+    name: str = attrib(converter=intern)
+    language: str = attrib(converter=intern)
+    steps: Tuple[CompactPickleStep, ...] = attrib(converter=_to_steps)
+    tags: Tuple[CompactPickleTag, ...] = attrib(converter=_to_tags)
+    ast_node_ids: Tuple[str, ...] = attrib(converter=_intern_all)
+
+    # Linked from the gherkin document of the feature
+    description: Optional[str] = attrib(default=None, eq=False)
+
+    @classmethod
+    def load(cls, data: Union[Mapping[str, Any], Pickle]) -> "CompactPickle":
+        if isinstance(data, Pickle):
+            return cls(  # type: ignore[call-arg]
+                id=data.id,
+                uri=data.uri,
+                name=data.name,
+                language=data.language,
+                steps=map(CompactPickleStep.load, data.steps),
+                tags=(CompactPickleTag(name=tag.name, ast_node_id=tag.ast_node_id) for tag in data.tags),  # type: ignore[call-arg]
+                ast_node_ids=data.ast_node_ids,
+            )
+        return cls(  # type: ignore[call-arg]
+            id=data["id"],
+            uri=data["uri"],
+            name=data["name"],
+            language=data["language"],
+            steps=map(CompactPickleStep.load, data["steps"]),
+            tags=(CompactPickleTag(name=tag["name"], ast_node_id=tag["astNodeId"]) for tag in data["tags"]),  # type: ignore[call-arg]
+            ast_node_ids=data["astNodeIds"],
+        )
+
+    def to_message(self) -> Pickle:
+        return Pickle(
+            id=self.id,
+            uri=self.uri,
+            name=self.name,
+            language=self.language,
+            steps=[step.to_message() for step in self.steps],
+            tags=[tag.to_message() for tag in self.tags],
+            ast_node_ids=list(self.ast_node_ids),
+        )
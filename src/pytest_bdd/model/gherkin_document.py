@@ -20,8 +20,9 @@ Syntax example:
 one line.
 """
 from itertools import chain
+from sys import intern
 from textwrap import dedent
-from typing import Sequence, Union, cast
+from typing import Iterable, List, Sequence, Union, cast
 
 from attr import Factory, attrib, attrs
 from gherkin.errors import CompositeParserException  # type: ignore[import]
@@ -41,9 +42,15 @@ from messages import (  # type:ignore[attr-defined]
     Tag,
 )
 from pytest_bdd.const import TAG_PREFIX
+from pytest_bdd.model.compact import CompactPickle, CompactPickleStep
+from pytest_bdd.model.table import Table
 from pytest_bdd.utils import _itemgetter, deepattrgetter
 
 
+def to_compact_pickles(pickles: Iterable[Union[CompactPickle, Pickle]]) -> List[CompactPickle]:
+    return [pickle if isinstance(pickle, CompactPickle) else CompactPickle.load(pickle) for pickle in pickles]
+
+
 @attrs
 class Feature:
     gherkin_document: GherkinDocument = attrib()
@@ -51,14 +58,48 @@ class Feature:
     filename: str = attrib()
 
     registry: dict = attrib(default=Factory(dict))
-    pickles: Sequence[Pickle] = attrib(default=Factory(list))
+    pickles: Sequence[CompactPickle] = attrib(default=Factory(list), converter=to_compact_pickles)
 
     def __attrs_post_init__(self):
         self.fill_registry()
+        self.link_pickles()
 
     @staticmethod
-    def load_pickles(scenarios_data) -> Sequence[Pickle]:
-        return [*map(Pickle.model_validate, scenarios_data)]  # type: ignore[attr-defined] # migration to pydantic2
+    def load_pickles(scenarios_data) -> Sequence[CompactPickle]:
+        return [*map(CompactPickle.load, scenarios_data)]
+
+    def link_pickles(self):
+        """Link pickles with data of gherkin document nodes they were compiled from"""
+        for pickle in self.pickles:
+            if pickle.ast_node_ids and (scenario := self.registry.get(pickle.ast_node_ids[0])) is not None:
+                pickle.description = scenario.description
+            for step in pickle.steps:
+                self.link_step(step)
+
+    def link_step(self, step: CompactPickleStep) -> CompactPickleStep:
+        """Link step with data of gherkin document step it was compiled from"""
+        model_step: Union[Step, None] = self._get_pickle_step_model_step(step)
+        if model_step is not None:
+            step.keyword = intern(model_step.keyword.strip())
+            step.line_number = location.line if (location := model_step.location) is not None else -1
+            step.doc_string = model_step.doc_string
+            step.data_table = model_step.data_table
+        return step
+
+    def release(self):
+        """Drop gherkin document nodes, AST registry and pickles; keep feature header sufficient for reporting"""
+        for pickle in self.pickles:
+            for step in pickle.steps:
+                step.doc_string = step.data_table = step.table = None
+        feature_message = self.gherkin_document.feature
+        self.gherkin_document = self.gherkin_document.model_copy(
+            update=dict(
+                comments=[],
+                feature=None if feature_message is None else feature_message.model_copy(update=dict(children=[])),
+            )
+        )
+        self.registry = {}
+        self.pickles = []
 
     def fill_registry(self):
         self.registry.update(self.get_child_ids_gen(self.gherkin_document.feature))
@@ -169,6 +210,14 @@ class Feature:
         )
         return f"[table_rows:[{table_rows_lines}]]" if table_rows_lines else ""
 
+    def build_pickle_key(self, pickle) -> str:
+        """Build pickle identity which is stable between runs; doesn't depend on ids of messages"""
+        return f"{self.uri}::{pickle.name}{self.build_pickle_table_rows_breadcrumb(pickle)}"
+
+    def get_pickle_examples_tables(self, pickle) -> List[Table]:
+        """Columnar tables of examples of the scenario outline the pickle was compiled from"""
+        return [Table.from_examples(examples) for examples in self._get_pickle_ast_scenario(pickle).examples]
+
     def _get_pickle_ast_table_rows(self, pickle):
         return list(filter(lambda node: type(node) is TableRow, self._get_linked_ast_nodes(pickle)))
 
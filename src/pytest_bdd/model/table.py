@@ -0,0 +1,102 @@
+"""Columnar tables.
+
+Data tables of steps and examples tables are exposed by columns: cell values of every column are kept as a tuple of
+interned strings under the column name, instead of one message object per cell. Tables could be converted to NumPy
+structured arrays or pandas data frames if those libraries are installed.
+"""
+from sys import intern
+from typing import Any, Iterable, Iterator, Mapping, Sequence, Tuple
+
+from attr import attrib, attrs
+
+from messages import PickleTable, PickleTableCell, PickleTableRow  # type:ignore[attr-defined]
+
+
+def _intern_all(strings: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(map(intern, strings))
+
+
+def _intern_columns(columns: Iterable[Iterable[str]]) -> Tuple[Tuple[str, ...], ...]:
+    return tuple(map(_intern_all, columns))
+
+
+@attrs(slots=True, frozen=True)
+class Table(Mapping[str, Tuple[str, ...]]):
+    """Table mapping column names to column values; the first row of the source table is the header"""
+
+    header: Tuple[str, ...] = attrib(converter=_intern_all)
+    columns: Tuple[Tuple[str, ...], ...] = attrib(converter=_intern_columns)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[str]]) -> "Table":
+        header, *body = [*rows] or [()]
+        return cls(header=header, columns=zip(*body) if body else ((),) * len(header))  # type: ignore[call-arg]
+
+    @classmethod
+    def from_data_table(cls, data_table: Any) -> "Table":
+        """Build table from data table of gherkin document step or pickle step"""
+        return cls.from_rows([[cell.value for cell in row.cells] for row in data_table.rows])
+
+    @classmethod
+    def from_examples(cls, examples: Any) -> "Table":
+        """Build table from examples of gherkin document scenario outline"""
+        rows = examples.table_body if examples.table_header is None else [examples.table_header, *examples.table_body]
+        return cls.from_rows([[cell.value for cell in row.cells] for row in rows])
+
+    def __getitem__(self, name: str) -> Tuple[str, ...]:
+        try:
+            index = self.header.index(name)
+        except ValueError:
+            raise KeyError(name) from None
+        if name in self.header[index + 1 :]:
+            raise ValueError(f"Column name {name!r} is not unique in the table header; use rows to get its cells")
+        return self.columns[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.header)
+
+    def __len__(self) -> int:
+        return len(self.header)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    @property
+    def duplicate_names(self) -> Tuple[str, ...]:
+        """Column names which are met in the header more than once"""
+        return tuple(dict.fromkeys(name for index, name in enumerate(self.header) if name in self.header[:index]))
+
+    @property
+    def rows(self) -> Iterator[Tuple[str, ...]]:
+        """Rows of the table body"""
+        return zip(*self.columns)
+
+    def to_pickle_table(self) -> PickleTable:
+        return PickleTable(
+            rows=[
+                PickleTableRow(cells=[PickleTableCell(value=value) for value in row])
+                for row in (self.header, *self.rows)
+            ]
+        )
+
+    def to_numpy(self):
+        """Convert table into NumPy structured array; requires numpy to be installed"""
+        if self.duplicate_names:
+            raise ValueError(
+                f"Table with not unique column names {', '.join(map(repr, self.duplicate_names))} "
+                "could not be converted into NumPy structured array"
+            )
+        import numpy
+
+        return numpy.rec.fromarrays(
+            [numpy.array(column, dtype=str) for column in self.columns], names=list(self.header)
+        )
+
+    def to_pandas(self):
+        """Convert table into pandas data frame; requires pandas to be installed"""
+        import pandas
+
+        data_frame = pandas.DataFrame(dict(enumerate(self.columns)), columns=range(len(self.header)))
+        data_frame.columns = list(self.header)
+        return data_frame
@@ -19,10 +19,14 @@ from pytest_bdd.exceptions import FeatureError
 from pytest_bdd.model import Feature
 from pytest_bdd.utils import PytestBDDIdGeneratorHandler
 
-if STRUCT_BDD_INSTALLED:  # pragma: no cover
-    from pytest_bdd.struct_bdd.parser import StructBDDParser
 
-    assert StructBDDParser  # type: ignore[truthy-function]
+def __getattr__(name):
+    # StructBDD parser is imported on first use, because its models are heavy to import
+    if name == "StructBDDParser" and STRUCT_BDD_INSTALLED:
+        from pytest_bdd.struct_bdd.parser import StructBDDParser
+
+        return StructBDDParser
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @attrs
@@ -2,23 +2,39 @@ from collections import deque
 from contextlib import suppress
 from functools import partial
 from inspect import signature
-from itertools import chain, starmap
-from operator import attrgetter, contains, methodcaller
+from itertools import chain, groupby
+from operator import attrgetter, contains, itemgetter, methodcaller
 from pathlib import Path
 from types import ModuleType
-from typing import Any, Collection, Deque, Iterable, Optional, Sequence, Union
+from typing import Any, Callable, Collection, Deque, Iterable, Optional, Sequence, Tuple, Union, cast
 from unittest.mock import patch
 
 import pytest
 from _pytest.nodes import Collector
-from pathvalidate import is_valid_filepath
 
 from messages import Pickle  # type:ignore[attr-defined]
+from messages import Source  # type:ignore[attr-defined]
 from messages import PickleStep as Step  # type:ignore[attr-defined]
-from pytest_bdd import cucumber_json, generation, gherkin_terminal_reporter, given, steps, then, when
-from pytest_bdd.allure_logging import AllurePytestBDD
+from pytest_bdd import (
+    binding,
+    cucumber_json,
+    dry_run,
+    feature_release,
+    generation,
+    gherkin_terminal_reporter,
+    given,
+    history,
+    impact,
+    shard,
+    steps,
+    then,
+    tracing,
+    watch,
+    when,
+)
 from pytest_bdd.collector import FeatureFileModule as FeatureFileCollector
 from pytest_bdd.collector import Module as ModuleCollector
+from pytest_bdd.compatibility.allure import ALLURE_INSTALLED
 from pytest_bdd.compatibility.pytest import (
     PYTEST7,
     Config,
@@ -30,6 +46,8 @@ from pytest_bdd.compatibility.pytest import (
     PytestPluginManager,
 )
 from pytest_bdd.compatibility.struct_bdd import STRUCT_BDD_INSTALLED
+from pytest_bdd.const import SCENARIO_BATCH_MARK, SINGLE_ITEM_TAG
+from pytest_bdd.feature_sources import get_feature_source_store
 from pytest_bdd.message_plugin import MessagePlugin
 from pytest_bdd.mimetypes import Mimetype
 from pytest_bdd.model import Feature
@@ -37,7 +55,7 @@ from pytest_bdd.parser import GherkinParser
 from pytest_bdd.parsers import cucumber_expression
 from pytest_bdd.reporting import ScenarioReporterPlugin
 from pytest_bdd.runner import ScenarioRunner
-from pytest_bdd.scenario import FeaturePathType
+from pytest_bdd.scenario import FeaturePathType, SingleItemMode
 from pytest_bdd.scenario import add_options as scenario_add_options
 from pytest_bdd.scenario import scenarios
 from pytest_bdd.scenario_locator import FileScenarioLocator, UrlScenarioLocator
@@ -66,13 +84,13 @@ def trace() -> None:
 __registry = StepHandler.Registry()
 
 
-@pytest.fixture
 def step_registry() -> StepHandler.Registry:
     """Fixture containing registry of all user-defined steps"""
     return __registry
 
 
 step_registry.__pytest_bdd_step_registry__ = __registry  # type: ignore[attr-defined]
+step_registry = pytest.fixture(step_registry)
 
 
 @pytest.fixture
@@ -95,7 +113,7 @@ def parameter_type_registry():
 
 @pytest.fixture
 def attach(request: FixtureRequest):
-    """Fixture parameter type registry for Cucumber expressions"""
+    """Fixture to attach text, bytes, file objects or paths to the current test case"""
 
     def add_attachment(attachment, media_type: Optional[str] = None, file_name=None):
         request.config.hook.pytest_bdd_attach(
@@ -105,6 +123,21 @@ def attach(request: FixtureRequest):
     return add_attachment
 
 
+@pytest.fixture
+def feature_source(request: FixtureRequest, feature: Feature) -> Optional[Source]:
+    """Fixture containing source of the current feature"""
+    return get_feature_source_store(request.config).get(feature)
+
+
+@pytest.fixture
+def bdd_traceparent(request: FixtureRequest) -> Callable[[], Optional[str]]:
+    """Fixture providing W3C traceparent header value of the current step or scenario span (None if not traced)"""
+    tracing_plugin = request.config.pluginmanager.getplugin("pytest_bdd_tracing")
+    if tracing_plugin is None:
+        return lambda: None
+    return cast(Callable[[], Optional[str]], tracing_plugin.get_traceparent)
+
+
 def pytest_addoption(parser: Parser) -> None:
     """Add pytest-bdd options."""
     add_bdd_ini(parser)
@@ -112,13 +145,28 @@ def pytest_addoption(parser: Parser) -> None:
     scenario_add_options(parser)
     cucumber_json.add_options(parser)
     generation.add_options(parser)
+    dry_run.add_options(parser)
+    binding.add_options(parser)
+    feature_release.add_options(parser)
     gherkin_terminal_reporter.add_options(parser)
+    shard.add_options(parser)
+    impact.add_options(parser)
+    watch.add_options(parser)
+    history.add_options(parser)
+    tracing.add_options(parser)
     MessagePlugin.add_options(parser)
 
 
 def add_bdd_ini(parser: Parser) -> None:
     parser.addini("bdd_features_base_dir", "Base features directory.")
     parser.addini("bdd_features_base_url", "Base features url.")
+    parser.addini(
+        "bdd_features_ignore",
+        type="linelist",
+        default=[".*", "*.egg", "__pycache__", "node_modules", "venv"],
+        help="Glob patterns of file or directory names, or of their paths relative to the base features directory "
+        "if patterns contain separators, which are skipped when feature files are searched.",
+    )
 
 
 @pytest.mark.trylast
@@ -126,12 +174,25 @@ def pytest_configure(config: Config) -> None:
     """Configure all subplugins."""
     config.addinivalue_line("markers", "pytest_bdd_scenario: marker to identify pytest_bdd tests")
     config.addinivalue_line("markers", "scenarios: marker to provide scenarios locator")
+    config.addinivalue_line("markers", f"{SCENARIO_BATCH_MARK}: marker to provide scenarios executed as a single item")
+    config.addinivalue_line("markers", f"{SINGLE_ITEM_TAG}: run scenario outline or feature as a single item")
+    _get_ini_single_item_mode(config)
     cucumber_json.configure(config)
     gherkin_terminal_reporter.configure(config)
+    shard.configure(config)
+    impact.configure(config)
+    history.configure(config)
+    tracing.configure(config)
+    dry_run.configure(config)
+    binding.configure(config)
+    feature_release.configure(config)
     config.pluginmanager.register(ScenarioReporterPlugin())
-    config.pluginmanager.register(ScenarioRunner())
+    config.pluginmanager.register(ScenarioRunner(), name="pytest_bdd_runner")
     config.pluginmanager.register(MessagePlugin(config=config), name="pytest_bdd_messages")  # type: ignore[call-arg]
-    config.__allure_plugin__ = AllurePytestBDD.register_if_allure_accessible(config)  # type: ignore[attr-defined]
+    if ALLURE_INSTALLED and config.pluginmanager.hasplugin("allure_pytest"):
+        from pytest_bdd.allure_logging import AllurePytestBDD
+
+        config.__allure_plugin__ = AllurePytestBDD.register_if_allure_accessible(config)  # type: ignore[attr-defined]
     setdefaultattr(config, "pytest_bdd_id_generator", value_factory=IdGenerator)
     if STRUCT_BDD_INSTALLED:
         config.pluginmanager.register(StructBDDPlugin())
@@ -143,6 +204,14 @@ def pytest_unconfigure(config: Config) -> None:
     with suppress(AttributeError):
         config.__allure_plugin__.unregister(config)  # type: ignore[attr-defined]
     cucumber_json.unconfigure(config)
+    gherkin_terminal_reporter.unconfigure(config)
+    shard.unconfigure(config)
+    impact.unconfigure(config)
+    history.unconfigure(config)
+    tracing.unconfigure(config)
+    dry_run.unconfigure(config)
+    binding.unconfigure(config)
+    feature_release.unconfigure(config)
 
 
 def _pytest_pycollect_makemodule():
@@ -227,6 +296,8 @@ def _build_scenario_locators_from_mark(mark: Mark, config: Config) -> Iterable[A
     if features_path_type is FeaturePathType.PATH:
         file_locator_feature_paths = feature_paths
     elif features_path_type is FeaturePathType.UNDEFINED:
+        from pathvalidate import is_valid_filepath
+
         file_locator_feature_paths = [*filter(lambda p: is_valid_filepath(Path(p), platform="auto"), feature_paths)]
     else:
         file_locator_feature_paths = []
@@ -264,21 +335,84 @@ def _build_scenario_locators_from_mark(mark: Mark, config: Config) -> Iterable[A
     return chain(*locators_iterables)
 
 
-def _build_scenario_param(feature: Feature, pickle: Pickle, feature_data: str, config: Config):
+def _build_scenario_marks(feature: Feature, pickle: Pickle, config: Config):
     marks = []
     for tag in feature._get_pickle_tag_names(pickle):
         tag_marks = config.hook.pytest_bdd_convert_tag_to_marks(feature=feature, scenario=pickle, tag=tag)
         if tag_marks is not None:
             marks.extend(tag_marks)
+    return marks
+
+
+def _build_scenario_param(feature: Feature, pickle: Pickle, config: Config):
     return pytest.param(
         feature,
         pickle,
-        feature_data,
         id=f"{feature.uri}-{feature.name}-{pickle.name}{feature.build_pickle_table_rows_breadcrumb(pickle)}",
-        marks=marks,
+        marks=_build_scenario_marks(feature, pickle, config),
     )
 
 
+def _get_single_item_mode(feature: Feature, pickle: Pickle, config: Config) -> SingleItemMode:
+    if SINGLE_ITEM_TAG in feature._get_pickle_tag_names(pickle):
+        return SingleItemMode.FEATURE if SINGLE_ITEM_TAG in feature.tag_names else SingleItemMode.OUTLINE
+    return _get_ini_single_item_mode(config)
+
+
+def _get_ini_single_item_mode(config: Config) -> SingleItemMode:
+    value = config.getini("bdd_single_item")
+    try:
+        return SingleItemMode(value)
+    except ValueError:
+        raise pytest.UsageError(
+            f'bdd_single_item has to be "{SingleItemMode.OUTLINE.value}", "{SingleItemMode.FEATURE.value}" '
+            f"or empty; got {value!r}"
+        ) from None
+
+
+def _build_scenario_params(
+    feature_scenario_feature_source: Iterable[Tuple[Feature, Pickle, Optional[Source]]], config: Config
+):
+    """Build parameters for scenarios; scenarios which have to be run as a single item are batched together.
+
+    Feature sources are not a part of parameters; they are kept by the session-level store.
+    """
+    feature_source_store = get_feature_source_store(config)
+
+    def batch_key(feature_pickle_feature_source):
+        feature, pickle, feature_source = feature_pickle_feature_source
+        feature_source_store.add(feature, feature_source)
+        mode = _get_single_item_mode(feature, pickle, config)
+        # Only scenarios with same tags could be batched, because they are converted to the same marks
+        tag_names = tuple(feature._get_pickle_tag_names(pickle))
+        if mode is SingleItemMode.FEATURE:
+            return feature.uri, tag_names
+        elif mode is SingleItemMode.OUTLINE:
+            return feature.uri, pickle.ast_node_ids[0], tag_names
+        else:
+            return id(pickle)
+
+    for key, batch in groupby(feature_scenario_feature_source, key=batch_key):
+        feature, pickle, _ = next(batch)
+        pickles = [pickle, *map(itemgetter(1), batch)]
+        if len(pickles) == 1:
+            yield _build_scenario_param(feature, pickle, config)
+        else:
+            if _get_single_item_mode(feature, pickle, config) is SingleItemMode.FEATURE:
+                param_id = f"{feature.uri}-{feature.name}"
+            else:
+                param_id = f"{feature.uri}-{feature.name}-{feature._get_pickle_ast_scenario(pickle).name}"
+            yield pytest.param(
+                feature,
+                pickle,
+                id=param_id,
+                marks=[
+                    *_build_scenario_marks(feature, pickle, config),
+                    getattr(pytest.mark, SCENARIO_BATCH_MARK)(pickles),
+                ],
+            )
+
+
 chain_map = compose(chain.from_iterable, map)
 
 
@@ -294,13 +428,23 @@ def pytest_generate_tests(metafunc: Metafunc):
         feature_scenario_feature_source = chain_map(methodcaller("resolve", config), locators)
 
         metafunc.parametrize(
-            "feature, scenario, feature_source",
-            starmap(partial(_build_scenario_param, config=config), feature_scenario_feature_source),
+            "feature, scenario",
+            _build_scenario_params(feature_scenario_feature_source, config=config),
         )
 
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection_finish(session):
+    yield
+    # Sources are emitted by the end of collection; they are read again on demand
+    get_feature_source_store(session.config).release()
+
+
 def pytest_cmdline_main(config: Config) -> Optional[int]:
-    return generation.cmdline_main(config)
+    exit_code = generation.cmdline_main(config)
+    if exit_code is None:
+        exit_code = watch.cmdline_main(config)
+    return exit_code
 
 
 def _pytest_collect_file(parent: Collector, file_path=None):
@@ -347,6 +491,10 @@ def pytest_bdd_get_mimetype(config: Config, path: Path):
         return Mimetype.gherkin_plain.value
 
 
+def pytest_bdd_get_feature_file_suffixes(config: Config):
+    return [".gherkin", ".feature"]
+
+
 def pytest_bdd_get_parser(config: Config, mimetype: str):
     return {Mimetype.gherkin_plain.value: GherkinParser}.get(mimetype)
 
@@ -2,15 +2,20 @@
 
 Collection of the scenario execution statuses, timing and other information
 that enriches the pytest test reporting.
+
+Scenario payload is attached once per test (to the call report, or to the failed teardown one). Payloads of the
+same feature share the single feature metadata dict; when reports are transferred from xdist workers, feature
+metadata is sent once per worker and referenced by id, and the controller links it back into received payloads.
 """
 import time
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pytest
 from attr import Factory, attrib, attrs
 
 from messages import Pickle, PickleStep  # type:ignore[attr-defined]
-from pytest_bdd.compatibility.pytest import CallInfo, FixtureRequest, Item
+from pytest_bdd.compatibility.pytest import CallInfo, Config, FixtureRequest, Item, TestReport
+from pytest_bdd.exceptions import StepDefinitionNotFoundError
 from pytest_bdd.model import Feature
 
 
@@ -19,6 +24,8 @@ class StepReport:
 
     failed = False
     stopped = None
+    # Status differing from passed/failed one (e.g. of undefined steps); serialized only if set
+    status: Optional[str] = None
 
     def __init__(self, step: PickleStep) -> None:
         """StepHandler report constructor.
@@ -34,7 +41,7 @@ class StepReport:
         :return: Serialized step execution report.
         :rtype: dict
         """
-        return {
+        serialized_step_report = {
             "name": self.step.text,
             "type": feature._get_step_prefix(self.step),
             "keyword": feature._get_step_keyword(self.step),
@@ -42,14 +49,19 @@ class StepReport:
             "failed": self.failed,
             "duration": self.duration,
         }
+        if self.status is not None:
+            serialized_step_report["status"] = self.status
+        return serialized_step_report
 
-    def finalize(self, failed: bool) -> None:
+    def finalize(self, failed: bool, status: Optional[str] = None) -> None:
         """Stop collecting information and finalize the report.
 
         :param bool failed: Whether the step execution is failed.
+        :param status: Status of the step, if it differs from passed/failed.
         """
         self.stopped = time.perf_counter()
         self.failed = failed
+        self.status = status
 
     @property
     def duration(self) -> float:
@@ -89,9 +101,10 @@ class ScenarioReport:
         """
         self.step_reports.append(step_report)
 
-    def serialize(self) -> Dict[str, Any]:
+    def serialize(self, serialized_feature: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Serialize scenario execution report in order to transfer reporting from nodes in the distributed mode.
 
+        :param serialized_feature: Already serialized feature metadata to be shared between scenario reports.
         :return: Serialized report.
         :rtype: dict
         """
@@ -103,14 +116,7 @@ class ScenarioReport:
             "name": pickle.name,
             "line_number": feature._get_pickle_line_number(pickle),
             "tags": sorted(set(feature._get_pickle_tag_names(pickle)).difference(feature.tag_names)),
-            "feature": {
-                "name": feature.name,
-                "filename": feature.filename,
-                "rel_filename": feature.rel_filename,
-                "line_number": feature.line_number,
-                "description": feature.description,
-                "tags": feature.tag_names,
-            },
+            "feature": serialize_feature(feature) if serialized_feature is None else serialized_feature,
         }
 
     def fail(self) -> None:
@@ -125,26 +131,118 @@ class ScenarioReport:
             self.add_step_report(report)
 
 
+def serialize_feature(feature: Feature) -> Dict[str, Any]:
+    return {
+        "name": feature.name,
+        "filename": feature.filename,
+        "rel_filename": feature.rel_filename,
+        "line_number": feature.line_number,
+        "description": feature.description,
+        "tags": feature.tag_names,
+    }
+
+
 class ScenarioReporterPlugin:
+    # Report data keys used to transfer feature metadata from xdist workers
+    FEATURES_KEY = "bdd_features"
+
     def __init__(self):
-        self.current_report = None
+        self.current_reports: List[ScenarioReport] = []
+        # Serialized features by filename; shared by scenario payloads of the same feature
+        self.serialized_features: Dict[str, Dict[str, Any]] = {}
+        # Worker ids of features and keys of reports which carry their serialized features, by filename;
+        # features are kept by every serialization of the carrier report, as reports could be serialized several times
+        self.feature_ids: Dict[str, Tuple[str, Tuple[str, Optional[str]]]] = {}
+        # Features received by the controller from workers, by id
+        self.received_features: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def current_report(self) -> Optional[ScenarioReport]:
+        return self.current_reports[-1] if self.current_reports else None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_logstart(self, nodeid, location):
+        # Items could be run without setup, e.g. by the dry run
+        self.current_reports = []
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item: Item):
+        self.current_reports = []
+
+    def serialize_scenario_report(self, scenario_report: ScenarioReport) -> Dict[str, Any]:
+        feature = scenario_report.feature
+        serialized_feature = self.serialized_features.get(feature.filename)
+        if serialized_feature is None:
+            serialized_feature = self.serialized_features[feature.filename] = serialize_feature(feature)
+        return scenario_report.serialize(serialized_feature)
 
     @pytest.hookimpl(hookwrapper=True)
     def pytest_runtest_makereport(self, item: Item, call: CallInfo):
         outcome = yield
-        if call.when != "setup":
-            rep = outcome.get_result()
-            """Store item in the report object."""
-            scenario_report: ScenarioReport = self.current_report
+        if call.when == "setup":
+            return
+        rep = outcome.get_result()
+        # Scenario payload is attached once per test: teardown report gets it only if it has to be reported
+        if call.when == "teardown" and not rep.failed:
+            return
+        """Store item in the report object."""
+        scenario_report: Optional[ScenarioReport] = self.current_report
+
+        if scenario_report is not None:
+            rep.scenario = self.serialize_scenario_report(scenario_report)
+            rep.item = {"name": item.name}
+            if len(self.current_reports) > 1:
+                # Scenarios executed as a single item
+                rep.scenarios = [
+                    rep.scenario if report is scenario_report else self.serialize_scenario_report(report)
+                    for report in self.current_reports
+                ]
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_report_to_serializable(self, config: Config, report: TestReport):
+        outcome = yield
+        data = outcome.get_result()
+        if not hasattr(config, "workerinput") or not isinstance(data, dict) or "scenario" not in data:
+            return
+        features: Dict[str, Dict[str, Any]] = {}
+        report_key = (report.nodeid, report.when)
+
+        def compact(scenario: Dict[str, Any]) -> Dict[str, Any]:
+            feature = scenario["feature"]
+            feature_id, carrier_report_key = self.feature_ids.setdefault(
+                feature["filename"],
+                (f"{config.workerinput['workerid']}:{len(self.feature_ids)}", report_key),  # type: ignore[attr-defined]
+            )
+            if carrier_report_key == report_key:
+                features[feature_id] = feature
+            return {**scenario, "feature": feature_id}
+
+        data["scenario"] = compact(data["scenario"])
+        if "scenarios" in data:
+            data["scenarios"] = [compact(scenario) for scenario in data["scenarios"]]
+        if features:
+            data[self.FEATURES_KEY] = features
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_report_from_serializable(self, config: Config, data: Dict[str, Any]) -> None:
+        if "scenario" not in data:
+            return None
+        self.received_features.update(data.pop(self.FEATURES_KEY, {}))
+
+        def link(scenario: Dict[str, Any]) -> None:
+            if isinstance(scenario["feature"], str):
+                scenario["feature"] = self.received_features[scenario["feature"]]
 
-            if scenario_report is not None:
-                rep.scenario = scenario_report.serialize()
-                rep.item = {"name": item.name}
+        link(data["scenario"])
+        for scenario in data.get("scenarios", ()):
+            link(scenario)
+        # Report itself is built by the default implementation
+        return None
 
     @pytest.hookimpl(tryfirst=True)
     def pytest_bdd_before_scenario(self, request: FixtureRequest, feature: Feature, scenario: Pickle) -> None:
         """Create scenario report for the item."""
-        self.current_report = ScenarioReport(feature=feature, scenario=scenario)  # type: ignore[call-arg]
+        self.current_reports.append(ScenarioReport(feature=feature, scenario=scenario))  # type: ignore[call-arg]
 
     @pytest.hookimpl(tryfirst=True)
     def pytest_bdd_step_error(
@@ -158,14 +256,16 @@ class ScenarioReporterPlugin:
         exception: Exception,
     ) -> None:
         """Finalize the step report as failed."""
-        self.current_report.fail()
+        if (scenario_report := self.current_report) is not None:
+            scenario_report.fail()
 
     @pytest.hookimpl(tryfirst=True)
     def pytest_bdd_before_step(
         self, request: FixtureRequest, feature: Feature, scenario: Pickle, step: PickleStep, step_func: Callable
     ) -> None:
         """Store step start time."""
-        self.current_report.add_step_report(StepReport(step=step))
+        if (scenario_report := self.current_report) is not None:
+            scenario_report.add_step_report(StepReport(step=step))
 
     @pytest.hookimpl(tryfirst=True)
     def pytest_bdd_after_step(
@@ -178,4 +278,19 @@ class ScenarioReporterPlugin:
         step_func_args: dict,
     ) -> None:
         """Finalize the step report as successful."""
-        self.current_report.current_step_report.finalize(failed=False)
+        if (scenario_report := self.current_report) is not None:
+            scenario_report.current_step_report.finalize(
+                failed=False, status="skipped" if request.config.option.bdd_dry_run else None
+            )
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_bdd_step_func_lookup_error(
+        self, request: FixtureRequest, feature: Feature, scenario: Pickle, step: PickleStep, exception: Exception
+    ) -> None:
+        """Report the step which is not bound to a step definition as failed."""
+        step_report = StepReport(step=step)
+        step_report.finalize(
+            failed=True, status="undefined" if isinstance(exception, StepDefinitionNotFoundError) else None
+        )
+        if (scenario_report := self.current_report) is not None:
+            scenario_report.add_step_report(step_report)
@@ -1,28 +1,244 @@
 from collections import deque
-from contextlib import contextmanager
 from functools import partial
+from inspect import isgeneratorfunction
 from itertools import zip_longest
 from operator import attrgetter
-from typing import Optional
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, Union, cast
+from warnings import catch_warnings, filterwarnings, simplefilter, warn_explicit
 
+from attr import Factory, attrib, attrs
 from pluggy import PluginManager
 from pytest import hookimpl
 
 from messages import PickleStep  # type:ignore[attr-defined]
 from pytest_bdd import exceptions
-from pytest_bdd.compatibility.pytest import FixtureRequest, Item, call_fixture_func
-from pytest_bdd.model import Feature
+from pytest_bdd.compatibility.pytest import (
+    Config,
+    FixtureRequest,
+    Item,
+    Session,
+    call_fixture_func,
+    get_item_fixturedefs,
+    setup_item_function_scope,
+    teardown_item_function_scope,
+)
+from pytest_bdd.const import SCENARIO_BATCH_MARK
+from pytest_bdd.model import CompactPickleStep, Feature
 from pytest_bdd.model import Pickle as Scenario
+from pytest_bdd.model import StepType
 from pytest_bdd.steps import StepHandler
-from pytest_bdd.utils import DefaultMapping, get_args, inject_fixture
+from pytest_bdd.utils import DefaultMapping, get_args, get_item_feature_pickle, inject_fixture
+from pytest_bdd.warning_types import PytestBDDAmbiguousStepDefinitionWarning
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pluggy import HookCaller, HookRelay
+
+
+def is_builtin_plugin(plugin: object) -> bool:
+    module_name = getattr(plugin, "__name__", None) if isinstance(plugin, ModuleType) else type(plugin).__module__
+    return module_name == "pytest_bdd" or str(module_name).startswith("pytest_bdd.")
+
+
+def is_hook_call_monitored(plugin_manager: PluginManager) -> bool:
+    """Hook calls are traced or recorded (e.g. by --debug or pytester), so they have to be dispatched by pluggy"""
+    inner_hookexec = getattr(plugin_manager, "_inner_hookexec", None)
+    return getattr(inner_hookexec, "__name__", None) != "_multicall"
+
+
+def build_direct_hook_call(hook_caller: "HookCaller") -> Optional[Callable[..., Any]]:
+    """Build a callable which calls hook implementations directly, bypassing pluggy dispatch.
+
+    Possible only if all implementations belong to pytest-bdd itself and none of them is a hook wrapper;
+    None is returned otherwise.
+    """
+    hookimpls = hook_caller.get_hookimpls()
+    if any(
+        not is_builtin_plugin(hookimpl.plugin) or hookimpl.hookwrapper or getattr(hookimpl, "wrapper", False)
+        for hookimpl in hookimpls
+    ):
+        return None
+    spec = getattr(hook_caller, "spec", None)
+    firstresult = bool(spec is not None and spec.opts.get("firstresult"))
+    # Pluggy calls implementations in reversed order of their registration and priority
+    implementations: List[Tuple[Callable[..., Any], Tuple[str, ...]]] = [
+        (hookimpl.function, hookimpl.argnames) for hookimpl in reversed(hookimpls)
+    ]
+
+    def direct_hook_call(**kwargs):
+        __tracebackhide__ = True
+        results = []
+        for function, argnames in implementations:
+            result = function(*[kwargs[argname] for argname in argnames])
+            if result is not None:
+                if firstresult:
+                    return result
+                results.append(result)
+        return None if firstresult else results
+
+    return direct_hook_call
+
+
+class ExecutionPlan:
+    """Callers of hooks used during scenario execution.
+
+    Hooks implemented only by pytest-bdd are called directly; hooks having third-party implementations are
+    dispatched by pluggy as usual, as well as all hooks if hook calls are monitored.
+    """
+
+    HOOK_NAMES = (
+        "pytest_bdd_before_scenario",
+        "pytest_bdd_run_scenario",
+        "pytest_bdd_after_scenario",
+        "pytest_bdd_get_step_dispatcher",
+        "pytest_bdd_run_step",
+        "pytest_bdd_match_step_definition_to_step",
+        "pytest_bdd_before_step",
+        "pytest_bdd_before_step_call",
+        "pytest_bdd_get_step_caller",
+        "pytest_bdd_after_step",
+        "pytest_bdd_step_error",
+        "pytest_bdd_step_func_lookup_error",
+    )
+
+    def __init__(self, plugin_manager: PluginManager) -> None:
+        self.direct_hook_names: List[str] = []
+        is_monitored = is_hook_call_monitored(plugin_manager)
+        for hook_name in self.HOOK_NAMES:
+            hook_caller = getattr(plugin_manager.hook, hook_name)
+            direct_hook_call = None if is_monitored else build_direct_hook_call(hook_caller)
+            if direct_hook_call is not None:
+                self.direct_hook_names.append(hook_name)
+            setattr(self, hook_name, direct_hook_call or hook_caller)
+
+    if TYPE_CHECKING:  # pragma: no cover
+
+        def __getattr__(self, name: str) -> Callable[..., Any]:
+            ...
+
+
+@attrs(eq=False)
+class StaticFixtureRequest:
+    """Request for the static analysis of the item steps, which doesn't set up the item.
+
+    Only fixtures which are plain functions (like the step matcher or the parameter type registry ones) are evaluated;
+    step registries are resolved from the chain of step registry fixtures visible to the item.
+    """
+
+    item: Item = attrib()
+    step_registry: Optional[StepHandler.Registry] = attrib()
+    fixture_values: Dict[str, Any] = attrib(default=Factory(dict), init=False)
+    # Definitions of fixtures evaluated by the request, so results could be reused by items sharing them
+    fixturedefs: Dict[str, Any] = attrib(default=Factory(dict), init=False)
+    visible_fixturedefs: Dict[str, Any] = attrib(default=Factory(dict), init=False)
+
+    class FixtureNotResolvedError(LookupError):
+        pass
+
+    @property
+    def config(self) -> Config:
+        return cast(Config, self.item.config)
+
+    @property
+    def node(self) -> Item:
+        return self.item
+
+    def getfixturevalue(self, argname: str) -> Any:
+        if argname == "step_registry":
+            return self.step_registry
+        if argname == "request":
+            return self
+        try:
+            return self.fixture_values[argname]
+        except KeyError:
+            pass
+        fixturedef = self.get_fixturedef(argname)
+        if fixturedef is None:
+            raise self.FixtureNotResolvedError(argname)
+        self.fixturedefs[argname] = fixturedef
+        fixture_func = getattr(fixturedef.func, "__pytest_wrapped__", None)
+        fixture_func = fixturedef.func if fixture_func is None else fixture_func.obj
+        if isgeneratorfunction(fixture_func) or fixturedef.params is not None or argname in fixturedef.argnames:
+            raise self.FixtureNotResolvedError(argname)
+        value = self.fixture_values[argname] = fixture_func(
+            **{name: self.getfixturevalue(name) for name in fixturedef.argnames}
+        )
+        return value
+
+    def get_fixturedef(self, argname: str) -> Optional[Any]:
+        """Definition of the fixture visible to the item; None if there is no one"""
+        try:
+            return self.visible_fixturedefs[argname]
+        except KeyError:
+            fixturedefs = get_item_fixturedefs(self.item, argname)
+            fixturedef = self.visible_fixturedefs[argname] = fixturedefs[-1] if fixturedefs else None
+            return fixturedef
+
+
+def build_static_step_registry(
+    item: Item, cache: Dict[Tuple[int, ...], Optional[StepHandler.Registry]]
+) -> Tuple[Tuple[int, ...], Optional[StepHandler.Registry]]:
+    """Build the step registry chain visible to the item without the fixtures setup.
+
+    :return: Chain key and the most specific step registry of the chain
+    """
+    registries: Tuple[StepHandler.Registry, ...] = tuple(
+        filter(
+            None,
+            (
+                getattr(fixturedef.func, "__pytest_bdd_step_registry__", None)
+                for fixturedef in get_item_fixturedefs(item, "step_registry")
+            ),
+        )
+    )
+    chain_key = tuple(map(id, registries))
+    if chain_key not in cache:
+        step_registry: Optional[StepHandler.Registry] = None
+        for registry in registries:
+            # Registries are copied, so "parent" links of the original registries are left untouched
+            static_registry = StepHandler.Registry(registry=registry.registry)  # type: ignore[call-arg]
+            static_registry.parent = step_registry
+            step_registry = static_registry
+        cache[chain_key] = step_registry
+    return chain_key, cache[chain_key]
+
+
+STEP_BINDINGS_ATTR = "__pytest_bdd_step_bindings__"
+
+
+@attrs(frozen=True, slots=True)
+class StepBinding:
+    # Arguments are parsed at every execution, as parameter types could produce stateful objects
+    step_definition: StepHandler.Definition = attrib()
+
+
+def get_step_binding(item: Any, step: PickleStep) -> Optional[StepBinding]:
+    """Get step binding made at collection time; None if the step is not bound"""
+    bindings = getattr(item, STEP_BINDINGS_ATTR, None)
+    return None if bindings is None else bindings.get(id(step))
 
 
 class ScenarioRunner:
     def __init__(self) -> None:
         self.request: Optional[FixtureRequest] = None
         self.feature: Optional[Feature] = None
-        self.scenario = None
-        self.plugin_manager: Optional[PluginManager] = None
+        self.scenario: Optional[Scenario] = None
+        self.plugin_manager: Optional["HookRelay"] = None
+        self.execution_plan: Optional[ExecutionPlan] = None
+
+    @property
+    def hooks(self) -> Union[ExecutionPlan, "HookRelay"]:
+        """Callers of hooks: the execution plan if it is built, the hook relay of the plugin manager otherwise"""
+        return self.execution_plan if self.execution_plan is not None else cast("HookRelay", self.plugin_manager)
+
+    @hookimpl(trylast=True)
+    def pytest_collection_finish(self, session: Session):
+        self.execution_plan = ExecutionPlan(session.config.pluginmanager)
+
+    def pytest_plugin_registered(self, plugin, manager: PluginManager):
+        # Plugins could be registered after collection, so already built plan could become outdated
+        if self.execution_plan is not None:
+            self.execution_plan = ExecutionPlan(manager)
 
     @hookimpl(tryfirst=True)
     def pytest_runtest_call(self, item: Item):
@@ -30,27 +246,69 @@ class ScenarioRunner:
         if "pytest_bdd_scenario" in list(map(attrgetter("name"), item.iter_markers())):
             self.request = item._request
             self.feature = self.request.getfixturevalue("feature")
-            self.scenario = self.request.getfixturevalue("scenario")
             self.plugin_manager = self.request.config.hook
-            self.plugin_manager.pytest_bdd_before_scenario(
-                request=self.request, feature=self.feature, scenario=self.scenario
-            )
-            try:
-                self.plugin_manager.pytest_bdd_run_scenario(
-                    request=self.request,
-                    feature=self.feature,
-                    scenario=self.scenario,
-                )
-            finally:
-                self.plugin_manager.pytest_bdd_after_scenario(
-                    request=self.request, feature=self.feature, scenario=self.scenario
-                )
+
+            batch_mark = item.get_closest_marker(SCENARIO_BATCH_MARK)
+            if batch_mark is None:
+                self.scenario = self.request.getfixturevalue("scenario")
+                self._run_scenario()
+            else:
+                self._run_scenario_batch(item, batch_mark.args[0])
 
             # Allow to test function use updated fixtures directly
             fixturenames = getattr(item, "fixturenames", [])
             for argname in fixturenames:
                 item.funcargs[argname] = item._request.getfixturevalue(argname)
 
+    def _run_scenario(self):
+        __tracebackhide__ = True
+        self.hooks.pytest_bdd_before_scenario(request=self.request, feature=self.feature, scenario=self.scenario)
+        try:
+            self.hooks.pytest_bdd_run_scenario(
+                request=self.request,
+                feature=self.feature,
+                scenario=self.scenario,
+            )
+        finally:
+            self.hooks.pytest_bdd_after_scenario(request=self.request, feature=self.feature, scenario=self.scenario)
+
+    def _run_scenario_batch(self, item: Item, scenarios: Sequence[Scenario]):
+        """Run several scenarios as a single item; function scoped fixtures are set up from scratch for each one.
+
+        Fixtures are reset by full teardown and setup of the item, so failures of them are failures of scenarios
+        """
+        __tracebackhide__ = True
+        failures = []
+        for index, scenario in enumerate(scenarios):
+            if index:
+                try:
+                    teardown_item_function_scope(item)
+                except Exception as exception:
+                    # Teardown is a part of the previous scenario; the next one is run anyway
+                    failures.append((scenarios[index - 1], exception))
+            self.scenario = scenario
+            try:
+                if index:
+                    setup_item_function_scope(item)
+                    self.request = item._request
+                    inject_fixture(self.request, "scenario", scenario)
+                self._run_scenario()
+            except Exception as exception:
+                failures.append((scenario, exception))
+
+        if len(failures) == 1:
+            raise failures[0][1]
+        elif failures:
+            feature = cast(Feature, self.feature)
+            raise exceptions.ScenarioBatchError(
+                f"{len({id(scenario) for scenario, _ in failures})} of {len(scenarios)} scenarios failed:\n"
+                + "\n".join(
+                    f'Scenario "{scenario.name}"{feature.build_pickle_table_rows_breadcrumb(scenario)}: '
+                    f"{type(exception).__name__}: {exception}"
+                    for scenario, exception in failures
+                )
+            ) from failures[0][1]
+
     def pytest_bdd_run_scenario(self, request: FixtureRequest, feature: Feature, scenario: Scenario):
         """Execute the scenarios.
 
@@ -61,9 +319,7 @@ class ScenarioRunner:
         __tracebackhide__ = True
         steps: deque = request.getfixturevalue("steps_left")
         steps.extend(scenario.steps)
-        step_dispatcher = request.config.hook.pytest_bdd_get_step_dispatcher(
-            request=request, feature=feature, scenario=scenario
-        )
+        step_dispatcher = self.hooks.pytest_bdd_get_step_dispatcher(request=request, feature=feature, scenario=scenario)
         return step_dispatcher(steps)
 
     @hookimpl(trylast=True)
@@ -76,75 +332,63 @@ class ScenarioRunner:
             previous_step = None
             while left_steps:
                 step = left_steps.popleft()
-                self.plugin_manager.pytest_bdd_run_step(
+                self.hooks.pytest_bdd_run_step(
                     request=request, feature=feature, scenario=scenario, step=step, previous_step=previous_step
                 )  # type: ignore[call-arg]
                 previous_step = step
 
         return dispatcher
 
-    @contextmanager
-    def extended_step_context(self, feature: Feature, scenario, step):
-        try:
-            if isinstance(step, PickleStep):
-                step.__dict__["doc_string"] = feature._get_step_doc_string(step)
-                step.__dict__["data_table"] = feature._get_step_data_table(step)
-                step.__dict__["keyword"] = feature._get_step_keyword(step)
-                step.__dict__["line_number"] = feature._get_step_line_number(step)
-            scenario.__dict__["description"] = feature.registry[scenario.ast_node_ids[0]].description
-            yield
-        finally:
-            if isinstance(step, PickleStep):
-                step.__dict__.pop("doc_string", None)
-                step.__dict__.pop("data_table", None)
-                step.__dict__.pop("keyword", None)
-                step.__dict__.pop("line_number", None)
-            scenario.__dict__["description"] = None
-
     def pytest_bdd_run_step(self, request, feature: Feature, scenario, step, previous_step):
         __tracebackhide__ = True
-        with self.extended_step_context(feature, scenario, step):
-            hook_kwargs = dict(
-                request=request,
-                feature=feature,
-                scenario=scenario,
-                step=step,
-                previous_step=previous_step,
-            )
+        if isinstance(step, PickleStep):
+            # Steps injected during execution are linked to the feature the same way as collected ones
+            step = feature.link_step(CompactPickleStep.load(step))
+        hook_kwargs = dict(
+            request=request,
+            feature=feature,
+            scenario=scenario,
+            step=step,
+            previous_step=previous_step,
+        )
 
-            try:
-                step_definition = self._match_to_step(step, previous_step)
-            except exceptions.StepDefinitionNotFoundError as exception:
-                hook_kwargs["exception"] = exception
-                request.config.hook.pytest_bdd_step_func_lookup_error(**hook_kwargs)
-                raise
-            else:
-                hook_kwargs["step_func"] = step_definition.func
-                hook_kwargs["step_definition"] = step_definition
+        # Steps could be bound to step definitions at collection time
+        step_binding = get_step_binding(request.node, step)
+        try:
+            step_definition = (
+                self._match_to_step(step, previous_step) if step_binding is None else step_binding.step_definition
+            )
+        except exceptions.StepDefinitionNotFoundError as exception:
+            hook_kwargs["exception"] = exception
+            self.hooks.pytest_bdd_step_func_lookup_error(**hook_kwargs)
+            raise
+        else:
+            hook_kwargs["step_func"] = step_definition.func
+            hook_kwargs["step_definition"] = step_definition
 
-            request.config.hook.pytest_bdd_before_step(**hook_kwargs)
+        self.hooks.pytest_bdd_before_step(**hook_kwargs)
 
-            hook_kwargs["step_func_args"] = {}
-            step_params = step_definition.get_parameters(request, step)
-            try:
-                self._inject_step_parameters_as_fixtures(
-                    step_params=step_params, params_fixtures_mapping=step_definition.params_fixtures_mapping
-                )
+        hook_kwargs["step_func_args"] = {}
+        step_params = step_definition.get_parameters(request, step)
+        try:
+            self._inject_step_parameters_as_fixtures(
+                step_params=step_params, params_fixtures_mapping=step_definition.params_fixtures_mapping
+            )
 
-                step_function_kwargs = dict(self._get_step_function_kwargs(step, step_definition, step_params))
-                hook_kwargs["step_func_args"] = step_function_kwargs
+            step_function_kwargs = dict(self._get_step_function_kwargs(step, step_definition, step_params))
+            hook_kwargs["step_func_args"] = step_function_kwargs
 
-                request.config.hook.pytest_bdd_before_step_call(**hook_kwargs)
+            self.hooks.pytest_bdd_before_step_call(**hook_kwargs)
 
-                step_caller = request.config.hook.pytest_bdd_get_step_caller(**hook_kwargs)
-                step_result = step_caller()
+            step_caller = self.hooks.pytest_bdd_get_step_caller(**hook_kwargs)
+            step_result = step_caller()
 
-                self._inject_target_fixtures(step_definition, step_result)
-                request.config.hook.pytest_bdd_after_step(**hook_kwargs)
-            except Exception as exception:
-                hook_kwargs["exception"] = exception
-                request.config.hook.pytest_bdd_step_error(**hook_kwargs)
-                raise
+            self._inject_target_fixtures(step_definition, step_result)
+            self.hooks.pytest_bdd_after_step(**hook_kwargs)
+        except Exception as exception:
+            hook_kwargs["exception"] = exception
+            self.hooks.pytest_bdd_step_error(**hook_kwargs)
+            raise
 
     @hookimpl(trylast=True)
     def pytest_bdd_get_step_caller(self, request, feature, scenario, step, step_func, step_func_args, step_definition):
@@ -190,7 +434,7 @@ class ScenarioRunner:
 
     def _match_to_step(self, step, previous_step):
         try:
-            return self.request.config.hook.pytest_bdd_match_step_definition_to_step(
+            return self.hooks.pytest_bdd_match_step_definition_to_step(
                 request=self.request,
                 feature=self.feature,
                 scenario=self.scenario,
@@ -199,9 +443,108 @@ class ScenarioRunner:
             )
         except StepHandler.Matcher.MatchNotFoundError as e:
             raise exceptions.StepDefinitionNotFoundError(
-                f'Step definition is not found: "{step.text}". '
-                f'Step keyword: "{step.keyword}". '
-                f"Line {step.line_number} "
-                f'in scenario "{self.scenario.name}" '
-                f'in the feature "{self.feature.uri}"'
+                f'Step definition is not found: "{step.text}". {self._describe_step_location(step)}'
             ) from e
+
+    def _describe_step_location(self, step) -> str:
+        feature, scenario = cast(Feature, self.feature), cast(Scenario, self.scenario)
+        return (
+            f'Step keyword: "{step.keyword}". '
+            f"Line {step.line_number} "
+            f'in scenario "{scenario.name}" '
+            f'in the feature "{feature.uri}"'
+        )
+
+    def dry_run(self, item: Item, step_registries: Dict[Tuple[int, ...], Any], matches: Dict[Tuple[Any, ...], Any]):
+        """Bind steps of the item scenarios to step definitions, without calling steps and setting up fixtures.
+
+        :param step_registries: Cache of static step registries chains shared between items.
+        :param matches: Cache of step definitions matched to typed steps, shared between items.
+        """
+        __tracebackhide__ = True
+        feature, pickle = get_item_feature_pickle(item)
+        batch_mark = item.get_closest_marker(SCENARIO_BATCH_MARK)
+        chain_key, step_registry = build_static_step_registry(item, step_registries)
+
+        self.request = cast(FixtureRequest, StaticFixtureRequest(item=item, step_registry=step_registry))
+        self.feature = feature
+        self.plugin_manager = item.config.hook
+
+        errors = []
+        with catch_warnings():
+            # Ambiguous steps are reported as errors by the dry run
+            filterwarnings("ignore", category=PytestBDDAmbiguousStepDefinitionWarning)
+            for scenario in [pickle] if batch_mark is None else batch_mark.args[0]:
+                self.scenario = scenario
+                self.hooks.pytest_bdd_before_scenario(request=self.request, feature=self.feature, scenario=scenario)
+                try:
+                    previous_step = None
+                    for step in scenario.steps:
+                        error = self._dry_run_step(step, previous_step, chain_key, matches)
+                        if error is not None:
+                            errors.append(error)
+                        previous_step = step
+                finally:
+                    self.hooks.pytest_bdd_after_scenario(request=self.request, feature=self.feature, scenario=scenario)
+
+        if errors:
+            raise exceptions.DryRunError("\n".join(map(str, errors))) from errors[0]
+
+    def _dry_run_step(self, step, previous_step, chain_key, matches) -> Optional[Exception]:
+        hook_kwargs = dict(
+            request=self.request,
+            feature=self.feature,
+            scenario=self.scenario,
+            step=step,
+            previous_step=previous_step,
+        )
+
+        # Steps of unknown type are matched in the context of the previous ones, so they are not cached
+        match_key = (chain_key, step.type, step.text)
+        try:
+            step_definition, alternative_step_definitions = matches[match_key]
+        except KeyError:
+            step_definition, alternative_step_definitions = self._dry_match_to_step(step, previous_step)
+            if step.type is not StepType.unknown:
+                matches[match_key] = step_definition, alternative_step_definitions
+
+        exception: Optional[Exception] = None
+        if step_definition is None:
+            exception = exceptions.StepDefinitionNotFoundError(
+                f'Step definition is not found: "{step.text}". {self._describe_step_location(step)}'
+            )
+        elif alternative_step_definitions:
+            exception = exceptions.AmbiguousStepDefinitionError(
+                f'Several step definitions are matching the step: "{step.text}". '
+                f"{self._describe_step_location(step)}",
+                step_definitions=alternative_step_definitions,
+            )
+        if exception is not None:
+            hook_kwargs["exception"] = exception
+            self.hooks.pytest_bdd_step_func_lookup_error(**hook_kwargs)
+            return exception
+
+        hook_kwargs["step_func"] = step_definition.func
+        hook_kwargs["step_definition"] = step_definition
+        self.hooks.pytest_bdd_before_step(**hook_kwargs)
+        hook_kwargs["step_func_args"] = {}
+        self.hooks.pytest_bdd_after_step(**hook_kwargs)
+        return None
+
+    def _dry_match_to_step(self, step, previous_step):
+        """Match the step; alternative step definitions are returned if the match is ambiguous"""
+        with catch_warnings(record=True) as caught_warnings:
+            simplefilter("always")
+            try:
+                step_definition = self._match_to_step(step, previous_step)
+            except exceptions.StepDefinitionNotFoundError:
+                step_definition = None
+        alternative_step_definitions: Sequence[StepHandler.Definition] = ()
+        for caught_warning in caught_warnings:
+            if isinstance(caught_warning.message, PytestBDDAmbiguousStepDefinitionWarning):
+                alternative_step_definitions = caught_warning.message.step_definitions
+            else:
+                warn_explicit(
+                    caught_warning.message, caught_warning.category, caught_warning.filename, caught_warning.lineno
+                )
+        return step_definition, alternative_step_definitions
@@ -7,6 +7,7 @@ from pytest import mark
 
 from pytest_bdd.compatibility.parser import ParserProtocol
 from pytest_bdd.compatibility.pytest import Parser
+from pytest_bdd.const import SINGLE_ITEM_TAG
 from pytest_bdd.mimetypes import Mimetype
 from pytest_bdd.utils import compose, make_python_name
 
@@ -29,6 +30,14 @@ def add_options(parser: Parser):
         type="bool",
         help="Turn off feature files autoload",
     )
+    parser.addini(
+        "bdd_single_item",
+        default="",
+        help=(
+            'Run all examples of each scenario outline ("outline") or all scenarios of each feature ("feature") '
+            f'as a single test item; Could be enabled for some outlines or features by "@{SINGLE_ITEM_TAG}" tag'
+        ),
+    )
 
 
 def get_python_name_generator(name: str) -> Iterable[str]:
@@ -55,6 +64,12 @@ class FeaturePathType(Enum):
     UNDEFINED = "undefined"
 
 
+class SingleItemMode(Enum):
+    DISABLED = ""
+    OUTLINE = "outline"
+    FEATURE = "feature"
+
+
 def scenario(
     feature_name: Optional[Union[Path, str]] = None,
     scenario_name: Optional[str] = None,
@@ -136,7 +151,7 @@ def scenarios(
 
     decorator = compose(
         mark.pytest_bdd_scenario,
-        mark.usefixtures("feature", "scenario", "feature_source"),
+        mark.usefixtures("feature", "scenario"),
         mark.scenarios(
             *feature_paths,
             filter_=filter_,
@@ -1,18 +1,30 @@
 import asyncio
 import os
-import ssl
 from contextlib import suppress
+from fnmatch import fnmatchcase
 from functools import partial, reduce
-from itertools import filterfalse
-from operator import methodcaller, truediv
+from glob import has_magic
+from itertools import chain, filterfalse
+from operator import truediv
 from os.path import commonpath
-from pathlib import Path
+from pathlib import Path, PurePath
 from tempfile import NamedTemporaryFile
-from typing import Callable, Iterable, Optional, Protocol, Tuple, Type, Union, cast, runtime_checkable
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Protocol,
+    Tuple,
+    Type,
+    Union,
+    cast,
+    runtime_checkable,
+)
 from urllib.parse import urljoin
 
-import aiohttp
-import certifi
 from _pytest.config import Config
 from attr import Factory, attrib, attrs
 from pydantic import ValidationError
@@ -23,7 +35,12 @@ from pytest_bdd.compatibility.pytest import get_config_root_path
 from pytest_bdd.mimetypes import Mimetype
 from pytest_bdd.model import Feature, Pickle
 from pytest_bdd.scenario import Args
-from pytest_bdd.utils import PytestBDDIdGeneratorHandler, is_local_url
+from pytest_bdd.shard import get_shard_plugin
+from pytest_bdd.utils import PytestBDDIdGeneratorHandler, is_local_url, setdefaultattr
+from pytest_bdd.watch import get_feature_cache
+
+if TYPE_CHECKING:  # pragma: no cover
+    import aiohttp
 
 
 @runtime_checkable
@@ -54,9 +71,11 @@ class ScenarioLocatorFilterMixin(ScenarioLocatorFeatureResolver, ScenarioLocator
         )  # type: ignore
 
     def resolve(self, config: Config):
+        shard_plugin = get_shard_plugin(config)
         for feature, feature_data in self.resolve_features(config):
             for _, pickle in self.filter_scenarios(feature, config):
-                yield feature, pickle, feature_data
+                if shard_plugin is None or shard_plugin.is_selected(feature, pickle):
+                    yield feature, pickle, feature_data
 
 
 @attrs
@@ -68,12 +87,18 @@ class UrlScenarioLocator(ScenarioLocatorFilterMixin):
     parser_type = attrib()
     parse_args = attrib()
 
-    async def fetch(self, session: aiohttp.ClientSession, url):
+    async def fetch(self, session: "aiohttp.ClientSession", url):
+        import ssl
+
+        import certifi
+
         sslcontext = ssl.create_default_context(cafile=certifi.where())
         async with session.get(url, ssl=sslcontext) as response:
             return response.content_type, await response.text(encoding=self.encoding)
 
     async def fetch_all(self, urls):
+        import aiohttp
+
         async with aiohttp.ClientSession() as session:
             return await asyncio.gather(*[self.fetch(session, url) for url in urls], return_exceptions=True)
 
@@ -114,7 +139,8 @@ class UrlScenarioLocator(ScenarioLocatorFilterMixin):
                 parser_type = self.parser_type
 
             if parser_type is None:
-                break
+                # Unparseable files are skipped
+                continue
 
             parser = parser_type(id_generator=cast(PytestBDDIdGeneratorHandler, config).pytest_bdd_id_generator)
 
@@ -142,6 +168,131 @@ class UrlScenarioLocator(ScenarioLocatorFilterMixin):
                         os.unlink(filename)
 
 
+@attrs(eq=False)
+class FeatureFileWalker:
+    """Walker of feature files
+
+    Ignored directories are pruned, files are prefiltered by suffixes of feature files known by mimetype hooks before
+    any hook is called for them; files aren't prefiltered if some plugin detects mimetypes without declaring suffixes.
+    Directory listings are cached, so every directory is scanned once per session.
+    """
+
+    suffixes: Tuple[str, ...] = attrib(converter=tuple)
+    ignore: Tuple[str, ...] = attrib(converter=tuple)
+    # Names of subdirectories (with flags if they are symlinks) and of files by directory path
+    listings: Dict[Path, Tuple[Tuple[Tuple[str, bool], ...], Tuple[str, ...]]] = attrib(
+        default=Factory(dict), init=False
+    )
+
+    @classmethod
+    def from_config(cls, config: Union[Config, PytestBDDIdGeneratorHandler]) -> "FeatureFileWalker":
+        hook_handler = cast(Config, config).hook
+        suffix_plugins = {
+            hookimpl.plugin for hookimpl in hook_handler.pytest_bdd_get_feature_file_suffixes.get_hookimpls()
+        }
+        if any(
+            hookimpl.plugin not in suffix_plugins
+            for hookimpl in hook_handler.pytest_bdd_get_mimetype.get_hookimpls()
+            if not (hookimpl.hookwrapper or getattr(hookimpl, "wrapper", False))
+        ):
+            # Files of plugins which detect mimetypes without declaring their suffixes can't be prefiltered
+            suffixes: Iterable[str] = ()
+        else:
+            suffixes = chain.from_iterable(hook_handler.pytest_bdd_get_feature_file_suffixes(config=config))
+        try:
+            ignore = cast(Config, config).getini("bdd_features_ignore")
+        except (ValueError, KeyError):
+            ignore = []
+        return cls(suffixes=suffixes, ignore=ignore)  # type: ignore[call-arg,arg-type]
+
+    def list_dir(self, dir_path: Path):
+        try:
+            return self.listings[dir_path]
+        except KeyError:
+            pass
+        dir_names, file_names = [], []
+        with suppress(OSError), os.scandir(dir_path) as entries:
+            for entry in entries:
+                with suppress(OSError):
+                    if entry.is_dir():
+                        dir_names.append((entry.name, entry.is_symlink()))
+                    elif entry.is_file():
+                        file_names.append(entry.name)
+        listing = self.listings[dir_path] = (tuple(sorted(dir_names)), tuple(sorted(file_names)))
+        return listing
+
+    def is_ignored(self, path: Path, base_dir: Path) -> bool:
+        """Patterns without separators match names of walked paths, others match paths relative to the base dir;
+        paths out of the base dir are matched only by names
+        """
+        try:
+            rel_path: Optional[str] = PurePath(os.path.relpath(path, base_dir)).as_posix()
+        except ValueError:  # pragma: no cover # different drives on Windows
+            rel_path = None
+        if rel_path is not None and (rel_path == ".." or rel_path.startswith("../")):
+            rel_path = None
+        return any(
+            fnmatchcase(path.name, pattern)
+            if "/" not in pattern
+            else rel_path is not None and fnmatchcase(rel_path, pattern)
+            for pattern in self.ignore
+        )
+
+    def walk(
+        self, dir_path: Path, pattern: Optional[str] = None, prefilter: bool = True, base_dir: Optional[Path] = None
+    ) -> Iterator[Path]:
+        """Walk files matching the glob pattern relative to the directory; all files are walked by default
+
+        :param base_dir: Directory which ignored paths are relative to; the walked one by default
+        """
+        if base_dir is None:
+            base_dir = dir_path
+        # Patterns without parts (e.g. ".") match all files
+        pattern_parts = (PurePath(pattern).parts if pattern else ()) or ("**", "*")
+        # Leading parts without wildcards aren't scanned
+        while len(pattern_parts) > 1 and not has_magic(pattern_parts[0]):
+            dir_path, pattern_parts = dir_path / pattern_parts[0], pattern_parts[1:]
+        if not has_magic(pattern_parts[0]):
+            if (dir_path / pattern_parts[0]).is_file():
+                yield dir_path / pattern_parts[0]
+            return
+        yield from self._walk(dir_path, pattern_parts, base_dir, prefilter and bool(self.suffixes))
+
+    def _walk(self, dir_path: Path, pattern_parts, base_dir: Path, prefilter: bool) -> Iterator[Path]:
+        head, tail = pattern_parts[0], pattern_parts[1:]
+        if head == "**" and not tail:
+            # Matches directories only
+            return
+        dir_names, file_names = self.list_dir(dir_path)
+        if head == "**":
+            yield from self._walk(dir_path, tail, base_dir, prefilter)
+            for dir_name, is_symlink in dir_names:
+                # Recursive wildcard doesn't follow symlinks, same as pathlib one
+                if not is_symlink and not self.is_ignored(dir_path / dir_name, base_dir):
+                    yield from self._walk(dir_path / dir_name, pattern_parts, base_dir, prefilter)
+        elif tail:
+            for dir_name, _ in dir_names:
+                if fnmatchcase(dir_name, head) and not self.is_ignored(dir_path / dir_name, base_dir):
+                    yield from self._walk(dir_path / dir_name, tail, base_dir, prefilter)
+        else:
+            for file_name in file_names:
+                if (
+                    fnmatchcase(file_name, head)
+                    and (not prefilter or file_name.endswith(self.suffixes))
+                    and not self.is_ignored(dir_path / file_name, base_dir)
+                ):
+                    yield dir_path / file_name
+
+
+def get_feature_file_walker(config: Union[Config, PytestBDDIdGeneratorHandler]) -> FeatureFileWalker:
+    return cast(
+        FeatureFileWalker,
+        setdefaultattr(
+            config, "pytest_bdd_feature_file_walker", value_factory=partial(FeatureFileWalker.from_config, config)
+        ),
+    )
+
+
 @attrs
 class FileScenarioLocator(ScenarioLocatorFilterMixin):
     feature_paths = attrib(default=Factory(list))
@@ -167,19 +318,18 @@ class FileScenarioLocator(ScenarioLocatorFilterMixin):
 
         return features_base_dir
 
-    def _gen_feature_paths(self, features_base_dir):
+    def _gen_feature_paths(self, features_base_dir, walker: FeatureFileWalker):
+        # Files of explicitly specified mimetype or parser type aren't prefiltered by known feature file suffixes
+        prefilter = self.mimetype is None and self.parser_type is None
         for feature_pathlike in self.feature_paths:
             if isinstance(feature_pathlike, Path):
                 feature_path = features_base_dir / feature_pathlike
                 if feature_path.is_dir():
-                    yield from filter(methodcaller("is_file"), feature_path.glob("**/*"))
+                    yield from walker.walk(feature_path, prefilter=prefilter, base_dir=features_base_dir)
                 else:
                     yield feature_path
             else:
-                try:
-                    yield from filter(methodcaller("is_file"), features_base_dir.glob(str(feature_pathlike)))
-                except IndexError:
-                    yield from filter(methodcaller("is_file"), features_base_dir.glob("**/*"))
+                yield from walker.walk(features_base_dir, str(feature_pathlike), prefilter=prefilter)
 
     @staticmethod
     def _build_file_uri(features_base_dir: Path, feature_path: Path):
@@ -201,10 +351,12 @@ class FileScenarioLocator(ScenarioLocatorFilterMixin):
         features_base_dir = self._resolve_features_base_dir(config)
         already_resolved_feature_paths = set()
 
-        for feature_path in self._gen_feature_paths(features_base_dir=features_base_dir):
+        walker = get_feature_file_walker(config)
+
+        for feature_path in self._gen_feature_paths(features_base_dir=features_base_dir, walker=walker):
             feature_path_key = str(feature_path)
             if feature_path_key in already_resolved_feature_paths:
-                break
+                continue
 
             uri = self._build_file_uri(features_base_dir, feature_path)
             already_resolved_feature_paths.add(feature_path_key)
@@ -225,17 +377,27 @@ class FileScenarioLocator(ScenarioLocatorFilterMixin):
                 parser_type = self.parser_type
 
             if parser_type is None:
-                break
+                # Unparseable files are skipped
+                continue
 
             parser = parser_type(id_generator=cast(PytestBDDIdGeneratorHandler, config).pytest_bdd_id_generator)
 
-            feature, feature_data = parser.parse(
+            parse = partial(
+                parser.parse,
                 config,
                 feature_path,
                 uri,
                 *self.parse_args.args,
                 **{**dict(encoding=encoding), **self.parse_args.kwargs},
             )
+            feature_cache = get_feature_cache(config)
+            if feature_cache is None:
+                feature, feature_data = parse()
+            else:
+                # Features parsed by previous runs of watch mode are reused while their files are not changed
+                feature, feature_data = feature_cache.resolve(
+                    (feature_path_key, uri, parser_type, encoding, repr(self.parse_args)), feature_path, parse
+                )
             try:
                 yield feature, Source(uri=uri, data=feature_data, media_type=media_type)  # type: ignore[call-arg] # migration to pydantic2
             except ValidationError as e:
@@ -0,0 +1,375 @@
+"""Indexes Cucumber messages streams into SQLite database and compares indexed runs
+
+Streams (e.g. per-worker files) are read message by message, so memory usage doesn't depend on stream size.
+Streams of any format written by --messages-format are supported.
+
+Usage:
+    bdd_messages.py index <database> <messages>...
+    bdd_messages.py diff <base_database> <database> [--duration-factor=<factor>] [--min-duration=<seconds>]
+    bdd_messages.py rehydrate <messages> <output>
+
+Options:
+    --duration-factor=<factor>  Report steps slower or faster than the base by the given factor [default: 2.0]
+    --min-duration=<seconds>    Ignore duration changes of steps faster than the given duration [default: 0.01]
+
+"""
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+from docopt import docopt
+
+from pytest_bdd.message_stream import get_local_attachment_path, iter_messages, rehydrate
+
+BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS streams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ast_nodes (
+    stream_id INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    PRIMARY KEY (stream_id, id)
+);
+CREATE TABLE IF NOT EXISTS pickles (
+    stream_id INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    uri TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ast_node_id TEXT,
+    PRIMARY KEY (stream_id, id)
+);
+CREATE TABLE IF NOT EXISTS pickle_steps (
+    stream_id INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    pickle_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (stream_id, id)
+);
+CREATE TABLE IF NOT EXISTS test_cases (
+    stream_id INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    pickle_id TEXT NOT NULL,
+    PRIMARY KEY (stream_id, id)
+);
+CREATE TABLE IF NOT EXISTS test_steps (
+    stream_id INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    test_case_id TEXT NOT NULL,
+    pickle_step_id TEXT,
+    hook_id TEXT,
+    PRIMARY KEY (stream_id, id)
+);
+CREATE TABLE IF NOT EXISTS test_case_runs (
+    stream_id INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    test_case_id TEXT NOT NULL,
+    attempt INTEGER NOT NULL,
+    worker_id TEXT,
+    started_at INTEGER NOT NULL,
+    finished_at INTEGER,
+    will_be_retried INTEGER,
+    PRIMARY KEY (stream_id, id)
+);
+CREATE TABLE IF NOT EXISTS test_step_runs (
+    stream_id INTEGER NOT NULL,
+    test_case_run_id TEXT NOT NULL,
+    test_step_id TEXT NOT NULL,
+    started_at INTEGER,
+    finished_at INTEGER,
+    status TEXT,
+    duration INTEGER,
+    message TEXT,
+    PRIMARY KEY (stream_id, test_case_run_id, test_step_id)
+);
+CREATE TABLE IF NOT EXISTS attachments (
+    stream_id INTEGER NOT NULL,
+    test_case_run_id TEXT,
+    test_step_id TEXT,
+    media_type TEXT NOT NULL,
+    file_name TEXT,
+    content_encoding TEXT NOT NULL,
+    size INTEGER,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS test_steps_test_case ON test_steps (stream_id, test_case_id);
+CREATE INDEX IF NOT EXISTS test_case_runs_test_case ON test_case_runs (stream_id, test_case_id);
+CREATE VIEW IF NOT EXISTS step_results AS
+SELECT
+    pickles.uri AS uri,
+    COALESCE(ast_nodes.line, 0) AS line,
+    pickles.name AS scenario,
+    pickle_steps.position AS position,
+    pickle_steps.text AS step,
+    test_step_runs.status AS status,
+    test_step_runs.duration AS duration,
+    test_case_runs.attempt AS attempt
+FROM test_step_runs
+JOIN test_case_runs
+    ON test_case_runs.stream_id = test_step_runs.stream_id AND test_case_runs.id = test_step_runs.test_case_run_id
+JOIN test_steps
+    ON test_steps.stream_id = test_step_runs.stream_id AND test_steps.id = test_step_runs.test_step_id
+JOIN pickle_steps
+    ON pickle_steps.stream_id = test_steps.stream_id AND pickle_steps.id = test_steps.pickle_step_id
+JOIN pickles
+    ON pickles.stream_id = pickle_steps.stream_id AND pickles.id = pickle_steps.pickle_id
+LEFT JOIN ast_nodes
+    ON ast_nodes.stream_id = pickles.stream_id AND ast_nodes.id = pickles.ast_node_id;
+"""
+
+# Latest attempt of every step is materialized into temporary table indexed by step location; steps are identified
+# by scenario location and position, as ids differ between runs
+LATEST_STEP_RESULTS = """
+CREATE TEMP TABLE {name} AS
+SELECT uri, line, scenario, position, step, status, duration
+FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY uri, line, position ORDER BY attempt DESC) AS attempt_rank
+    FROM {schema}step_results
+)
+WHERE attempt_rank = 1;
+CREATE UNIQUE INDEX temp.{name}_location ON {name} (uri, line, position);
+"""
+
+DIFF = """
+SELECT
+    COALESCE(current.uri, base.uri),
+    COALESCE(current.line, base.line),
+    COALESCE(current.scenario, base.scenario),
+    COALESCE(current.position, base.position),
+    COALESCE(current.step, base.step),
+    base.status,
+    current.status,
+    base.duration,
+    current.duration
+FROM latest_step_results AS current
+LEFT JOIN base_latest_step_results AS base
+    ON base.uri = current.uri AND base.line = current.line AND base.position = current.position
+UNION ALL
+SELECT base.uri, base.line, base.scenario, base.position, base.step, base.status, NULL, base.duration, NULL
+FROM base_latest_step_results AS base
+WHERE NOT EXISTS (
+    SELECT 1 FROM latest_step_results AS current
+    WHERE current.uri = base.uri AND current.line = base.line AND current.position = base.position
+)
+ORDER BY 1, 2, 4
+"""
+
+
+def to_nanos(timestamp_or_duration: Dict[str, Any]) -> int:
+    return int(timestamp_or_duration["seconds"]) * 10**9 + int(timestamp_or_duration.get("nanos", 0))
+
+
+def iter_ast_node_lines(node: Any) -> Iterator[Any]:
+    """Ids and lines of gherkin document nodes which could be referenced by pickles"""
+    if isinstance(node, dict):
+        if "id" in node and "location" in node:
+            yield node["id"], node["location"]["line"]
+        for value in node.values():
+            yield from iter_ast_node_lines(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from iter_ast_node_lines(value)
+
+
+def get_attachment_size(attachment: Dict[str, Any], base_path: Union[str, Path]) -> Optional[int]:
+    """Byte length of the attachment data; stored attachments are measured by their files"""
+    attachment_path = get_local_attachment_path(attachment, base_path)
+    if attachment_path is not None:
+        try:
+            return attachment_path.stat().st_size
+        except OSError:
+            return None
+    body = attachment.get("body", "")
+    if attachment.get("contentEncoding") == "BASE64":
+        # Every 4 characters encode 3 bytes; padding characters encode nothing
+        return len(body) // 4 * 3 - (len(body) - len(body.rstrip("=")))
+    return len(body.encode("utf-8"))
+
+
+def index_messages(
+    connection: sqlite3.Connection,
+    stream_id: int,
+    messages: Iterable[Dict[str, Any]],
+    base_path: Union[str, Path] = ".",
+) -> None:
+    """Index messages of the stream; stored attachments are resolved relative to the base path"""
+    for count, message in enumerate(messages, start=1):
+        if "gherkinDocument" in message:
+            connection.executemany(
+                "INSERT OR REPLACE INTO ast_nodes VALUES (?, ?, ?)",
+                ((stream_id, id_, line) for id_, line in iter_ast_node_lines(message["gherkinDocument"])),
+            )
+        elif "pickle" in message:
+            pickle = message["pickle"]
+            # Example row for outlines, scenario otherwise
+            ast_node_ids = pickle.get("astNodeIds") or [None]
+            connection.execute(
+                "INSERT OR REPLACE INTO pickles VALUES (?, ?, ?, ?, ?)",
+                (stream_id, pickle["id"], pickle["uri"], pickle["name"], ast_node_ids[-1]),
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO pickle_steps VALUES (?, ?, ?, ?, ?)",
+                (
+                    (stream_id, step["id"], pickle["id"], position, step["text"])
+                    for position, step in enumerate(pickle["steps"])
+                ),
+            )
+        elif "testCase" in message:
+            test_case = message["testCase"]
+            connection.execute(
+                "INSERT OR REPLACE INTO test_cases VALUES (?, ?, ?)",
+                (stream_id, test_case["id"], test_case["pickleId"]),
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO test_steps VALUES (?, ?, ?, ?, ?)",
+                (
+                    (stream_id, step["id"], test_case["id"], step.get("pickleStepId"), step.get("hookId"))
+                    for step in test_case["testSteps"]
+                ),
+            )
+        elif "testCaseStarted" in message:
+            started = message["testCaseStarted"]
+            connection.execute(
+                "INSERT OR REPLACE INTO test_case_runs VALUES (?, ?, ?, ?, ?, ?, NULL, NULL)",
+                (
+                    stream_id,
+                    started["id"],
+                    started["testCaseId"],
+                    started["attempt"],
+                    started.get("workerId"),
+                    to_nanos(started["timestamp"]),
+                ),
+            )
+        elif "testCaseFinished" in message:
+            finished = message["testCaseFinished"]
+            connection.execute(
+                "UPDATE test_case_runs SET finished_at = ?, will_be_retried = ? WHERE stream_id = ? AND id = ?",
+                (
+                    to_nanos(finished["timestamp"]),
+                    finished["willBeRetried"],
+                    stream_id,
+                    finished["testCaseStartedId"],
+                ),
+            )
+        elif "testStepStarted" in message:
+            started = message["testStepStarted"]
+            connection.execute(
+                "INSERT OR REPLACE INTO test_step_runs (stream_id, test_case_run_id, test_step_id, started_at) "
+                "VALUES (?, ?, ?, ?)",
+                (stream_id, started["testCaseStartedId"], started["testStepId"], to_nanos(started["timestamp"])),
+            )
+        elif "testStepFinished" in message:
+            finished = message["testStepFinished"]
+            result = finished["testStepResult"]
+            connection.execute(
+                "UPDATE test_step_runs SET finished_at = ?, status = ?, duration = ?, message = ? "
+                "WHERE stream_id = ? AND test_case_run_id = ? AND test_step_id = ?",
+                (
+                    to_nanos(finished["timestamp"]),
+                    result["status"],
+                    to_nanos(result["duration"]),
+                    result.get("message"),
+                    stream_id,
+                    finished["testCaseStartedId"],
+                    finished["testStepId"],
+                ),
+            )
+        elif "attachment" in message:
+            attachment = message["attachment"]
+            connection.execute(
+                "INSERT INTO attachments VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    stream_id,
+                    attachment.get("testCaseStartedId"),
+                    attachment.get("testStepId"),
+                    attachment["mediaType"],
+                    attachment.get("fileName"),
+                    attachment["contentEncoding"],
+                    get_attachment_size(attachment, base_path),
+                    attachment.get("url"),
+                ),
+            )
+        if count % BATCH_SIZE == 0:
+            connection.commit()
+    connection.commit()
+
+
+def index(database_path: Union[str, Path], messages_paths: Iterable[Union[str, Path]]) -> None:
+    """Index messages streams into the database; every stream keeps its own id namespace"""
+    with closing(sqlite3.connect(str(database_path))) as connection:
+        connection.executescript(SCHEMA)
+        for messages_path in messages_paths:
+            stream_id = connection.execute("INSERT INTO streams (path) VALUES (?)", (str(messages_path),)).lastrowid
+            index_messages(
+                connection,
+                stream_id,  # type: ignore[arg-type]
+                iter_messages(messages_path, rehydrate=False),
+                base_path=Path(messages_path).parent,
+            )
+
+
+def format_duration(duration: int) -> str:
+    return f"{duration / 10**9:.3f}s"
+
+
+def diff(
+    base_database_path: Union[str, Path],
+    database_path: Union[str, Path],
+    duration_factor: float = 2.0,
+    min_duration: float = 0.01,
+) -> Iterator[str]:
+    """Changes of step statuses and durations of the indexed run comparing to the base one"""
+    min_duration_nanos = min_duration * 10**9
+    with closing(sqlite3.connect(str(database_path))) as connection:
+        connection.execute("ATTACH DATABASE ? AS base", (str(base_database_path),))
+        connection.executescript(LATEST_STEP_RESULTS.format(name="latest_step_results", schema=""))
+        connection.executescript(LATEST_STEP_RESULTS.format(name="base_latest_step_results", schema="base."))
+        for (
+            uri,
+            line,
+            scenario,
+            position,
+            step,
+            base_status,
+            status,
+            base_duration,
+            duration,
+        ) in connection.execute(DIFF):
+            location = f"{uri}:{line} {scenario} [{position + 1}] {step}"
+            if base_status is None:
+                yield f"added: {location}: {status}"
+            elif status is None:
+                yield f"removed: {location}: {base_status}"
+            elif base_status != status:
+                yield f"status: {location}: {base_status} -> {status}"
+            elif base_duration is not None and duration is not None:
+                if max(base_duration, duration) < min_duration_nanos:
+                    continue
+                if duration > base_duration * duration_factor or base_duration > duration * duration_factor:
+                    change = "slower" if duration > base_duration else "faster"
+                    yield f"{change}: {location}: {format_duration(base_duration)} -> {format_duration(duration)}"
+
+
+def main():  # pragma: no cover
+    arguments = docopt(__doc__)
+    if arguments["index"]:
+        index(arguments["<database>"], arguments["<messages>"])
+    elif arguments["diff"]:
+        for line in diff(
+            arguments["<base_database>"],
+            arguments["<database>"],
+            duration_factor=float(arguments["--duration-factor"]),
+            min_duration=float(arguments["--min-duration"]),
+        ):
+            print(line)
+    elif arguments["rehydrate"]:
+        rehydrate(arguments["<messages>"][0], arguments["<output>"])
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,175 @@
+"""Deterministic scenario sharding.
+
+Splits scenarios between several independent pytest runs (e.g. CI machines). Every run gets the same
+``--bdd-shard=INDEX/TOTAL`` total and its own index; scenarios are assigned to shards by a stable hash of their
+identity, or by greedy balancing of recorded durations if ``--bdd-shard-durations`` is given.
+"""
+import argparse
+import json
+import os
+from hashlib import sha1
+from heapq import heapify, heapreplace
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Mapping, Optional, Set, Tuple, Union, cast
+
+import pytest
+from attr import Factory, attrib, attrs
+
+from pytest_bdd.compatibility.pytest import CallInfo, Config, Item, Parser, TestReport
+from pytest_bdd.utils import get_item_feature_pickle
+
+if TYPE_CHECKING:  # pragma: no cover
+    from messages import Pickle  # type:ignore[attr-defined]
+    from pytest_bdd.model import Feature
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse shard specification in form INDEX/TOTAL, where INDEX is 1-based"""
+    try:
+        index, total = map(int, value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value} is not a valid shard specification; INDEX/TOTAL is expected")
+    if not 1 <= index <= total:
+        raise argparse.ArgumentTypeError(f"Shard index {index} is out of range 1..{total}")
+    return index, total
+
+
+def add_options(parser: Parser) -> None:
+    """Add pytest-bdd options."""
+    group = parser.getgroup("bdd", "Sharding")
+    group.addoption(
+        "--bdd-shard",
+        action="store",
+        dest="bdd_shard",
+        metavar="INDEX/TOTAL",
+        type=parse_shard,
+        default=None,
+        help="Run only scenarios of the given shard; INDEX is 1-based.",
+    )
+    group.addoption(
+        "--bdd-shard-durations",
+        action="store",
+        dest="bdd_shard_durations_path",
+        metavar="path",
+        default=None,
+        help="Balance shards greedily by scenario durations recorded in the given file.",
+    )
+    group.addoption(
+        "--bdd-store-durations",
+        action="store",
+        dest="bdd_store_durations_path",
+        metavar="path",
+        default=None,
+        help="Record scenario durations into the given file to be used by --bdd-shard-durations.",
+    )
+
+
+def configure(config: Config) -> None:
+    option = config.option
+    shard = option.bdd_shard
+    store_durations_path = option.bdd_store_durations_path
+    if shard is None and store_durations_path is None:
+        return
+
+    durations: Dict[str, float] = {}
+    if shard is not None and option.bdd_shard_durations_path is not None:
+        durations = load_durations(option.bdd_shard_durations_path)
+
+    config.pluginmanager.register(
+        ShardPlugin(  # type: ignore[call-arg]
+            shard=shard,
+            durations=durations,
+            # prevent storing durations on worker nodes (xdist)
+            store_durations_path=None if hasattr(config, "workerinput") else store_durations_path,
+        ),
+        name="pytest_bdd_shard",
+    )
+
+
+def unconfigure(config: Config) -> None:
+    plugin = config.pluginmanager.getplugin("pytest_bdd_shard")
+    if plugin is not None:
+        config.pluginmanager.unregister(plugin)
+
+
+def load_durations(path: Union[str, Path]) -> Dict[str, float]:
+    with Path(path).open(mode="r", encoding="utf-8") as f:
+        return {str(key): float(value) for key, value in json.load(f).items()}
+
+
+def get_shard_plugin(config: Config) -> Optional["ShardPlugin"]:
+    return cast(Optional[ShardPlugin], config.pluginmanager.getplugin("pytest_bdd_shard"))
+
+
+@attrs(eq=False)
+class ShardPlugin:
+    shard: Optional[Tuple[int, int]] = attrib()
+    durations: Mapping[str, float] = attrib(default=Factory(dict))
+    store_durations_path: Optional[Union[str, Path]] = attrib(default=None)
+    recorded_durations: Dict[str, float] = attrib(default=Factory(dict), init=False)
+
+    _balanced_keys: Optional[Set[str]] = attrib(default=None, init=False)
+
+    @property
+    def balanced_keys(self) -> Set[str]:
+        """Keys of scenarios with known durations which were assigned to the current shard.
+
+        Longest scenarios are assigned first to the least loaded shard; ties are resolved by key and shard index,
+        so every shard computes the same assignment.
+        """
+        if self._balanced_keys is None:
+            index, total = cast(Tuple[int, int], self.shard)
+            loads = [(0.0, shard_index) for shard_index in range(1, total + 1)]
+            heapify(loads)
+            balanced_keys = set()
+            for key, duration in sorted(self.durations.items(), key=lambda item: (-item[1], item[0])):
+                load, shard_index = loads[0]
+                if shard_index == index:
+                    balanced_keys.add(key)
+                heapreplace(loads, (load + duration, shard_index))
+            self._balanced_keys = balanced_keys
+        return self._balanced_keys
+
+    def is_selected(self, feature: "Feature", pickle: "Pickle") -> bool:
+        if self.shard is None:
+            return True
+        index, total = self.shard
+        key = feature.build_pickle_key(pickle)
+        if key in self.durations:
+            return key in self.balanced_keys
+        return int.from_bytes(sha1(key.encode("utf-8")).digest()[:8], "big") % total == index - 1
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        if self.store_durations_path is None:
+            return
+        key = getattr(report, "bdd_scenario_key", None)
+        if key is not None:
+            self.recorded_durations[key] = self.recorded_durations.get(key, 0.0) + report.duration
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: Item, call: CallInfo):
+        outcome = yield
+        # Durations of the dry run are not stored
+        if item.config.option.bdd_store_durations_path is None or item.config.option.bdd_dry_run:
+            return
+        feature, pickle = get_item_feature_pickle(item)
+        if feature is not None and pickle is not None:
+            # Transferred to the controller under xdist to be stored there
+            outcome.get_result().bdd_scenario_key = feature.build_pickle_key(pickle)
+
+    def pytest_report_header(self, config: Config):
+        if self.shard is not None:
+            index, total = self.shard
+            balancing = "durations" if self.durations else "hash"
+            return f"bdd shard: {index}/{total} (balanced by {balancing})"
+
+    def pytest_sessionfinish(self, session):
+        if self.store_durations_path is None or not self.recorded_durations:
+            return
+        path = Path(self.store_durations_path)
+        durations = load_durations(path) if path.exists() else {}
+        durations.update(self.recorded_durations)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open(mode="w", encoding="utf-8") as f:
+            json.dump(durations, f, indent=2, sort_keys=True)
+        tmp_path.replace(path)
@@ -76,7 +76,7 @@ from pytest_bdd.utils import (
     getitemdefault,
     setdefaultattr,
 )
-from pytest_bdd.warning_types import PytestBDDStepDefinitionWarning
+from pytest_bdd.warning_types import PytestBDDAmbiguousStepDefinitionWarning, PytestBDDStepDefinitionWarning
 
 
 def add_options(parser: Parser):
@@ -304,7 +304,12 @@ class StepHandler:
 
             if len(step_definitions) > 0:
                 if len(step_definitions) > 1:
-                    warn(PytestBDDStepDefinitionWarning(f"Alternative step definitions are found: {step_definitions}"))
+                    warn(
+                        PytestBDDAmbiguousStepDefinitionWarning(
+                            f"Alternative step definitions are found: {step_definitions}",
+                            step_definitions=step_definitions,
+                        )
+                    )
                 return step_definitions[0]
             raise self.MatchNotFoundError(self.step.text)
 
@@ -455,7 +460,7 @@ class StepHandler:
     @attrs
     class Registry:
         registry: Set["StepHandler.Definition"] = attrib(default=Factory(set))
-        parent: "StepHandler.Registry" = attrib(default=None, init=False)
+        parent: Optional["StepHandler.Registry"] = attrib(default=None, init=False)
 
         @classmethod
         def inject_registry_fixture_and_register_steps(cls, obj):
@@ -493,13 +498,13 @@ class StepHandler:
 
         @property
         def fixture(self):
-            @pytest.fixture
             def step_registry(step_registry):
                 self.parent = step_registry
                 return self
 
-            step_registry.__pytest_bdd_step_registry__ = self
-            return step_registry
+            # Set before decoration, so the registry is accessible from the fixture definition as well
+            step_registry.__pytest_bdd_step_registry__ = self  # type: ignore[attr-defined]
+            return pytest.fixture(step_registry)
 
         def __iter__(self) -> Iterator["StepHandler.Definition"]:
             return iter(self.registry)
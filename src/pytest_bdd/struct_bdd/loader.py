@@ -0,0 +1,102 @@
+"""Loaders of StructBDD documents by their kinds; backends are imported on first use"""
+from enum import Enum
+from functools import lru_cache, partial
+from importlib import import_module
+from typing import Any, Callable, Tuple
+
+
+class Kind(Enum):
+    HOCON = "hocon"
+    HJSON = "hjson"
+    JSON = "json"
+    JSON5 = "json5"
+    TOML = "toml"
+    YAML = "yaml"
+
+
+@lru_cache(maxsize=None)
+def _build_loader(kind) -> Tuple[Callable[..., Any], str]:
+    """Build loader callable for the kind of StructBDD document and name of its backend"""
+    if kind == Kind.YAML.value:
+        from yaml import load as load_yaml
+
+        try:
+            from yaml import CFullLoader as YAMLLoader
+
+            backend = "libyaml"
+        except ImportError:  # pragma: no cover
+            from yaml import FullLoader as YAMLLoader  # type: ignore[assignment]
+
+            backend = "pyyaml"
+
+        return partial(load_yaml, Loader=YAMLLoader), backend
+    elif kind == Kind.TOML.value:
+        from pytest_bdd.compatibility.tomllib import loads as load_toml
+
+        return load_toml, "tomllib"
+    elif kind == Kind.JSON.value:
+        from json import loads as load_json
+
+        for backend in ("orjson", "ujson"):
+            try:
+                fast_load_json = import_module(backend).loads
+            except (ImportError, AttributeError):
+                continue
+
+            def load_fast_json(s, *args, _fast_load_json=fast_load_json, **kwargs):
+                # Fast backends don't support stdlib decoding options, so fall back if any were given
+                if args or kwargs:
+                    return load_json(s, *args, **kwargs)
+                return _fast_load_json(s)
+
+            return load_fast_json, backend
+
+        return load_json, "json"
+    elif kind == Kind.JSON5.value:
+        from json5 import loads as load_json5
+
+        return load_json5, "json5"
+    elif kind == Kind.HJSON.value:
+        from hjson import loads as load_hjson
+
+        return load_hjson, "hjson"
+    elif kind == Kind.HOCON.value:
+        from json import loads
+
+        from pyhocon import ConfigFactory, HOCONConverter
+
+        def load_hocon(
+            s,
+            hocon_parse_args=(),
+            hocon_parse_kwargs=None,
+            hocon_to_json_args=(),
+            hocon_to_json_kwargs=None,
+            json_args=(),
+            json_kwargs=None,
+        ):
+            hocon_to_json_kwargs = hocon_to_json_kwargs or {}
+            hocon_parse_kwargs = hocon_parse_kwargs or {}
+            json_kwargs = json_kwargs or {}
+            return loads(
+                HOCONConverter.to_json(
+                    config=ConfigFactory.parse_string(s, *hocon_parse_args, **hocon_parse_kwargs),
+                    *hocon_to_json_args,
+                    **hocon_to_json_kwargs,
+                ),
+                *json_args,
+                **json_kwargs,
+            )
+
+        return load_hocon, "pyhocon"
+    else:
+        raise ValueError(f"Unknown StructBDD kind: {kind}")
+
+
+def get_loader(kind) -> Callable[..., Any]:
+    """Get cached loader for the kind of StructBDD document"""
+    return _build_loader(kind)[0]
+
+
+def get_loader_backend(kind) -> str:
+    """Get name of the backend used to load the kind of StructBDD document"""
+    return _build_loader(kind)[1]
@@ -1,3 +1,4 @@
+import sys
 from contextlib import suppress
 from functools import partial
 from inspect import getmembers
@@ -7,33 +8,41 @@ import pytest
 
 from pytest_bdd.compatibility.pytest import PYTEST7, Config, Module
 from pytest_bdd.mimetypes import Mimetype
-from pytest_bdd.struct_bdd.model import StepPrototype
-from pytest_bdd.struct_bdd.parser import StructBDDParser
+from pytest_bdd.struct_bdd.loader import Kind, get_loader_backend
 
 
 class StructBDDPlugin:
+    """StructBDD plugin; models and parser are imported only when StructBDD documents are collected"""
+
     extension_to_mimetype = {
-        StructBDDParser.KIND.YAML: Mimetype.struct_bdd_yaml,
-        StructBDDParser.KIND.HOCON: Mimetype.struct_bdd_hocon,
-        StructBDDParser.KIND.JSON5: Mimetype.struct_bdd_json5,
-        StructBDDParser.KIND.JSON: Mimetype.struct_bdd_json,
-        StructBDDParser.KIND.HJSON: Mimetype.struct_bdd_hjson,
-        StructBDDParser.KIND.TOML: Mimetype.struct_bdd_toml,
+        Kind.YAML: Mimetype.struct_bdd_yaml,
+        Kind.HOCON: Mimetype.struct_bdd_hocon,
+        Kind.JSON5: Mimetype.struct_bdd_json5,
+        Kind.JSON: Mimetype.struct_bdd_json,
+        Kind.HJSON: Mimetype.struct_bdd_hjson,
+        Kind.TOML: Mimetype.struct_bdd_toml,
     }
 
+    def pytest_report_header(self, config: Config):
+        backends = []
+        for kind in (Kind.YAML, Kind.JSON):
+            with suppress(ImportError):
+                backends.append(f"{kind.value}={get_loader_backend(kind.value)}")
+        if backends:
+            return f"struct-bdd loaders: {', '.join(backends)}"
+
     def pytest_bdd_get_parser(self, config: Config, mimetype: str):
         with suppress(KeyError):
-            return partial(
-                StructBDDParser,
-                kind={
-                    Mimetype.struct_bdd_yaml.value: StructBDDParser.KIND.YAML.value,
-                    Mimetype.struct_bdd_hocon.value: StructBDDParser.KIND.HOCON.value,
-                    Mimetype.struct_bdd_json5.value: StructBDDParser.KIND.JSON5.value,
-                    Mimetype.struct_bdd_json.value: StructBDDParser.KIND.JSON.value,
-                    Mimetype.struct_bdd_hjson.value: StructBDDParser.KIND.HJSON.value,
-                    Mimetype.struct_bdd_toml.value: StructBDDParser.KIND.TOML.value,
-                }[mimetype],
-            )
+            kind = {kind_mimetype.value: kind.value for kind, kind_mimetype in self.extension_to_mimetype.items()}[
+                mimetype
+            ]
+
+            from pytest_bdd.struct_bdd.parser import StructBDDParser
+
+            return partial(StructBDDParser, kind=kind)
+
+    def pytest_bdd_get_feature_file_suffixes(self, config: Config):
+        return [f".bdd.{extension_suffix.value}" for extension_suffix in self.extension_to_mimetype.keys()]
 
     def pytest_bdd_get_mimetype(self, config: Config, path: Path):
         for extension_suffix, mimetype in self.extension_to_mimetype.items():
@@ -49,9 +58,14 @@ class StructBDDPlugin:
         outcome = yield
         res = outcome.get_result()
         if isinstance(res, Module):
-            for member_name, member in getmembers(res.module):
-                if isinstance(member, StepPrototype) and member_name.startswith("test_"):
-                    setattr(res.module, member_name, member.as_test(res.module.__file__))
+            module = res.module
+            # Step prototypes could be defined by the module only if StructBDD model is imported
+            struct_bdd_model = sys.modules.get("pytest_bdd.struct_bdd.model")
+            if struct_bdd_model is None:
+                return
+            for member_name, member in getmembers(module):
+                if isinstance(member, struct_bdd_model.StepPrototype) and member_name.startswith("test_"):
+                    setattr(module, member_name, member.as_test(module.__file__))
 
     if PYTEST7:
 
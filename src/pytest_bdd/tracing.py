@@ -0,0 +1,335 @@
+"""Span based tracing of the test run.
+
+With ``--bdd-trace=path`` session, feature, scenario (pickle) and step spans, together with spans of fixtures set up
+during scenario execution, are exported into a local file in OTLP JSON format (one ExportTraceServiceRequest per
+line), so traces could be inspected or loaded into a tracing backend without a collector service. Spans are
+serialized and written in batches by a background thread. The ``bdd_traceparent`` fixture provides W3C traceparent
+header value of the current span to propagate the trace into the system under test.
+
+Plugin is not registered unless tracing is requested, so it adds no overhead otherwise.
+"""
+import json
+import os
+import time
+from pathlib import Path
+from queue import Empty, Queue
+from threading import Thread
+from typing import Any, Dict, List, Optional, Union, cast
+
+import pytest
+from attr import Factory, attrib, attrs
+
+from pytest_bdd.compatibility.pytest import Config, Parser
+from pytest_bdd.packaging import get_distribution_version
+
+TRACE_CONTEXT_WORKERINPUT_KEY = "pytest_bdd_trace_context"
+INSTRUMENTATION_SCOPE_NAME = "pytest-bdd-ng"
+
+# OTLP status codes and span kinds
+STATUS_CODE_UNSET = 0
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+SPAN_KIND_INTERNAL = 1
+
+
+def add_options(parser: Parser) -> None:
+    """Add pytest-bdd options."""
+    group = parser.getgroup("bdd", "Tracing")
+    group.addoption(
+        "--bdd-trace",
+        action="store",
+        dest="bdd_trace_path",
+        metavar="path",
+        default=None,
+        help="Export spans of features, scenarios and steps into OTLP JSON file at given path.",
+    )
+
+
+def configure(config: Config) -> None:
+    path = config.option.bdd_trace_path
+    # Steps of the dry run are not called, so there is nothing to trace
+    if path is None or config.option.bdd_dry_run:
+        return
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is None:
+        # Spans of all xdist workers are appended to the file truncated by the controller
+        Path(path).write_text("", encoding="utf-8")
+        session_span: Optional[Span] = Span(name="session", trace_id=generate_trace_id())  # type: ignore[call-arg]
+        trace_id, root_span_id = session_span.trace_id, session_span.span_id  # type: ignore[union-attr]
+    else:
+        session_span = None
+        _, trace_id, root_span_id, _ = workerinput[TRACE_CONTEXT_WORKERINPUT_KEY].split("-")
+    config.pluginmanager.register(
+        TracingPlugin(  # type: ignore[call-arg]
+            exporter=OTLPJSONFileExporter(path=path),  # type: ignore[call-arg]
+            trace_id=trace_id,
+            root_span_id=root_span_id,
+            session_span=session_span,
+        ),
+        name="pytest_bdd_tracing",
+    )
+
+
+def unconfigure(config: Config) -> None:
+    plugin = config.pluginmanager.getplugin("pytest_bdd_tracing")
+    if plugin is not None:
+        plugin.exporter.shutdown()
+        config.pluginmanager.unregister(plugin)
+
+
+def generate_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+def generate_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+def to_otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    elif isinstance(value, int):
+        return {"intValue": str(value)}
+    elif isinstance(value, float):
+        return {"doubleValue": value}
+    elif isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [to_otlp_value(item) for item in value]}}
+    else:
+        return {"stringValue": value if isinstance(value, str) else repr(value)}
+
+
+@attrs(eq=False)
+class Span:
+    name: str = attrib()
+    trace_id: str = attrib()
+    parent_span_id: Optional[str] = attrib(default=None)
+    attributes: Dict[str, Any] = attrib(default=Factory(dict))
+    span_id: str = attrib(default=Factory(generate_span_id))
+    start_time: int = attrib(default=Factory(time.time_ns))
+    end_time: Optional[int] = attrib(default=None)
+    status_code: int = attrib(default=STATUS_CODE_UNSET)
+    status_message: Optional[str] = attrib(default=None)
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def end(self, exception: Optional[BaseException] = None) -> "Span":
+        self.end_time = time.time_ns()
+        if exception is not None:
+            self.status_code = STATUS_CODE_ERROR
+            self.status_message = f"{type(exception).__name__}: {exception}"
+        return self
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.start_time if self.end_time is None else self.end_time),
+            "attributes": [{"key": key, "value": to_otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {
+                "code": self.status_code,
+                **({"message": self.status_message} if self.status_message is not None else {}),
+            },
+        }
+        if self.parent_span_id is not None:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+@attrs(eq=False)
+class OTLPJSONFileExporter:
+    """Writes finished spans into the file in OTLP JSON format by batches from the background thread"""
+
+    path: Union[str, Path] = attrib()
+    max_batch_size: int = attrib(default=512)
+    flush_interval: float = attrib(default=1.0)
+    service_name: str = attrib(default="pytest-bdd")
+
+    queue: "Queue[Optional[Span]]" = attrib(default=Factory(Queue), init=False)
+    thread: Optional[Thread] = attrib(default=None, init=False)
+
+    def export(self, span: Span) -> None:
+        if self.thread is None:
+            self.thread = Thread(target=self.process_spans, daemon=True)
+            self.thread.start()
+        self.queue.put_nowait(span)
+
+    def shutdown(self) -> None:
+        if self.thread is not None:
+            self.queue.put_nowait(None)
+            self.thread.join()
+            self.thread = None
+
+    def process_spans(self) -> None:
+        batch: List[Span] = []
+        while True:
+            try:
+                span = self.queue.get(timeout=self.flush_interval)
+            except Empty:
+                self.write(batch)
+                batch = []
+                continue
+            if span is None:
+                self.write(batch)
+                return
+            batch.append(span)
+            if len(batch) >= self.max_batch_size:
+                self.write(batch)
+                batch = []
+
+    def write(self, spans: List[Span]) -> None:
+        if not spans:
+            return
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": to_otlp_value(self.service_name)},
+                            {"key": "process.pid", "value": to_otlp_value(os.getpid())},
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {
+                                "name": INSTRUMENTATION_SCOPE_NAME,
+                                "version": str(get_distribution_version("pytest-bdd-ng")),
+                            },
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = f"{json.dumps(request, separators=(',', ':'))}\n"
+        from filelock import FileLock
+
+        with FileLock(f"{self.path}.lock"):
+            with Path(self.path).open(mode="at", encoding="utf-8") as f:
+                f.write(line)
+
+
+@attrs(eq=False)
+class TracingPlugin:
+    exporter: OTLPJSONFileExporter = attrib()
+    trace_id: str = attrib()
+    root_span_id: str = attrib()
+    session_span: Optional[Span] = attrib(default=None)
+
+    feature_spans: Dict[str, Span] = attrib(default=Factory(dict), init=False)
+    scenario_span: Optional[Span] = attrib(default=None, init=False)
+    step_span: Optional[Span] = attrib(default=None, init=False)
+    scenario_exception: Optional[BaseException] = attrib(default=None, init=False)
+
+    @property
+    def current_span(self) -> Optional[Span]:
+        return self.step_span or self.scenario_span
+
+    def get_traceparent(self) -> Optional[str]:
+        """W3C traceparent header value of the current step or scenario span"""
+        current_span = self.current_span
+        return current_span.traceparent if current_span is not None else None
+
+    def start_span(self, name: str, parent: Optional[Span], **attributes) -> Span:
+        return Span(  # type: ignore[call-arg]
+            name=name,
+            trace_id=self.trace_id,
+            parent_span_id=self.root_span_id if parent is None else parent.span_id,
+            attributes=attributes,
+        )
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        # Spans of xdist workers belong to the trace of the controller session
+        node.workerinput[TRACE_CONTEXT_WORKERINPUT_KEY] = cast(Span, self.session_span).traceparent
+
+    def pytest_bdd_before_scenario(self, request, feature, scenario):
+        feature_span = self.feature_spans.get(feature.uri)
+        if feature_span is None:
+            feature_span = self.feature_spans[feature.uri] = self.start_span(
+                f"Feature: {feature.name}", None, **{"pytest_bdd.feature.uri": feature.uri}
+            )
+        self.scenario_exception = None
+        self.scenario_span = self.start_span(
+            f"Scenario: {scenario.name}",
+            feature_span,
+            **{
+                "pytest_bdd.scenario.key": feature.build_pickle_key(scenario),
+                "pytest_bdd.scenario.tags": [tag.name for tag in scenario.tags],
+                "pytest_bdd.item.nodeid": request.node.nodeid,
+            },
+        )
+
+    def pytest_bdd_after_scenario(self, request, feature, scenario):
+        if self.scenario_span is None:
+            return
+        if self.step_span is not None:
+            # Step was interrupted without error hooks call
+            self.exporter.export(self.step_span.end())
+            self.step_span = None
+        self.exporter.export(self.scenario_span.end(self.scenario_exception))
+        self.feature_spans[feature.uri].end_time = self.scenario_span.end_time
+        self.scenario_span = None
+
+    def pytest_bdd_before_step(self, request, feature, scenario, step, step_func):
+        self.step_span = self.start_span(
+            f"Step: {step.text}",
+            self.scenario_span,
+            **{
+                "pytest_bdd.step.keyword": getattr(step, "keyword", None) or "",
+                "pytest_bdd.step.text": step.text,
+            },
+        )
+
+    def pytest_bdd_before_step_call(self, request, feature, scenario, step, step_func, step_func_args, step_definition):
+        if self.step_span is None:
+            return
+        attributes = self.step_span.attributes
+        attributes["pytest_bdd.step_definition.pattern"] = str(step_definition.parser)
+        attributes["pytest_bdd.step_definition.function"] = getattr(step_func, "__qualname__", repr(step_func))
+        for name, value in step_func_args.items():
+            attributes[f"pytest_bdd.step.args.{name}"] = value
+
+    def pytest_bdd_after_step(self, request, feature, scenario, step, step_func, step_func_args, step_definition):
+        if self.step_span is not None:
+            self.exporter.export(self.step_span.end())
+            self.step_span = None
+
+    def pytest_bdd_step_error(self, request, feature, scenario, step, step_func, step_func_args, exception):
+        self.scenario_exception = exception
+        if self.step_span is not None:
+            self.exporter.export(self.step_span.end(exception))
+            self.step_span = None
+
+    def pytest_bdd_step_func_lookup_error(self, request, feature, scenario, step, exception):
+        self.scenario_exception = exception
+        self.exporter.export(
+            self.start_span(f"Step: {step.text}", self.scenario_span, **{"pytest_bdd.step.text": step.text}).end(
+                exception
+            )
+        )
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        parent = self.current_span
+        if parent is None:
+            yield
+            return
+        span = self.start_span(
+            f"Fixture: {fixturedef.argname}", parent, **{"pytest_bdd.fixture.scope": str(fixturedef.scope)}
+        )
+        outcome = yield
+        self.exporter.export(span.end(outcome.excinfo[1] if outcome.excinfo is not None else None))
+
+    def pytest_sessionfinish(self, session):
+        for feature_span in self.feature_spans.values():
+            self.exporter.export(feature_span)
+        self.feature_spans.clear()
+        if self.session_span is not None:
+            self.exporter.export(self.session_span.end())
+        self.exporter.shutdown()
@@ -23,6 +23,7 @@ from typing import (
     Pattern,
     Protocol,
     Sequence,
+    Tuple,
     Type,
     Union,
     cast,
@@ -32,8 +33,8 @@ from urllib.parse import urlparse
 
 from _pytest.fixtures import FixtureDef, FixtureRequest
 
-from pytest_bdd.compatibility.pytest import PYTEST8, PYTEST81, fail
-from pytest_bdd.const import ALPHA_REGEX, PYTHON_REPLACE_REGEX
+from pytest_bdd.compatibility.pytest import PYTEST8, PYTEST81, fail, is_set
+from pytest_bdd.const import ALPHA_REGEX, PYTHON_REPLACE_REGEX, SCENARIO_BATCH_MARK
 
 if TYPE_CHECKING:  # pragma: no cover
     from pytest_bdd.compatibility.pytest import RunResult
@@ -188,6 +189,25 @@ def inject_fixture(request: FixtureRequest, arg: str, value: Any) -> None:
         request._pyfuncitem._fixtureinfo.names_closure.append(arg)
 
 
+def get_item_feature_pickle(item) -> Tuple[Any, Any]:
+    """Get feature and pickle the item was parametrized with; (None, None) for non-bdd items"""
+    params = getattr(getattr(item, "callspec", None), "params", {})
+    feature, pickle = params.get("feature"), params.get("scenario")
+    if feature is None or pickle is None or not (is_set(feature) and is_set(pickle)):
+        # Non-bdd item or empty parameter set
+        return None, None
+    return feature, pickle
+
+
+def get_item_feature_pickles(item) -> Tuple[Any, Sequence[Any]]:
+    """Get feature and all pickles executed by the item, including batched ones; (None, ()) for non-bdd items"""
+    feature, pickle = get_item_feature_pickle(item)
+    if feature is None:
+        return None, ()
+    batch_mark = item.get_closest_marker(SCENARIO_BATCH_MARK)
+    return feature, (pickle,) if batch_mark is None else tuple(batch_mark.args[0])
+
+
 def _itemgetter(*items):
     def func(obj):
         if len(items) == 0:
@@ -3,3 +3,11 @@ from pytest import PytestWarning
 
 class PytestBDDStepDefinitionWarning(PytestWarning):
     __module__ = "pytest_bdd"
+
+
+class PytestBDDAmbiguousStepDefinitionWarning(PytestBDDStepDefinitionWarning):
+    __module__ = "pytest_bdd"
+
+    def __init__(self, message, step_definitions=()):
+        super().__init__(message)
+        self.step_definitions = step_definitions
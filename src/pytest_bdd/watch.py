@@ -0,0 +1,185 @@
+"""Watch mode.
+
+With ``--bdd-watch`` the test session is run in a loop within the same process: after every run watched files are
+polled for changes and the session is run again. Parsed features are kept warm between runs and parsed again only
+if their files were changed; step definition modules which weren't changed stay imported, changed ones are
+unloaded to be imported again. Every run after the first one selects only affected scenarios, the same way as
+``--bdd-affected`` does, so the pytest cache has to be enabled to select them.
+"""
+import importlib
+import linecache
+import os
+import sys
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple, Union
+
+import pytest
+from attr import Factory, attrib, attrs
+
+from pytest_bdd.compatibility.pytest import Config, ExitCode, Parser, get_config_root_path
+from pytest_bdd.model import Feature
+from pytest_bdd.utils import IdGenerator
+
+WATCHED_FILE_PATTERNS = ("*.py", "*.feature", "*.gherkin", "*.bdd.*")
+IGNORED_DIR_NAMES = {"__pycache__", "node_modules", "venv"}
+
+
+def add_options(parser: Parser) -> None:
+    """Add pytest-bdd options."""
+    group = parser.getgroup("bdd", "Watch")
+    group.addoption(
+        "--bdd-watch",
+        action="store_true",
+        dest="bdd_watch",
+        default=False,
+        help="Run tests again on changes of features and step definitions, selecting only affected scenarios.",
+    )
+    group.addoption(
+        "--bdd-watch-interval",
+        type=float,
+        dest="bdd_watch_interval",
+        default=0.5,
+        metavar="SECONDS",
+        help="Interval of polling watched files for changes.",
+    )
+    group.addoption(
+        "--bdd-watch-runs",
+        type=int,
+        dest="bdd_watch_runs",
+        default=0,
+        metavar="N",
+        help="Stop watching after N runs; watch till interrupted by default.",
+    )
+
+
+def cmdline_main(config: Config) -> Optional[Union[int, ExitCode]]:
+    if not config.option.bdd_watch or hasattr(config, "workerinput") or is_watched_run(config):
+        return None
+    return Watcher(config=config).run()  # type: ignore[call-arg]
+
+
+def is_watched_run(config: Config) -> bool:
+    return any(isinstance(plugin, WatchedRunPlugin) for plugin in config.pluginmanager.get_plugins())
+
+
+def get_feature_cache(config: Union[Config, object]) -> Optional["FeatureCache"]:
+    return getattr(config, "pytest_bdd_feature_cache", None)
+
+
+@attrs(eq=False)
+class FeatureCache:
+    """Parsed features which stay valid while their files are not changed"""
+
+    # Modification stamps and parsing results by cache keys
+    features: Dict[Hashable, Tuple[Tuple[int, int], Tuple[Feature, str]]] = attrib(default=Factory(dict))
+
+    def resolve(self, key: Hashable, path: Path, parse: Callable[[], Tuple[Feature, str]]) -> Tuple[Feature, str]:
+        stat = path.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        try:
+            cached_stamp, result = self.features[key]
+        except KeyError:
+            pass
+        else:
+            if cached_stamp == stamp:
+                return result
+        result = parse()
+        self.features[key] = (stamp, result)
+        return result
+
+
+@attrs(eq=False)
+class WatchedRunPlugin:
+    watcher: "Watcher" = attrib()
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_configure(self, config: Config):
+        # Ids stay unique between runs, because parsed features are reused
+        config.pytest_bdd_id_generator = self.watcher.id_generator  # type: ignore[attr-defined]
+        config.pytest_bdd_feature_cache = self.watcher.feature_cache  # type: ignore[attr-defined]
+        if self.watcher.runs:
+            config.option.bdd_affected = True
+
+
+@attrs(eq=False)
+class Watcher:
+    config: Config = attrib()
+    id_generator: IdGenerator = attrib(default=Factory(IdGenerator), init=False)
+    feature_cache: FeatureCache = attrib(default=Factory(FeatureCache), init=False)
+    runs: int = attrib(default=0, init=False)
+
+    def run(self) -> Union[int, ExitCode]:
+        invocation_params = self.config.invocation_params
+        exit_code: Union[int, ExitCode] = ExitCode.OK
+        try:
+            while True:
+                snapshot = self.take_snapshot()
+                exit_code = pytest.main(
+                    list(invocation_params.args),
+                    plugins=[*(invocation_params.plugins or ()), WatchedRunPlugin(watcher=self)],  # type: ignore[call-arg]
+                )
+                self.runs += 1
+                if self.config.option.bdd_watch_runs and self.runs >= self.config.option.bdd_watch_runs:
+                    return exit_code
+                self.write_line("waiting for changes of features and step definitions; press Ctrl+C to stop")
+                changed_paths = self.wait_for_changes(snapshot)
+                self.write_line(f"changed: {', '.join(sorted(map(self.get_relative_path, changed_paths)))}")
+                self.unload_modules(changed_paths)
+        except KeyboardInterrupt:
+            return ExitCode.INTERRUPTED
+
+    def take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Modification stamps of watched files by their paths"""
+        snapshot = {}
+        for dir_path, dir_names, file_names in os.walk(get_config_root_path(self.config)):
+            dir_names[:] = [
+                dir_name
+                for dir_name in dir_names
+                if not dir_name.startswith(".")
+                and dir_name not in IGNORED_DIR_NAMES
+                and not os.path.exists(os.path.join(dir_path, dir_name, "pyvenv.cfg"))
+            ]
+            for file_name in file_names:
+                if any(fnmatch(file_name, pattern) for pattern in WATCHED_FILE_PATTERNS):
+                    path = os.path.join(dir_path, file_name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait_for_changes(self, snapshot: Dict[str, Tuple[int, int]]) -> Set[str]:
+        while True:
+            time.sleep(self.config.option.bdd_watch_interval)
+            current_snapshot = self.take_snapshot()
+            changed_paths = {
+                path
+                for path in snapshot.keys() | current_snapshot.keys()
+                if snapshot.get(path) != current_snapshot.get(path)
+            }
+            if changed_paths:
+                return changed_paths
+
+    @staticmethod
+    def unload_modules(changed_paths: Set[str]) -> None:
+        """Unload modules of changed files, so they are imported again by the next run; others stay imported"""
+        changed_module_paths = {os.path.realpath(path) for path in changed_paths if path.endswith(".py")}
+        if not changed_module_paths:
+            return
+        for name, module in list(sys.modules.items()):
+            module_path: Any = getattr(module, "__file__", None)
+            if isinstance(module_path, str) and os.path.realpath(module_path) in changed_module_paths:
+                del sys.modules[name]
+        for path in changed_module_paths:
+            linecache.checkcache(path)
+        importlib.invalidate_caches()
+
+    def get_relative_path(self, path: str) -> str:
+        return os.path.relpath(path, get_config_root_path(self.config))
+
+    @staticmethod
+    def write_line(line: str) -> None:
+        print(f"bdd watch: {line}", flush=True)
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from pytest import mark
+
+from messages import Source  # type:ignore[attr-defined]
+from pytest_bdd.allure_logging import AllurePytestBDD, to_allure_value
+from pytest_bdd.compatibility.allure import ALLURE_INSTALLED
+
+
+def test_pydantic_values_are_converted_for_allure():
+    source = Source(uri="file:a.feature", data="Feature: A", media_type="text/x.cucumber.gherkin+plain")
+
+    assert to_allure_value(source) == {
+        "data": "Feature: A",
+        "media_type": "text/x.cucumber.gherkin+plain",
+        "uri": "file:a.feature",
+    }
+    assert to_allure_value("value") == "value"
+
+
+@mark.skipif(not ALLURE_INSTALLED, reason="Allure is not installed")
+def test_step_caller_is_wrapped_without_step_definition_modification():
+    def step_func():
+        return "result"
+
+    step_definition = SimpleNamespace(func=step_func)
+    plugin = AllurePytestBDD(allure_logger=None, allure_cache=None)
+    hook_wrapper = plugin.pytest_bdd_get_step_caller(
+        request=None,
+        feature=None,
+        scenario=None,
+        step=SimpleNamespace(keyword="Given", text="step"),
+        step_func=step_func,
+        step_func_args={},
+        step_definition=step_definition,
+    )
+    next(hook_wrapper)
+
+    outcome = SimpleNamespace(get_result=lambda: step_func, force_result=lambda result: results.append(result))
+    results: list = []
+    try:
+        hook_wrapper.send(outcome)
+    except StopIteration:
+        pass
+
+    (allure_step_caller,) = results
+    assert allure_step_caller() == "result"
+    assert step_definition.func is step_func
@@ -20,3 +20,20 @@ def pytest_generate_tests(metafunc):
             "pytest_params",
             parametrizations,
         )
+
+
+@pytest.fixture(
+    params=[
+        pytest.param("inprocess", id="dispatched-hooks"),
+        pytest.param("subprocess", id="direct-hooks"),
+    ]
+)
+def hook_calls(request, testdir, monkeypatch):
+    """Run pytest by ``testdir.runpytest`` in process or in a subprocess.
+
+    Pytester records hook calls of in-process runs, so all hooks are dispatched by pluggy there; hooks implemented
+    only by pytest-bdd are called directly in subprocess runs.
+    """
+    if request.param == "subprocess":
+        monkeypatch.setattr(testdir, "runpytest", testdir.runpytest_subprocess)
+    return request.param
@@ -1,6 +1,10 @@
 """Test feature background."""
 from textwrap import dedent
 
+from pytest import mark
+
+pytestmark = mark.usefixtures("hook_calls")
+
 # language=gherkin
 FEATURE = '''\
 Feature: Background support
@@ -0,0 +1,135 @@
+"""Test dry run of scenarios."""
+import json
+
+import pytest
+
+from pytest_bdd.message_stream import iter_messages
+
+# language=gherkin
+FEATURE = """\
+Feature: Dry run
+    Scenario: Bound scenario
+        Given I have 5 cucumbers
+        When I eat 2 cucumbers
+
+    Scenario: Unbound scenario
+        Given I have 5 cucumbers
+        When I eat 2 cucumbers
+        And I look at 2 cucumbers
+        Then I should have 3 cucumbers
+"""
+
+# language=python
+CONFTEST = """\
+import pytest
+from pytest_bdd import given, when
+
+@pytest.fixture(autouse=True)
+def autouse_fixture():
+    raise RuntimeError("Fixtures must not be called")
+
+@pytest.fixture
+def step_fixture():
+    raise RuntimeError("Fixtures must not be called")
+
+@given("I have {count:d} cucumbers")
+def have_cucumbers(count, step_fixture):
+    raise RuntimeError("Steps must not be called")
+
+@when("I eat {count:d} cucumbers")
+def eat_cucumbers(count):
+    raise RuntimeError("Steps must not be called")
+
+@when("I look at {count:d} cucumbers")
+def look_at_cucumbers(count):
+    raise RuntimeError("Steps must not be called")
+
+@when("I look at {count:d} {item}")
+def look_at_items(count, item):
+    raise RuntimeError("Steps must not be called")
+"""
+
+
+@pytest.fixture
+def dry_run_testdir(testdir):
+    testdir.makefile(".feature", dry_run=FEATURE)
+    testdir.makeconftest(CONFTEST)
+    testdir.makepyfile(
+        # language=python
+        test_plain="""\
+        def test_plain():
+            raise RuntimeError("Tests must not be called")
+        """
+    )
+    return testdir
+
+
+def test_dry_run_outcomes(dry_run_testdir):
+    result = dry_run_testdir.runpytest("--bdd-dry-run")
+    result.assert_outcomes(passed=1, failed=1, skipped=1)
+    result.stdout.fnmatch_lines(
+        [
+            '*Several step definitions are matching the step: "I look at 2 cucumbers"*',
+            '*Step definition is not found: "I should have 3 cucumbers"*',
+        ]
+    )
+    result.stdout.no_fnmatch_line("*must not be called*")
+
+
+def test_dry_run_messages(dry_run_testdir, tmp_path):
+    messages_path = tmp_path / "messages.ndjson"
+    result = dry_run_testdir.runpytest("--bdd-dry-run", "--messages-ndjson", str(messages_path))
+    result.assert_outcomes(passed=1, failed=1, skipped=1)
+
+    statuses = [
+        message["testStepFinished"]["testStepResult"]["status"]
+        for message in iter_messages(messages_path)
+        if "testStepFinished" in message
+    ]
+    assert statuses == ["SKIPPED", "SKIPPED", "SKIPPED", "SKIPPED", "AMBIGUOUS", "UNDEFINED"]
+
+
+def test_dry_run_cucumber_json(dry_run_testdir, tmp_path):
+    cucumber_json_path = tmp_path / "cucumber.json"
+    result = dry_run_testdir.runpytest("--bdd-dry-run", "--cucumberjson", str(cucumber_json_path))
+    result.assert_outcomes(passed=1, failed=1, skipped=1)
+
+    (feature,) = json.loads(cucumber_json_path.read_text())
+    bound_scenario, unbound_scenario = feature["elements"]
+    assert [step["result"]["status"] for step in bound_scenario["steps"]] == ["skipped", "skipped"]
+    assert [step["result"]["status"] for step in unbound_scenario["steps"]] == [
+        "skipped",
+        "skipped",
+        "failed",
+        "undefined",
+    ]
+
+
+def test_dry_run_is_distributed(dry_run_testdir):
+    pytest.importorskip("xdist")
+    result = dry_run_testdir.runpytest("--bdd-dry-run", "-n", "2")
+    result.assert_outcomes(passed=1, failed=1, skipped=1)
+    result.stdout.no_fnmatch_line("*must not be called*")
+
+
+def test_dry_run_is_not_recorded(dry_run_testdir, tmp_path):
+    history_path = tmp_path / "history.sqlite3"
+    durations_path = tmp_path / "durations.json"
+    trace_path = tmp_path / "trace.jsonl"
+    result = dry_run_testdir.runpytest(
+        "--bdd-dry-run",
+        "--bdd-history",
+        str(history_path),
+        "--bdd-store-durations",
+        str(durations_path),
+        "--bdd-trace",
+        str(trace_path),
+        "-p",
+        "cacheprovider",
+    )
+    result.assert_outcomes(passed=1, failed=1, skipped=1)
+
+    assert not history_path.exists()
+    assert not durations_path.exists()
+    assert not trace_path.exists()
+    assert dry_run_testdir.parseconfigure().cache.get("pytest_bdd/impact_map", None) is None
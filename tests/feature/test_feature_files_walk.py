@@ -0,0 +1,201 @@
+"""Test search of feature files."""
+from pathlib import Path
+from textwrap import dedent
+
+# language=python
+CONFTEST = """\
+import pytest
+from pytest_bdd import given
+
+@given("I have a bar")
+def i_have_bar():
+    return "bar"
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_bdd_get_mimetype(config, path):
+    print(f"Mimetype is detected for {path.name}")
+    yield
+"""
+
+# language=gherkin
+FEATURE = """\
+Feature: {name}
+    Scenario: {name}
+        Given I have a bar
+"""
+
+
+def make_feature(path, name):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(dedent(FEATURE.format(name=name)))
+
+
+def make_features_dir(testdir, make_test_module=True):
+    features_dir = Path(str(testdir.tmpdir)) / "features"
+    make_feature(features_dir / "found.feature", "Found")
+    make_feature(features_dir / "nested" / "found.feature", "Found nested")
+    make_feature(features_dir / "nested" / "skipped.feature", "Skipped")
+    make_feature(features_dir / "fixtures" / "fixture.feature", "Fixture")
+    make_feature(features_dir / "node_modules" / "package" / "package.feature", "Package")
+    make_feature(features_dir / ".hidden" / "hidden.feature", "Hidden")
+    (features_dir / "screenshot.png").write_bytes(b"\x89PNG")
+    if make_test_module:
+        testdir.makepyfile(
+            # language=python
+            """\
+            from pathlib import Path
+            from pytest_bdd import scenarios
+
+            test_features = scenarios(Path("features"))
+            """
+        )
+
+
+def assert_collected_features(output, collected, skipped):
+    for name in collected:
+        assert f"-{name}-{name}" in output
+    for name in skipped:
+        assert f"-{name}-{name}" not in output
+
+
+def test_feature_files_are_prefiltered_and_ignored_directories_are_pruned(testdir):
+    testdir.makeconftest(CONFTEST)
+    make_features_dir(testdir)
+    result = testdir.runpytest("-s", "--collect-only", "-q", "--disable-feature-autoload")
+    output = result.stdout.str()
+    assert_collected_features(
+        output, collected=("Found", "Found nested", "Skipped", "Fixture"), skipped=("Package", "Hidden")
+    )
+    # Mimetypes are detected only for files with known suffixes out of pruned directories
+    assert output.count("Mimetype is detected for") == 4
+    assert "screenshot.png" not in output
+
+
+def test_ignored_feature_files_are_configured_by_ini(testdir):
+    testdir.makeini(
+        # language=ini
+        """\
+        [pytest]
+        bdd_features_ignore =
+            fixtures
+            features/nested/skipped.feature
+        """
+    )
+    testdir.makeconftest(CONFTEST)
+    make_features_dir(testdir)
+    result = testdir.runpytest("--collect-only", "-q", "--disable-feature-autoload")
+    # Ini option replaces default ignored names
+    assert_collected_features(
+        result.stdout.str(),
+        collected=("Found", "Found nested", "Package", "Hidden"),
+        skipped=("Skipped", "Fixture"),
+    )
+
+
+def test_glob_patterns_of_feature_files(testdir):
+    testdir.makeconftest(CONFTEST)
+    features_dir = Path(str(testdir.tmpdir)) / "features"
+    make_feature(features_dir / "top.feature", "Top")
+    make_feature(features_dir / "first" / "deep.feature", "First deep")
+    make_feature(features_dir / "second" / "deep.feature", "Second deep")
+    make_feature(features_dir / "second" / "third" / "deeper.feature", "Deeper")
+    testdir.makepyfile(
+        # language=python
+        """\
+        from pytest_bdd import scenarios
+
+        test_deep = scenarios("features/*/deep.feature")
+        test_all = scenarios("features/**/*.feature")
+        """
+    )
+    result = testdir.runpytest("--collect-only", "-q", "--disable-feature-autoload")
+    output = result.stdout.str()
+    for name in ("First deep", "Second deep"):
+        assert output.count(f"-{name}-{name}") == 2
+    for name in ("Top", "Deeper"):
+        assert output.count(f"-{name}-{name}") == 1
+
+
+def test_feature_files_out_of_base_dir(testdir):
+    testdir.makeini(
+        # language=ini
+        """\
+        [pytest]
+        bdd_features_base_dir = tests
+        """
+    )
+    testdir.makeconftest(CONFTEST)
+    make_features_dir(testdir, make_test_module=False)
+    tests_dir = Path(str(testdir.tmpdir)) / "tests"
+    tests_dir.mkdir()
+    (tests_dir / "test_features.py").write_text(
+        # language=python
+        dedent(
+            """\
+            from pathlib import Path
+            from pytest_bdd import scenarios
+
+            test_glob = scenarios("../features/*.feature")
+            test_dir = scenarios(Path("../features"))
+            """
+        )
+    )
+    result = testdir.runpytest("--collect-only", "-q", "--disable-feature-autoload")
+    output = result.stdout.str()
+    # Default ignored names still prune directories out of the base dir
+    assert_collected_features(output, collected=("Found", "Found nested", "Fixture"), skipped=("Package", "Hidden"))
+    assert output.count("-Found-Found") == 2
+    assert output.count("-Found nested-Found nested") == 1
+
+
+def test_unparseable_feature_files_are_skipped(testdir):
+    testdir.makeconftest(
+        CONFTEST
+        # language=python
+        + """\
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_bdd_get_mimetype(config, path):
+    if path.name == "a_unknown.feature":
+        return "text/x.unknown"
+"""
+    )
+    features_dir = Path(str(testdir.tmpdir)) / "features"
+    make_feature(features_dir / "a_unknown.feature", "Unknown")
+    make_feature(features_dir / "b_known.feature", "Known")
+    testdir.makepyfile(
+        # language=python
+        """\
+        from pathlib import Path
+        from pytest_bdd import scenarios
+
+        test_features = scenarios(Path("features"))
+        """
+    )
+    result = testdir.runpytest("--disable-feature-autoload")
+    result.assert_outcomes(passed=1)
+
+
+def test_feature_files_of_plugins_without_declared_suffixes_are_found(testdir):
+    testdir.makeconftest(
+        CONFTEST
+        # language=python
+        + """\
+
+class StoryPlugin:
+    # Suffixes of story files are not declared by pytest_bdd_get_feature_file_suffixes hook
+    def pytest_bdd_get_mimetype(self, config, path):
+        if path.name.endswith(".story"):
+            return "text/x.cucumber.gherkin+plain"
+
+def pytest_configure(config):
+    config.pluginmanager.register(StoryPlugin())
+"""
+    )
+    make_features_dir(testdir)
+    make_feature(Path(str(testdir.tmpdir)) / "features" / "nested" / "custom.story", "Story")
+    result = testdir.runpytest("-s", "--collect-only", "-q", "--disable-feature-autoload")
+    output = result.stdout.str()
+    assert_collected_features(
+        output, collected=("Found", "Found nested", "Skipped", "Fixture", "Story"), skipped=("Package", "Hidden")
+    )
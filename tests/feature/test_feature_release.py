@@ -0,0 +1,105 @@
+"""Test release of per-feature state after the last scenario of the feature."""
+import gc
+import json
+import tracemalloc
+from pathlib import Path
+
+from pytest_bdd.parser import GherkinParser
+from pytest_bdd.utils import IdGenerator
+
+# language=python
+CONFTEST = """\
+from pytest_bdd import given
+
+features = {}
+
+def pytest_bdd_before_scenario(request, feature, scenario):
+    assert feature.registry and feature.pickles, "Feature is released before its last scenario"
+    features[feature.uri] = feature
+
+def pytest_sessionfinish(session):
+    released = sorted(uri for uri, feature in features.items() if not feature.registry and not feature.pickles)
+    print(f"Released features: {released}")
+
+@given("I do nothing")
+def do_nothing():
+    ...
+"""
+
+
+def _make_features(testdir):
+    testdir.makeconftest(CONFTEST)
+    for name in ("first", "second"):
+        testdir.makefile(
+            ".feature",
+            **{
+                name: f"""\
+                    Feature: {name.capitalize()} feature
+                        Scenario Outline: Outline
+                            Given I do nothing
+
+                            Examples:
+                            | param |
+                            | 1     |
+                            | 2     |
+
+                        Scenario: Scenario
+                            Given I do nothing
+                    """
+            },
+        )
+
+
+def test_features_are_released_after_their_last_scenario(testdir, tmp_path):
+    _make_features(testdir)
+    cucumber_json_path = tmp_path / "cucumber.json"
+    result = testdir.runpytest("-s", "--cucumberjson", str(cucumber_json_path))
+    result.assert_outcomes(passed=6)
+    assert "Released features: ['file:first.feature', 'file:second.feature']" in result.stdout.str()
+
+    features = json.loads(cucumber_json_path.read_text())
+    assert [(feature["name"], len(feature["elements"])) for feature in features] == [
+        ("First feature", 3),
+        ("Second feature", 3),
+    ]
+
+
+def test_features_release_is_disabled_by_ini(testdir):
+    _make_features(testdir)
+    testdir.makeini(
+        # language=ini
+        """\
+        [pytest]
+        bdd_release_features = false
+        """
+    )
+    result = testdir.runpytest("-s")
+    result.assert_outcomes(passed=6)
+    assert "Released features: []" in result.stdout.str()
+
+
+def test_feature_release_memory(tmp_path):
+    feature_path = tmp_path / "big.feature"
+    feature_path.write_text(
+        "Feature: Big feature\n"
+        + "".join(
+            f"    Scenario: Scenario {index}\n"
+            f"        Given I have {index} cucumbers\n"
+            f'        When I eat "{index}" cucumbers\n'
+            f"        Then I have 0 cucumbers\n"
+            for index in range(200)
+        )
+    )
+    tracemalloc.start()
+    try:
+        feature, _ = GherkinParser(id_generator=IdGenerator()).parse(None, Path(feature_path), "file:big.feature")
+        gc.collect()
+        loaded_memory, _ = tracemalloc.get_traced_memory()
+        feature.release()
+        gc.collect()
+        released_memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert feature.name == "Big feature"
+    assert released_memory < loaded_memory / 10
@@ -0,0 +1,84 @@
+"""Test session-level store of feature sources."""
+from pathlib import Path
+from textwrap import dedent
+
+from pytest_bdd.message_stream import iter_messages
+
+
+def test_feature_sources_are_not_item_params(testdir, tmp_path):
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        sources="""\
+            Feature: Feature sources
+                Scenario: First
+                    Given I check the feature source
+
+                Scenario: Second
+                    Given I check the feature source
+            """,
+    )
+    testdir.makeconftest(
+        # language=python
+        """\
+        import pytest
+        from pytest_bdd import given
+        from pytest_bdd.feature_sources import get_feature_source_store
+
+        def pytest_collection_modifyitems(config, items):
+            for item in items:
+                assert "feature_source" not in item.callspec.params
+
+        @pytest.hookimpl(trylast=True)
+        def pytest_collection_finish(session):
+            assert get_feature_source_store(session.config).sources
+
+        @given("I check the feature source")
+        def check_feature_source(request, feature_source):
+            # Sources are released after collection and are read again on demand
+            assert not get_feature_source_store(request.config).sources
+            assert feature_source.uri == "file:sources.feature"
+            assert "Feature: Feature sources" in feature_source.data
+        """
+    )
+    messages_path = tmp_path / "messages.ndjson"
+    result = testdir.runpytest("--messages-ndjson", str(messages_path))
+    result.assert_outcomes(passed=2)
+
+    sources = [message["source"] for message in iter_messages(messages_path) if "source" in message]
+    assert [source["uri"] for source in sources] == ["file:sources.feature"]
+    assert "Feature: Feature sources" in sources[0]["data"]
+
+
+def test_feature_sources_in_other_encodings_are_kept(testdir):
+    Path(testdir.tmpdir, "sources.feature").write_text(
+        # language=gherkin
+        dedent(
+            """\
+            Feature: Feature sources
+                Scenario: Größe
+                    Given I check the feature source
+            """
+        ),
+        encoding="latin-1",
+    )
+    testdir.makeconftest(
+        # language=python
+        """\
+        from pytest_bdd import given
+
+        @given("I check the feature source")
+        def check_feature_source(feature_source):
+            assert "Scenario: Größe" in feature_source.data
+        """
+    )
+    testdir.makepyfile(
+        # language=python
+        test_sources="""\
+        from pytest_bdd import scenarios
+
+        test_sources = scenarios("sources.feature", encoding="latin-1")
+        """
+    )
+    result = testdir.runpytest("test_sources.py")
+    result.assert_outcomes(passed=1)
@@ -1,5 +1,6 @@
 from typing import Sequence
 
+import pytest
 from pytest import mark
 
 # language=gherkin
@@ -196,3 +197,62 @@ def test_step_parameters_should_be_replaced_by_their_values(testdir):
     result.stdout.fnmatch_lines("*When I eat {eat} cucumbers (PASSED)".format(**example))
     result.stdout.fnmatch_lines("*Then I should have {left} cucumbers (PASSED)".format(**example))
     result.stdout.fnmatch_lines("*PASSED")
+
+
+def test_short_summary_is_not_affected(testdir):
+    testdir.makefile(".feature", test=FEATURE)
+    testdir.makeconftest(TEST)
+    result = testdir.runpytest("--gherkin-terminal-reporter", "-v", "-rA")
+    result.assert_outcomes(passed=1, failed=0)
+    result.stdout.fnmatch_lines("*Scenario: Scenario example 1    PASSED")
+    result.stdout.fnmatch_lines("PASSED test.feature::test_scenarios*")
+
+
+def test_coexists_with_other_terminal_plugins(testdir):
+    testdir.makefile(".feature", test=FEATURE)
+    testdir.makeconftest(
+        TEST
+        # language=python
+        + """\
+
+    class CustomTerminalPlugin:
+        def __init__(self, config):
+            self.config = config
+
+        def pytest_runtest_logreport(self, report):
+            if report.when == "call":
+                terminal_reporter = self.config.pluginmanager.getplugin("terminalreporter")
+                terminal_reporter.write_line(f"custom: {report.outcome}")
+
+    def pytest_configure(config):
+        config.pluginmanager.register(CustomTerminalPlugin(config))
+    """
+    )
+    result = testdir.runpytest("--gherkin-terminal-reporter", "-v")
+    result.assert_outcomes(passed=1, failed=0)
+    result.stdout.fnmatch_lines(["custom: passed", "*Scenario: Scenario example 1    PASSED"])
+
+
+def test_scenarios_of_xdist_workers_are_rendered_grouped_by_features(testdir):
+    pytest.importorskip("xdist")
+    for index in range(1, 3):
+        testdir.makefile(
+            ".feature",
+            **{
+                f"feature_{index}": f"""\
+                    Feature: Feature {index}
+                        Scenario: Scenario {index}.1
+                            Given there is a bar
+                        Scenario: Scenario {index}.2
+                            Given there is a bar
+                    """
+            },
+        )
+    testdir.makeconftest(TEST)
+    result = testdir.runpytest("--gherkin-terminal-reporter", "-vv", "-n", "2")
+    result.assert_outcomes(passed=4, failed=0)
+    output = result.stdout.str()
+    for index in range(1, 3):
+        assert output.count(f"Feature: Feature {index}") >= 1
+        for scenario_index in range(1, 3):
+            assert f"    Scenario: Scenario {index}.{scenario_index}\n        Given there is a bar (PASSED)\n" in output
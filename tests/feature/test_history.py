@@ -0,0 +1,72 @@
+"""Test scenario and step definition duration history."""
+from pytest_bdd.history import DurationHistory
+
+# language=gherkin
+FEATURE = """\
+Feature: Timed feature
+    Scenario: Timed scenario
+        Given I wait
+        Then I am done
+"""
+
+# language=python
+CONFTEST = """\
+import os
+import time
+from pytest_bdd import given, then
+
+@given("I wait")
+def i_wait():
+    time.sleep(float(os.environ.get("BDD_STEP_DELAY", "0")))
+
+@then("I am done")
+def i_am_done():
+    ...
+"""
+
+
+def test_durations_are_stored(testdir):
+    testdir.makefile(".feature", timed=FEATURE)
+    testdir.makeconftest(CONFTEST)
+    history_path = testdir.tmpdir.join("history.sqlite3")
+
+    for _ in range(2):
+        result = testdir.runpytest(f"--bdd-history={history_path}")
+        result.assert_outcomes(passed=1)
+
+    with DurationHistory(str(history_path)) as history:  # type: ignore[call-arg]
+        assert len(history.get_run_ids()) == 2
+        assert len(history.get_scenario_durations("file:timed.feature::Timed scenario")) == 2
+        assert len(history.get_step_definition_durations("conftest.py:5")) == 2
+        assert len(history.get_step_definition_durations("conftest.py:9")) == 2
+
+
+def test_durations_are_stored_in_cache_by_default(testdir):
+    testdir.makefile(".feature", timed=FEATURE)
+    testdir.makeconftest(CONFTEST)
+
+    result = testdir.runpytest("--bdd-history")
+    result.assert_outcomes(passed=1)
+
+    history_path = testdir.tmpdir.join(".pytest_cache", "d", "pytest_bdd", "history.sqlite3")
+    with DurationHistory(str(history_path)) as history:  # type: ignore[call-arg]
+        assert len(history.get_run_ids()) == 1
+
+
+def test_performance_regressions(testdir, monkeypatch):
+    testdir.makefile(".feature", timed=FEATURE)
+    testdir.makeconftest(CONFTEST)
+    args = ["--bdd-perf-regressions=fail", "--bdd-perf-min-duration=0.05"]
+
+    for _ in range(3):
+        result = testdir.runpytest(*args)
+        assert result.ret == 0
+        result.stdout.fnmatch_lines(["*bdd performance regressions: 0*"])
+
+    monkeypatch.setenv("BDD_STEP_DELAY", "0.1")
+    result = testdir.runpytest(*args)
+    result.assert_outcomes(passed=1)
+    assert result.ret == 1
+    result.stdout.fnmatch_lines(["*bdd performance regressions: 2*"])
+    result.stdout.fnmatch_lines(["scenario file:timed.feature::Timed scenario: 0.1*s is *x slower than baseline*"])
+    result.stdout.fnmatch_lines(["step definition conftest.py:5: 0.1*s is *x slower than baseline*"])
@@ -223,3 +223,37 @@ def test_feature_load_by_http_with_base_url_from_ini(testdir, httpserver: HTTPSe
     )
     result = testdir.runpytest_inprocess()
     result.assert_outcomes(passed=1)
+
+
+def test_feature_source_of_feature_loaded_by_http(testdir: "Testdir", httpserver: HTTPServer):
+    httpserver.expect_request("/feature").respond_with_data(
+        MINIMAL_FEATURE,
+        content_type=Mimetype.gherkin_plain.value,
+    )
+    testdir.makeconftest(
+        # language=python
+        f"""\
+        from pytest_bdd import given
+
+        @given("I have {{cuckes_count}} cukes in my belly")
+        def results(cuckes_count, feature_source):
+            # Features loaded by URL can't be read again after the collection, so their sources are kept
+            assert feature_source.uri == "http://localhost:{httpserver.port}/feature"
+            assert "Feature: minimal" in feature_source.data
+        """
+    )
+    testdir.makepyfile(
+        # language=python
+        test_http=f"""\
+            from pytest_bdd import scenarios, FeaturePathType
+            from pytest_bdd.mimetypes import Mimetype
+
+            test_cuckes = scenarios(
+                f"http://localhost:{httpserver.port}/feature",
+                features_mimetype=Mimetype.gherkin_plain,
+                features_path_type=FeaturePathType.URL
+            )
+        """
+    )
+    result = testdir.runpytest_inprocess()
+    result.assert_outcomes(passed=1)
@@ -0,0 +1,123 @@
+"""Test change-based scenario selection."""
+import textwrap
+
+# language=gherkin
+FEATURE = """\
+Feature: Impacted feature
+    Scenario: First scenario
+        Given first step
+
+    Scenario: Second scenario
+        Given second step
+"""
+
+# language=python
+STEPS = """\
+from pytest_bdd import given
+
+@given("first step")
+def first_step():
+    print("executed first step")
+
+@given("second step")
+def second_step():
+    print("executed second step")
+"""
+
+
+def test_only_affected_scenarios_are_selected(testdir):
+    testdir.makefile(".feature", impacted=FEATURE)
+    testdir.makeconftest(STEPS)
+
+    result = testdir.runpytest("--bdd-affected")
+    result.assert_outcomes(passed=2)
+
+    result = testdir.runpytest("--bdd-affected")
+    result.assert_outcomes(passed=0, deselected=2)
+
+    testdir.makeconftest(STEPS.replace('print("executed second step")', 'print("executed changed second step")'))
+    result = testdir.runpytest("--bdd-affected", "-s")
+    result.assert_outcomes(passed=1, deselected=1)
+    result.stdout.fnmatch_lines(["*executed changed second step*"])
+    result.stdout.no_fnmatch_line("*executed first step*")
+
+    testdir.makefile(
+        ".feature", impacted=FEATURE.replace("Given first step", "Given first step\n        And second step")
+    )
+    testdir.makefile(".feature", other=FEATURE.replace("Impacted feature", "Other feature"))
+    result = testdir.runpytest("--bdd-affected")
+    result.assert_outcomes(passed=4)
+
+    result = testdir.runpytest("--bdd-affected")
+    result.assert_outcomes(passed=0, deselected=4)
+
+
+def test_failed_and_new_scenarios_are_selected(testdir):
+    testdir.makefile(".feature", impacted=FEATURE)
+    testdir.makeconftest(STEPS.replace('print("executed second step")', "assert False"))
+
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=1, failed=1)
+
+    testdir.makefile(
+        ".feature",
+        other=textwrap.dedent(
+            # language=gherkin
+            """\
+            Feature: New feature
+                Scenario: New scenario
+                    Given first step
+            """
+        ),
+    )
+    result = testdir.runpytest("--bdd-affected", "-v")
+    result.assert_outcomes(passed=1, failed=1, deselected=1)
+    result.stdout.fnmatch_lines(["*New scenario*PASSED*"])
+    result.stdout.fnmatch_lines(["*Second scenario*FAILED*"])
+
+
+def test_impact_map_is_not_used_without_option(testdir):
+    testdir.makefile(".feature", impacted=FEATURE)
+    testdir.makeconftest(STEPS)
+
+    testdir.runpytest().assert_outcomes(passed=2)
+    testdir.runpytest().assert_outcomes(passed=2)
+
+
+def test_scenarios_executed_as_single_item_are_recorded_by_every_row(testdir):
+    testdir.makeini(
+        # language=ini
+        """\
+        [pytest]
+        bdd_single_item = outline
+        """
+    )
+    testdir.makefile(
+        ".feature",
+        impacted=textwrap.dedent(
+            # language=gherkin
+            """\
+            Feature: Impacted feature
+                Scenario Outline: Outline
+                    Given <step> step
+
+                    Examples:
+                    | step   |
+                    | first  |
+                    | second |
+            """
+        ),
+    )
+    testdir.makeconftest(STEPS)
+
+    result = testdir.runpytest("--bdd-affected")
+    result.assert_outcomes(passed=1)
+
+    result = testdir.runpytest("--bdd-affected")
+    result.assert_outcomes(passed=0, deselected=1)
+
+    # Step definition of the first row is changed, not only of the last one
+    testdir.makeconftest(STEPS.replace('print("executed first step")', 'print("executed changed first step")'))
+    result = testdir.runpytest("--bdd-affected", "-s")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*executed changed first step*"])
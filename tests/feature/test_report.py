@@ -1,9 +1,11 @@
 """Test scenario reporting."""
+import json
 import re
 from pathlib import Path
 from typing import Optional, Union
 
 import execnet.gateway_base
+import pytest
 
 
 class OfType:
@@ -361,3 +363,136 @@ def test_complex_types(testdir, pytestconfig):
     assert report.passed
     assert execnet.gateway_base.dumps(report.item)
     assert execnet.gateway_base.dumps(report.scenario)
+
+
+def test_feature_metadata_is_transferred_once_per_worker(testdir):
+    """Test xdist workers send feature metadata once and scenario payloads reference it."""
+    pytest.importorskip("xdist")
+    for feature_name in ("first", "second"):
+        testdir.makefile(
+            ".feature",
+            **{
+                feature_name: f"""\
+                    Feature: {feature_name.capitalize()} feature
+                        Description of the {feature_name} feature
+
+                        Scenario Outline: Passing
+                            Given step <value>
+
+                            Examples:
+                            | value |
+                            | 1     |
+                            | 2     |
+                            | 3     |
+                    """
+            },
+        )
+    testdir.makeconftest(
+        # language=python
+        """\
+        import json
+        from pathlib import Path
+
+        import pytest
+        from pytest_bdd import given
+
+        @given("step {value}")
+        def step(value):
+            ...
+
+        @pytest.hookimpl(hookwrapper=True, tryfirst=True)
+        def pytest_report_to_serializable(config, report):
+            outcome = yield
+            data = outcome.get_result()
+            with (Path(str(config.rootdir)) / "transferred.jsonl").open(mode="a") as f:
+                f.write(json.dumps({key: data.get(key) for key in ("when", "scenario", "bdd_features")}) + "\\n")
+
+        def pytest_configure(config):
+            config.pluginmanager.register(ReceivedScenariosRecorder(config))
+
+        class ReceivedScenariosRecorder:
+            def __init__(self, config):
+                self.config = config
+
+            def pytest_runtest_logreport(self, report):
+                if hasattr(report, "scenario") and not hasattr(self.config, "workerinput"):
+                    with (Path(str(self.config.rootdir)) / "received.jsonl").open(mode="a") as f:
+                        f.write(json.dumps(report.scenario) + "\\n")
+        """
+    )
+    result = testdir.runpytest("-n", "2")
+    result.assert_outcomes(passed=6)
+
+    transferred = [json.loads(line) for line in (testdir.tmpdir / "transferred.jsonl").readlines()]
+    assert all(data["scenario"] is None for data in transferred if data["when"] != "call")
+    scenario_data = [data for data in transferred if data["when"] == "call"]
+    assert len(scenario_data) == 6
+    assert all(isinstance(data["scenario"]["feature"], str) for data in scenario_data)
+    sent_features = [feature for data in scenario_data for feature in (data["bdd_features"] or {}).values()]
+    assert 2 <= len(sent_features) <= 4
+    assert {feature["name"] for feature in sent_features} == {"First feature", "Second feature"}
+
+    received = [json.loads(line) for line in (testdir.tmpdir / "received.jsonl").readlines()]
+    assert len(received) == 6
+    for scenario in received:
+        feature_name = scenario["feature"]["rel_filename"][: -len(".feature")]
+        assert scenario["feature"]["name"] == f"{feature_name.capitalize()} feature"
+        assert scenario["feature"]["description"] == f"Description of the {feature_name} feature"
+
+
+def test_xdist_reports_serialized_twice_keep_features(testdir):
+    """Features are transferred even if reports are serialized by other plugins before they are sent"""
+    pytest.importorskip("xdist")
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        feature="""\
+            Feature: Feature
+                Scenario Outline: Passing
+                    Given step <value>
+
+                    Examples:
+                    | value |
+                    | 1     |
+                    | 2     |
+            """,
+    )
+    testdir.makeconftest(
+        # language=python
+        """\
+        import json
+        from pathlib import Path
+
+        import pytest
+        from pytest_bdd import given
+
+        @given("step {value}")
+        def step(value):
+            ...
+
+        def pytest_configure(config):
+            if hasattr(config, "workerinput"):
+                config.pluginmanager.register(ReportLogger(config))
+
+        # Serializes reports on workers before they are sent to the controller
+        class ReportLogger:
+            def __init__(self, config):
+                self.config = config
+
+            @pytest.hookimpl(tryfirst=True)
+            def pytest_runtest_logreport(self, report):
+                self.config.hook.pytest_report_to_serializable(config=self.config, report=report)
+
+        def pytest_sessionfinish(session):
+            if not hasattr(session.config, "workerinput"):
+                with (Path(str(session.config.rootdir)) / "received.jsonl").open(mode="a") as f:
+                    for report in session.config.pluginmanager.getplugin("terminalreporter").stats["passed"]:
+                        f.write(json.dumps(report.scenario) + "\\n")
+        """
+    )
+    result = testdir.runpytest("-n", "2")
+    result.assert_outcomes(passed=2)
+
+    received = [json.loads(line) for line in (testdir.tmpdir / "received.jsonl").readlines()]
+    assert len(received) == 2
+    assert all(scenario["feature"]["name"] == "Feature" for scenario in received)
@@ -1,8 +1,12 @@
 """Test scenario decorator."""
 from textwrap import dedent
 
+from pytest import mark
+
 from pytest_bdd.compatibility.pytest import assert_outcomes
 
+pytestmark = mark.usefixtures("hook_calls")
+
 
 def test_simple(testdir, pytest_params, tmp_path):
     """Test scenario decorator with a standard usage."""
@@ -0,0 +1,95 @@
+"""Test scenario sharding."""
+import json
+import re
+
+from pytest import mark
+
+# language=gherkin
+FEATURE = """\
+Feature: Sharded feature
+    Scenario Outline: Outlined scenario
+        Given step <value>
+
+        Examples:
+        | value |
+        | 1     |
+        | 2     |
+        | 3     |
+
+    Scenario: First scenario
+        Given step 4
+
+    Scenario: Second scenario
+        Given step 5
+
+    Scenario: Third scenario
+        Given step 6
+"""
+
+# language=python
+CONFTEST = """\
+from pytest_bdd import given, parsers
+
+@given(parsers.parse("step {value}"))
+def step(value):
+    print(f"executed step {value}")
+"""
+
+
+def get_executed_steps(result):
+    return set(re.findall(r"executed step (\d+)", result.stdout.str()))
+
+
+def test_shards_are_disjoint_and_complete(testdir):
+    testdir.makefile(".feature", sharded=FEATURE)
+    testdir.makeconftest(CONFTEST)
+
+    executed_steps = []
+    for index in range(1, 4):
+        result = testdir.runpytest("-s", f"--bdd-shard={index}/3")
+        result.stdout.fnmatch_lines([f"bdd shard: {index}/3 (balanced by hash)"])
+        executed_steps.append(get_executed_steps(result))
+
+    assert set.union(*executed_steps) == {"1", "2", "3", "4", "5", "6"}
+    assert sum(map(len, executed_steps)) == 6
+
+
+def test_shards_are_stable(testdir):
+    testdir.makefile(".feature", sharded=FEATURE)
+    testdir.makeconftest(CONFTEST)
+
+    first_run = get_executed_steps(testdir.runpytest("-s", "--bdd-shard=1/2"))
+    second_run = get_executed_steps(testdir.runpytest("-s", "--bdd-shard=1/2"))
+
+    assert first_run == second_run
+
+
+def test_shards_are_balanced_by_durations(testdir):
+    testdir.makefile(".feature", sharded=FEATURE)
+    testdir.makeconftest(CONFTEST)
+
+    durations_path = testdir.tmpdir.join("durations.json")
+    result = testdir.runpytest(f"--bdd-store-durations={durations_path}")
+    result.assert_outcomes(passed=6)
+
+    durations = json.loads(durations_path.read_text(encoding="utf-8"))
+    assert len(durations) == 6
+    assert "file:sharded.feature::Outlined scenario[table_rows:[line: 9]]" in durations
+
+    durations = dict.fromkeys(durations, 1.0)
+    durations["file:sharded.feature::First scenario"] = 10.0
+    durations_path.write_text(json.dumps(durations), encoding="utf-8")
+
+    executed_steps = [
+        get_executed_steps(testdir.runpytest("-s", "--bdd-shard=1/2", f"--bdd-shard-durations={durations_path}")),
+        get_executed_steps(testdir.runpytest("-s", "--bdd-shard=2/2", f"--bdd-shard-durations={durations_path}")),
+    ]
+
+    assert {"4"} in executed_steps
+    assert {"1", "2", "3", "5", "6"} in executed_steps
+
+
+@mark.parametrize("shard", ["0/3", "4/3", "1", "a/b"])
+def test_invalid_shard(testdir, shard):
+    result = testdir.runpytest(f"--bdd-shard={shard}")
+    assert result.ret != 0
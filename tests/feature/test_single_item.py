@@ -0,0 +1,160 @@
+"""Test execution of scenario outlines and features as a single item."""
+import json
+
+# language=gherkin
+FEATURE = """\
+Feature: Outline feature
+    Scenario Outline: Outlined scenario
+        Given there is a counter
+        When I add <value>
+        Then counter is <value>
+
+        Examples:
+        | value |
+        | 1     |
+        | 2     |
+        | 3     |
+
+    Scenario: Regular scenario
+        Given there is a counter
+        Then counter is 0
+"""
+
+# language=python
+CONFTEST = """\
+from pytest import fixture
+from pytest_bdd import given, when, then, parsers
+
+@fixture
+def counter():
+    print("counter setup")
+    return [0]
+
+@given("there is a counter")
+def there_is_a_counter(counter):
+    ...
+
+@when(parsers.parse("I add {value:d}"))
+def add(counter, value):
+    counter[0] += value
+
+@then(parsers.parse("counter is {value:d}"))
+def counter_is(counter, value):
+    assert counter[0] == value
+"""
+
+
+def test_outline_is_executed_as_single_item(testdir):
+    testdir.makefile(".feature", outline=FEATURE)
+    testdir.makeconftest(CONFTEST)
+    testdir.makeini(
+        """\
+        [pytest]
+        bdd_single_item = outline
+        """
+    )
+
+    result = testdir.runpytest("-s")
+    result.assert_outcomes(passed=2)
+    # Function scoped fixtures are set up from scratch for every example
+    assert result.stdout.str().count("counter setup") == 4
+
+
+def test_outline_is_executed_as_single_item_by_tag(testdir):
+    testdir.makefile(
+        ".feature", outline=FEATURE.replace("    Scenario Outline:", "    @single_item\n    Scenario Outline:")
+    )
+    testdir.makeconftest(CONFTEST)
+
+    result = testdir.runpytest("-s")
+    result.assert_outcomes(passed=2)
+
+
+def test_feature_is_executed_as_single_item_by_tag(testdir):
+    testdir.makefile(".feature", outline=f"@single_item\n{FEATURE}")
+    testdir.makeconftest(CONFTEST)
+
+    result = testdir.runpytest("-s")
+    result.assert_outcomes(passed=1)
+    assert result.stdout.str().count("counter setup") == 4
+
+
+def test_single_item_failures_are_reported_per_scenario(testdir):
+    testdir.makefile(
+        ".feature", outline=FEATURE.replace("| 2     |", "| 2     |\n        | -1    |\n        | -2    |")
+    )
+    testdir.makeconftest(CONFTEST.replace("counter[0] += value", "counter[0] += abs(value)"))
+    testdir.makeini(
+        """\
+        [pytest]
+        bdd_single_item = outline
+        """
+    )
+    cucumber_json_path = testdir.tmpdir.join("cucumber.json")
+    messages_path = testdir.tmpdir.join("messages.ndjson")
+
+    result = testdir.runpytest(
+        "-vv",
+        "--gherkin-terminal-reporter",
+        f"--cucumberjson={cucumber_json_path}",
+        f"--messagesndjson={messages_path}",
+    )
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(["*ScenarioBatchError: 2 of 5 scenarios failed:*"])
+    result.stdout.fnmatch_lines(["*Scenario: Outlined scenario*", "*PASSED*"])
+    result.stdout.fnmatch_lines(["*Scenario: Outlined scenario*", "*FAILED*"])
+
+    cucumber_json = json.loads(cucumber_json_path.read())
+    elements = cucumber_json[0]["elements"]
+    assert len(elements) == 6
+    assert [step["result"]["status"] for element in elements for step in element["steps"]].count("failed") == 2
+
+    messages = [json.loads(line) for line in messages_path.readlines()]
+    assert len([message for message in messages if "pickle" in message]) == 6
+    assert len([message for message in messages if "testCase" in message]) == 6
+    assert len([message for message in messages if "testCaseStarted" in message]) == 6
+
+
+def test_teardown_failures_between_scenarios_dont_stop_single_item(testdir):
+    testdir.makefile(".feature", outline=FEATURE)
+    testdir.makeconftest(
+        CONFTEST.replace(
+            """    print("counter setup")
+    return [0]""",
+            """    print("counter setup")
+    counter = [0]
+    yield counter
+    print(f"counter teardown {counter[0]}")
+    assert counter[0] != 2""",
+        )
+    )
+    testdir.makeini(
+        """\
+        [pytest]
+        bdd_single_item = outline
+        """
+    )
+
+    result = testdir.runpytest("-s")
+    result.assert_outcomes(passed=1, failed=1)
+    output = result.stdout.str()
+    # Scenarios after the failed teardown are still run, each with its own set up fixture
+    assert output.count("counter setup\n") == 4
+    for value in (1, 2, 3):
+        assert f"counter teardown {value}" in output
+    result.stdout.fnmatch_lines(["E*assert 2 != 2", "conftest.py:*: AssertionError"])
+
+
+def test_invalid_single_item_mode_is_usage_error(testdir):
+    testdir.makefile(".feature", outline=FEATURE)
+    testdir.makeconftest(CONFTEST)
+    testdir.makeini(
+        """\
+        [pytest]
+        bdd_single_item = outlines
+        """
+    )
+
+    result = testdir.runpytest()
+    assert result.ret == 4
+    result.stderr.fnmatch_lines(["*bdd_single_item has to be*got 'outlines'*"])
@@ -0,0 +1,213 @@
+"""Test ahead-of-time binding of steps to step definitions."""
+import re
+
+# language=python
+CONFTEST = """\
+import pytest
+from pytest_bdd import given, then, when
+
+match_calls = []
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_bdd_match_step_definition_to_step(request, feature, scenario, step, previous_step):
+    match_calls.append(step.text)
+    yield
+
+def pytest_sessionfinish(session):
+    print(f"Step matches: {len(match_calls)}")
+
+@given("I have {count:d} cucumbers", target_fixture="cucumbers")
+def have_cucumbers(count):
+    return {"count": count}
+
+@when("I eat {count} cucumbers", converters={"count": int})
+def eat_cucumbers(cucumbers, count):
+    cucumbers["count"] -= count
+
+@then("I have {count:d} cucumbers left")
+def cucumbers_left(cucumbers, count):
+    assert cucumbers["count"] == count
+"""
+
+
+def test_steps_are_bound_at_collection(testdir, tmp_path):
+    testdir.makeconftest(CONFTEST)
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        binding="""\
+            Feature: Steps binding
+                Scenario Outline: Eating
+                    Given I have 5 cucumbers
+                    When I eat <eaten> cucumbers
+                    Then I have <left> cucumbers left
+
+                    Examples:
+                    | eaten | left |
+                    | 1     | 4    |
+                    | 2     | 3    |
+                    | 1     | 4    |
+
+                Scenario: Eating all
+                    Given I have 5 cucumbers
+                    When I eat 5 cucumbers
+                    Then I have 0 cucumbers left
+            """,
+    )
+    messages_path = tmp_path / "messages.ndjson"
+    result = testdir.runpytest("--bdd-bind-steps", "--messages-ndjson", str(messages_path), "-s")
+    result.assert_outcomes(passed=4)
+    # Unique steps are matched once at collection; neither execution nor messages match steps again
+    result.stdout.fnmatch_lines(["*Step matches: 7"])
+
+
+def test_steps_are_matched_at_execution_by_default(testdir):
+    testdir.makeconftest(CONFTEST)
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        binding="""\
+            Feature: Steps binding
+                Scenario: Eating all
+                    Given I have 5 cucumbers
+                    When I eat 5 cucumbers
+                    Then I have 0 cucumbers left
+            """,
+    )
+    result = testdir.runpytest("-s")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*Step matches: 3"])
+
+
+def test_undefined_steps_are_collection_errors(testdir):
+    testdir.makeconftest(CONFTEST)
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        binding="""\
+            Feature: Steps binding
+                Scenario: Bound
+                    Given I have 5 cucumbers
+
+                Scenario: First unbound
+                    Given I have 5 cucumbers
+                    When I juggle with cucumbers
+
+                Scenario: Second unbound
+                    Given I have no cucumbers
+                    Then I am sad
+            """,
+    )
+    result = testdir.runpytest("--bdd-bind-steps")
+    result.assert_outcomes(errors=2)
+    output = result.stdout.str()
+    for step_text in ("I juggle with cucumbers", "I have no cucumbers", "I am sad"):
+        assert f'Step definition is not found: "{step_text}"' in output
+    assert re.search(r"Interrupted: 2 errors during collection", output)
+
+
+def test_steps_binding_is_enabled_by_ini(testdir):
+    testdir.makeconftest(CONFTEST)
+    testdir.makeini(
+        # language=ini
+        """\
+        [pytest]
+        bdd_bind_steps = true
+        """
+    )
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        binding="""\
+            Feature: Steps binding
+                Scenario: Unbound
+                    Given I have no cucumbers
+            """,
+    )
+    result = testdir.runpytest()
+    result.assert_outcomes(errors=1)
+    result.stdout.fnmatch_lines(['*Step definition is not found: "I have no cucumbers"*'])
+
+
+# language=python
+BASKET_CONFTEST = """\
+import pytest
+from cucumber_expressions.parameter_type import ParameterType
+from cucumber_expressions.parameter_type_registry import ParameterTypeRegistry
+
+from pytest_bdd import given, then
+from pytest_bdd.parsers import cucumber_expression, parse
+
+@pytest.fixture
+def parameter_type_registry():
+    registry = ParameterTypeRegistry()
+    registry.define_parameter_type(ParameterType("basket", "{basket_regexp}", list, lambda _: [], True, False))
+    return registry
+
+@given(
+    cucumber_expression("I put {{int}} cucumbers into the {{basket}}"),
+    anonymous_group_names=["count", "basket"],
+    target_fixture="basket",
+)
+def put_cucumbers(count, basket):
+    basket.extend(["cucumber"] * count)
+    return basket
+
+@then(parse("the basket has {{count:d}} cucumbers"))
+def basket_has_cucumbers(basket, count):
+    assert len(basket) == count
+"""
+
+
+def test_stateful_parameter_types_are_not_shared_by_bound_steps(testdir):
+    testdir.makeconftest(BASKET_CONFTEST.format(basket_regexp="basket"))
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        basket="""\
+            Feature: Stateful parameter types
+                Scenario: First basket
+                    Given I put 3 cucumbers into the basket
+                    Then the basket has 3 cucumbers
+
+                Scenario: Second basket
+                    Given I put 3 cucumbers into the basket
+                    Then the basket has 3 cucumbers
+            """,
+    )
+    for args in [(), ("--bdd-bind-steps",)]:
+        result = testdir.runpytest(*args)
+        result.assert_outcomes(passed=2)
+
+
+def test_steps_are_bound_by_overridden_fixtures_used_for_matching(testdir):
+    # language=gherkin
+    feature = """\
+        Feature: Overridden parameter types
+            Scenario: Bag
+                Given I put 3 cucumbers into the bag
+                Then the basket has 3 cucumbers
+        """
+    testdir.makeconftest(BASKET_CONFTEST.format(basket_regexp="basket"))
+    testdir.makefile(".feature", bag=feature)
+    nested_dir = testdir.mkdir("nested")
+    nested_dir.join("conftest.py").write(
+        # language=python
+        """\
+import pytest
+from cucumber_expressions.parameter_type import ParameterType
+from cucumber_expressions.parameter_type_registry import ParameterTypeRegistry
+
+@pytest.fixture
+def parameter_type_registry():
+    registry = ParameterTypeRegistry()
+    registry.define_parameter_type(ParameterType("basket", "bag", list, lambda _: [], True, False))
+    return registry
+"""
+    )
+    nested_dir.join("bag.feature").write(feature)
+    result = testdir.runpytest("--bdd-bind-steps", "--continue-on-collection-errors", "-v")
+    # Step is bound only for the nested feature, where the parameter type registry is overridden
+    result.assert_outcomes(passed=1, failed=1, errors=1)
+    result.stdout.fnmatch_lines(["*nested/bag.feature*PASSED*"])
+    result.stdout.no_fnmatch_line("*ERROR*nested/bag.feature*")
@@ -0,0 +1,120 @@
+"""Test span based tracing export."""
+import json
+
+import pytest
+
+# language=gherkin
+FEATURE = """\
+Feature: Traced feature
+    Scenario: Passing scenario
+        Given I have a "bar"
+        Then traceparent is propagated
+
+    Scenario: Failing scenario
+        Given I have a "bar"
+        Then it fails
+"""
+
+# language=python
+CONFTEST = """\
+from pytest import fixture
+from pytest_bdd import given, then, parsers
+
+@fixture
+def baz():
+    return "baz"
+
+@given(parsers.parse('I have a "{value}"'))
+def i_have(value, baz):
+    ...
+
+@then("traceparent is propagated")
+def traceparent_is_propagated(bdd_traceparent):
+    print(f"traceparent: {bdd_traceparent()}")
+
+@then("it fails")
+def it_fails():
+    raise ValueError("fails")
+"""
+
+
+def load_spans(path):
+    return [
+        span
+        for line in path.readlines()
+        for resource_spans in json.loads(line)["resourceSpans"]
+        for scope_spans in resource_spans["scopeSpans"]
+        for span in scope_spans["spans"]
+    ]
+
+
+def get_attribute(span, key):
+    return next(attribute["value"] for attribute in span["attributes"] if attribute["key"] == key)
+
+
+def test_spans_are_exported(testdir):
+    testdir.makefile(".feature", traced=FEATURE)
+    testdir.makeconftest(CONFTEST)
+    trace_path = testdir.tmpdir.join("trace.otlp.json")
+
+    result = testdir.runpytest("-s", f"--bdd-trace={trace_path}")
+    result.assert_outcomes(passed=1, failed=1)
+
+    spans = load_spans(trace_path)
+    spans_by_name = {span["name"]: span for span in spans}
+    assert len({span["traceId"] for span in spans}) == 1
+
+    session_span = spans_by_name["session"]
+    assert "parentSpanId" not in session_span
+    feature_span = spans_by_name["Feature: Traced feature"]
+    assert feature_span["parentSpanId"] == session_span["spanId"]
+
+    passing_span = spans_by_name["Scenario: Passing scenario"]
+    failing_span = spans_by_name["Scenario: Failing scenario"]
+    assert passing_span["parentSpanId"] == feature_span["spanId"]
+    assert failing_span["parentSpanId"] == feature_span["spanId"]
+    assert failing_span["status"]["code"] == 2
+    assert passing_span["status"]["code"] == 0
+
+    step_spans = [span for span in spans if span["name"] == 'Step: I have a "bar"']
+    assert {span["parentSpanId"] for span in step_spans} == {passing_span["spanId"], failing_span["spanId"]}
+    step_span = next(span for span in step_spans if span["parentSpanId"] == passing_span["spanId"])
+    assert get_attribute(step_span, "pytest_bdd.step_definition.pattern") == {"stringValue": 'I have a "{value}"'}
+    assert get_attribute(step_span, "pytest_bdd.step.args.value") == {"stringValue": "bar"}
+    assert any(
+        span["name"] == "Fixture: baz" and span["parentSpanId"] == step_span["spanId"] for span in spans
+    ), "Fixture set up by step is not a child span of the step"
+
+    failed_step_span = spans_by_name["Step: it fails"]
+    assert failed_step_span["status"] == {"code": 2, "message": "ValueError: fails"}
+
+    propagated_step_span = spans_by_name["Step: traceparent is propagated"]
+    result.stdout.fnmatch_lines(
+        [f"*traceparent: 00-{propagated_step_span['traceId']}-{propagated_step_span['spanId']}-01"]
+    )
+
+
+def test_traceparent_without_tracing(testdir):
+    testdir.makefile(".feature", traced=FEATURE)
+    testdir.makeconftest(CONFTEST)
+
+    result = testdir.runpytest("-s")
+    result.assert_outcomes(passed=1, failed=1)
+    result.stdout.fnmatch_lines(["*traceparent: None"])
+
+
+def test_spans_of_xdist_workers_belong_to_session_trace(testdir):
+    pytest.importorskip("xdist")
+    testdir.makefile(".feature", traced=FEATURE)
+    testdir.makeconftest(CONFTEST)
+    trace_path = testdir.tmpdir.join("trace.otlp.json")
+
+    result = testdir.runpytest("-n", "2", f"--bdd-trace={trace_path}")
+    result.assert_outcomes(passed=1, failed=1)
+
+    spans = load_spans(trace_path)
+    session_span = next(span for span in spans if span["name"] == "session")
+    assert {span["traceId"] for span in spans} == {session_span["traceId"]}
+    assert {span["parentSpanId"] for span in spans if span["name"] == "Feature: Traced feature"} == {
+        session_span["spanId"]
+    }
@@ -0,0 +1,110 @@
+"""Test watch mode."""
+import textwrap
+
+# language=gherkin
+EATING_FEATURE = """\
+Feature: Eating
+    Scenario: Eating
+        Given I have 5 cucumbers
+        When I eat 2 cucumbers
+        Then I have 3 cucumbers left
+"""
+
+# language=gherkin
+SHARING_FEATURE = """\
+Feature: Sharing
+    Scenario: Sharing
+        Given I have 5 cucumbers
+        Then I have 5 cucumbers left
+"""
+
+# language=python
+STEPS = """\
+from pytest_bdd import given, then, when
+
+print("Steps are imported")
+
+@given("I have {count:d} cucumbers", target_fixture="cucumbers")
+def have_cucumbers(count):
+    return {"count": count}
+
+@when("I eat {count:d} cucumbers")
+def eat_cucumbers(cucumbers, count):
+    cucumbers["count"] -= count
+
+@then("I have {count:d} cucumbers left")
+def cucumbers_left(cucumbers, count):
+    assert cucumbers["count"] == count
+"""
+
+
+def make_watched_project(testdir, on_first_run):
+    testdir.makefile(".feature", eating=EATING_FEATURE, sharing=SHARING_FEATURE)
+    testdir.makepyfile(steps=STEPS)
+    # Probe is a plugin module, so it stays imported between runs unlike conftest
+    testdir.makepyfile(
+        # language=python
+        probe=f"""\
+from pathlib import Path
+
+runs = []
+feature_ids = {{}}
+
+def pytest_collection_modifyitems(session, config, items):
+    for item in items:
+        feature = item.callspec.params["feature"]
+        reused = feature_ids.setdefault(feature.uri, id(feature)) == id(feature)
+        print(f"Feature {{feature.uri}} is reused: {{reused}}")
+
+def pytest_sessionfinish(session):
+    runs.append(session)
+    if len(runs) == 1:
+        root_path = Path(str(session.config.rootdir))
+{textwrap.indent(textwrap.dedent(on_first_run), " " * 8)}
+"""
+    )
+    testdir.makeconftest('pytest_plugins = ["steps", "probe"]')
+
+
+def test_watch_reruns_scenarios_of_changed_features(testdir):
+    make_watched_project(
+        testdir,
+        # language=python
+        on_first_run="""\
+            feature_path = root_path / "sharing.feature"
+            feature_path.write_text(feature_path.read_text().replace("Scenario: Sharing", "Scenario: Sharing again"))
+            """,
+    )
+    result = testdir.runpytest_subprocess(
+        "--bdd-watch", "--bdd-watch-runs", "2", "--bdd-watch-interval", "0.05", "-s", "-p", "no:xdist"
+    )
+    assert result.ret == 0
+    output = result.stdout.str()
+    assert output.count("Steps are imported") == 1
+    assert "bdd watch: changed: sharing.feature" in output
+    # Unchanged feature isn't parsed again; only scenarios of the changed one are run
+    assert "Feature file:eating.feature is reused: False" not in output
+    assert "Feature file:sharing.feature is reused: False" in output
+    result.stdout.fnmatch_lines(["*2 passed*", "*1 passed, 1 deselected*"])
+
+
+def test_watch_reloads_changed_step_definitions(testdir):
+    make_watched_project(
+        testdir,
+        # language=python
+        on_first_run="""\
+            steps_path = root_path / "steps.py"
+            steps_path.write_text(
+                steps_path.read_text().replace('cucumbers["count"] -= count', 'cucumbers["count"] = cucumbers["count"] - count')
+            )
+            """,
+    )
+    result = testdir.runpytest_subprocess(
+        "--bdd-watch", "--bdd-watch-runs", "2", "--bdd-watch-interval", "0.05", "-s", "-p", "no:xdist"
+    )
+    assert result.ret == 0
+    output = result.stdout.str()
+    assert output.count("Steps are imported") == 2
+    assert "bdd watch: changed: steps.py" in output
+    # Only the scenario using the changed step definition is run again
+    result.stdout.fnmatch_lines(["*2 passed*", "*1 passed, 1 deselected*"])
@@ -132,3 +132,69 @@ def test_generate_missing_with_step_parsers(testdir):
     assert "I use parsers.parse" not in output
     assert "I use parsers.re" not in output
     assert "I use parsers.cfparse" not in output
+
+
+def test_generate_missing_does_not_set_up_fixtures(testdir):
+    """Test that missing steps are found without the items setup, also for overridden step registries."""
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        generation="""\
+            Feature: Missing code generation without fixtures setup
+
+                Scenario: Defined steps
+                    Given I have 1 cucumber
+                    And I have a conftest step
+                    When I use a module step
+
+                Scenario: Undefined steps
+                    Given I have 2 cucumbers
+                    And I have an undefined step
+                    Given I have an undefined step
+                    Then I have another undefined step
+            """,
+    )
+    testdir.makeconftest(
+        # language=python
+        """\
+        import pytest
+        from pytest_bdd import given
+
+        @pytest.fixture(autouse=True)
+        def failing_fixture():
+            raise RuntimeError("Fixtures must not be set up")
+
+        @given("I have {int} cucumber")
+        def cucumber(int):
+            ...
+
+        @given("I have a conftest step")
+        def conftest_step():
+            ...
+        """
+    )
+    testdir.makepyfile(
+        # language=python
+        """\
+        from pytest_bdd import scenarios, when
+
+        @when("I use a module step")
+        def module_step():
+            ...
+
+        test_generation = scenarios("generation.feature")
+        """
+    )
+
+    result = testdir.runpytest("--generate-missing", "--feature", "generation.feature", "--disable-feature-autoload")
+    assert not result.stderr.str()
+
+    output = result.stdout.str()
+    assert "Fixtures must not be set up" not in output
+    assert "is not bound to any test" not in output
+    for step_text in ("I have 1 cucumber", "I have a conftest step", "I use a module step"):
+        assert step_text not in output
+    result.stdout.fnmatch_lines(['*StepHandler Given "I have 2 cucumbers" is not defined in the scenario*'])
+    assert output.count('StepHandler Given "I have an undefined step" is not defined') == 2
+    assert output.count("@given('I have an undefined step')") == 1
+    assert output.count("@then('I have another undefined step')") == 1
@@ -0,0 +1,123 @@
+import json
+import tracemalloc
+
+from gherkin.ast_builder import AstBuilder
+from gherkin.parser import Parser as CucumberIOBaseParser  # type: ignore[import]
+from gherkin.pickles.compiler import Compiler as PicklesCompiler
+from pytest import importorskip, raises
+
+from messages import PickleStep  # type:ignore[attr-defined]
+from pytest_bdd.model import CompactPickle, CompactPickleStep, Feature, Table
+from pytest_bdd.utils import IdGenerator
+
+# language=gherkin
+TABLE_FEATURE = """\
+Feature: Data tables
+    Scenario Outline: Outline
+        Given I have cucumbers
+            | color   | count   |
+            | green   | <green> |
+            | yellow  | 1       |
+        Then I have <green> green cucumbers
+            \"\"\"
+            Doc string
+            \"\"\"
+
+        Examples:
+        | green |
+        | 5     |
+        | 6     |
+"""
+
+
+def _build_feature(feature_text: str):
+    gherkin_document = CucumberIOBaseParser(ast_builder=AstBuilder(id_generator=IdGenerator())).parse(feature_text)
+    gherkin_document["uri"] = "file:tables.feature"
+    pickles_data = PicklesCompiler(id_generator=IdGenerator()).compile(gherkin_document)
+    feature = Feature(  # type: ignore[call-arg]
+        gherkin_document=Feature.load_gherkin_document(gherkin_document),
+        uri=gherkin_document["uri"],
+        filename="tables.feature",
+        pickles=Feature.load_pickles(pickles_data),
+    )
+    return feature, pickles_data
+
+
+def test_data_tables_are_columnar():
+    feature, pickles_data = _build_feature(TABLE_FEATURE)
+    first_pickle, second_pickle = feature.pickles
+
+    table = first_pickle.steps[0].table
+    assert isinstance(table, Table)
+    assert list(table) == ["color", "count"]
+    assert table["color"] == ("green", "yellow")
+    assert table["count"] == ("5", "1")
+    assert dict(table) == {"color": ("green", "yellow"), "count": ("5", "1")}
+    assert list(table.rows) == [("green", "5"), ("yellow", "1")]
+    assert table.row_count == 2
+    # Placeholders are substituted per example; equal cell values are shared
+    assert second_pickle.steps[0].table["count"] == ("6", "1")
+    assert second_pickle.steps[0].table["color"][0] is table["color"][0]
+    assert first_pickle.steps[1].table is None
+
+    for pickle, pickle_data in zip(feature.pickles, pickles_data):
+        assert json.loads(pickle.to_message().model_dump_json(by_alias=True, exclude_none=True)) == pickle_data
+        assert CompactPickle.load(pickle.to_message()) == pickle
+
+
+def test_examples_tables_are_columnar():
+    feature, _ = _build_feature(TABLE_FEATURE)
+    for pickle in feature.pickles:
+        (examples_table,) = feature.get_pickle_examples_tables(pickle)
+        assert dict(examples_table) == {"green": ("5", "6")}
+
+
+def test_data_tables_with_not_unique_column_names():
+    table = Table.from_rows([("name", "name", "count"), ("green", "yellow", "1")])
+    assert table.duplicate_names == ("name",)
+    assert table["count"] == ("1",)
+    assert list(table.rows) == [("green", "yellow", "1")]
+    with raises(ValueError, match="not unique"):
+        table["name"]
+    with raises(ValueError, match="not unique column names 'name'"):
+        table.to_numpy()
+
+
+def test_data_tables_conversion_to_numpy():
+    numpy = importorskip("numpy")
+    feature, _ = _build_feature(TABLE_FEATURE)
+    array = feature.pickles[0].steps[0].table.to_numpy()
+    assert array.dtype.names == ("color", "count")
+    assert numpy.array_equal(array["color"], numpy.array(["green", "yellow"]))
+
+
+def test_data_tables_conversion_to_pandas():
+    importorskip("pandas")
+    feature, _ = _build_feature(TABLE_FEATURE)
+    data_frame = feature.pickles[0].steps[0].table.to_pandas()
+    assert list(data_frame.columns) == ["color", "count"]
+    assert data_frame["count"].tolist() == ["5", "1"]
+
+
+def test_data_tables_memory():
+    header = [f"column {index}" for index in range(5)]
+    feature_text = "Feature: Big table\n  Scenario: Big table\n    Given I have a big table\n" + "".join(
+        f"      | {' | '.join(row)} |\n"
+        for row in [header, *([f"{row_index}-{index}" for index in range(5)] for row_index in range(1000))]
+    )
+    _, (pickle_data,) = _build_feature(feature_text)
+    step_data = pickle_data["steps"][0]
+
+    def measure_memory(load):
+        tracemalloc.start()
+        try:
+            step = load(step_data)
+            memory, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert step is not None
+        return memory
+
+    compact_step_memory = measure_memory(CompactPickleStep.load)
+    pydantic_step_memory = measure_memory(PickleStep.model_validate)
+    assert compact_step_memory < pydantic_step_memory / 5
@@ -1,9 +1,15 @@
 import json
+import tracemalloc
 from pathlib import Path
 
+from gherkin.ast_builder import AstBuilder
+from gherkin.parser import Parser as CucumberIOBaseParser  # type: ignore[import]
+from gherkin.pickles.compiler import Compiler as PicklesCompiler
 from pytest import mark, param
 
 from messages import Pickle  # type:ignore[attr-defined]
+from pytest_bdd.model import CompactPickle, Feature
+from pytest_bdd.utils import IdGenerator
 
 test_data = Path(__file__).parent.parent.parent / "gherkin" / "testdata"
 
@@ -25,3 +31,73 @@ def test_simple_load_pickle(pickle_path: Path):
             dumped_pickle_data = json.loads(pickle.model_dump_json(by_alias=True, exclude_none=True))  # type: ignore[attr-defined] # migration to pydantic2
 
             assert pickle_data == dumped_pickle_data
+
+
+# language=gherkin
+OUTLINE_FEATURE = """\
+Feature: Compact pickles
+    Scenario Outline: Outline
+        Given I have <have> cucumbers
+        When I eat <eat> cucumbers
+        Then I have <left> cucumbers left
+            \"\"\"
+            Doc string
+            \"\"\"
+
+        Examples:
+        | have | eat | left |
+        | 5    | 1   | 4    |
+        | 5    | 1   | 4    |
+"""
+
+
+def _compile_pickles_data(feature_text: str, count: int = 1):
+    gherkin_document = CucumberIOBaseParser(ast_builder=AstBuilder(id_generator=IdGenerator())).parse(feature_text)
+    gherkin_document["uri"] = "file:compact.feature"
+    return gherkin_document, [
+        pickle_data
+        for _ in range(count)
+        for pickle_data in PicklesCompiler(id_generator=IdGenerator()).compile(gherkin_document)
+    ]
+
+
+def test_compact_pickles_are_converted_to_messages():
+    gherkin_document, pickles_data = _compile_pickles_data(OUTLINE_FEATURE)
+    feature = Feature(  # type: ignore[call-arg]
+        gherkin_document=Feature.load_gherkin_document(gherkin_document),
+        uri=gherkin_document["uri"],
+        filename="compact.feature",
+        pickles=Feature.load_pickles(pickles_data),
+    )
+    for pickle, pickle_data in zip(feature.pickles, pickles_data):
+        assert isinstance(pickle, CompactPickle)
+        assert json.loads(pickle.to_message().model_dump_json(by_alias=True, exclude_none=True)) == pickle_data
+        assert CompactPickle.load(pickle.to_message()) == pickle
+
+    first_pickle, second_pickle = feature.pickles
+    assert first_pickle.uri is second_pickle.uri
+    assert first_pickle.steps[0].text is second_pickle.steps[0].text
+    assert [(step.keyword, step.line_number) for step in first_pickle.steps] == [
+        ("Given", 3),
+        ("When", 4),
+        ("Then", 5),
+    ]
+    assert first_pickle.steps[2].doc_string.content == "Doc string"
+
+
+def test_compact_pickles_memory_per_item():
+    _, pickles_data = _compile_pickles_data(OUTLINE_FEATURE, count=500)
+
+    def measure_memory_per_pickle(load):
+        tracemalloc.start()
+        try:
+            pickles = [*map(load, pickles_data)]
+            memory, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(pickles) == len(pickles_data)
+        return memory / len(pickles)
+
+    compact_pickle_memory = measure_memory_per_pickle(CompactPickle.load)
+    pydantic_pickle_memory = measure_memory_per_pickle(Pickle.model_validate)
+    assert compact_pickle_memory < pydantic_pickle_memory / 2
@@ -0,0 +1,313 @@
+import gzip
+import json
+from base64 import b64decode
+from pathlib import Path
+
+import pytest
+
+from messages import Envelope as Message  # type:ignore[attr-defined]
+from messages import TestCaseStarted as _TestCaseStarted  # type:ignore[attr-defined]
+from messages import Timestamp  # type:ignore[attr-defined]
+from pytest_bdd.message_stream import MessagesFormat, detect_format, iter_messages, rehydrate, serialize_message
+
+samples_path = Path(__file__).parent.parent.parent / "compatibility-kit/devkit/samples"
+
+
+@pytest.fixture
+def attachment_testdir(testdir):
+    testdir.makeconftest(
+        # language=python
+        """\
+        from pytest_bdd import given
+
+        @given('Attach {size:d} bytes')
+        def attach_bytes(attach, size):
+            attach(bytes(range(256)) * (size // 256), media_type="image/png")
+        """
+    )
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        attachment="""
+        Feature: Attachment
+
+          Scenario: Add attachments
+            Given Attach 256 bytes
+            Given Attach 4096 bytes
+
+        """,
+    )
+    return testdir
+
+
+def test_gzip_messages_stream(attachment_testdir, tmp_path):
+    messages_path = tmp_path / "messages.ndjson.gz"
+    result = attachment_testdir.runpytest("--messages-ndjson", str(messages_path))
+    result.assert_outcomes(passed=1)
+
+    assert detect_format(messages_path) is MessagesFormat.GZIP
+    with gzip.open(messages_path, mode="rt", encoding="utf-8") as f:
+        messages = [json.loads(line) for line in f]
+    assert list(iter_messages(messages_path)) == messages
+    assert "testRunFinished" in messages[-1]
+
+
+def test_messages_format_is_explicit(attachment_testdir, tmp_path):
+    messages_path = tmp_path / "messages.ndjson"
+    result = attachment_testdir.runpytest("--messages-ndjson", str(messages_path), "--messages-format", "gzip")
+    result.assert_outcomes(passed=1)
+
+    assert detect_format(messages_path) is MessagesFormat.GZIP
+
+
+def test_zstd_messages_stream(attachment_testdir, tmp_path):
+    pytest.importorskip("zstandard")
+    messages_path = tmp_path / "messages.ndjson.zst"
+    result = attachment_testdir.runpytest("--messages-ndjson", str(messages_path))
+    result.assert_outcomes(passed=1)
+
+    assert detect_format(messages_path) is MessagesFormat.ZSTD
+    assert "testRunFinished" in list(iter_messages(messages_path))[-1]
+
+
+def test_compact_messages_profile_is_rehydrated(attachment_testdir, tmp_path):
+    compact_path = tmp_path / "compact.ndjson.gz"
+    result = attachment_testdir.runpytest(
+        "--messages-ndjson",
+        str(compact_path),
+        "--messages-profile",
+        "compact",
+        "--messages-attachment-threshold",
+        "1024",
+    )
+    result.assert_outcomes(passed=1)
+
+    compact_messages = list(iter_messages(compact_path, rehydrate=False))
+    (source,) = [message["source"] for message in compact_messages if "source" in message]
+    assert "data" not in source
+    assert source["dataReference"]["path"].endswith("attachment.feature")
+
+    small_attachment, big_attachment = [
+        message["attachment"] for message in compact_messages if "attachment" in message
+    ]
+    assert len(small_attachment["body"]) > 0 and "url" not in small_attachment
+    assert big_attachment["body"] == ""
+    attachment_path = tmp_path / big_attachment["url"]
+    assert attachment_path.suffix == ".png"
+    assert attachment_path.read_bytes() == bytes(range(256)) * 16
+
+    standard_path = tmp_path / "standard.ndjson"
+    rehydrate(compact_path, standard_path)
+    with standard_path.open(mode="r", encoding="utf-8") as f:
+        standard_messages = [json.loads(line) for line in f]
+
+    (source,) = [message["source"] for message in standard_messages if "source" in message]
+    assert "Scenario: Add attachments" in source["data"]
+    _, big_attachment = [message["attachment"] for message in standard_messages if "attachment" in message]
+    assert "url" not in big_attachment
+    assert len(big_attachment["body"]) > 1024
+
+
+def test_rehydration_fails_on_changed_source(attachment_testdir, tmp_path):
+    compact_path = tmp_path / "compact.ndjson"
+    result = attachment_testdir.runpytest("--messages-ndjson", str(compact_path), "--messages-profile", "compact")
+    result.assert_outcomes(passed=1)
+
+    attachment_testdir.makefile(".feature", attachment="Feature: Changed")
+    with pytest.raises(ValueError, match="was changed"):
+        list(iter_messages(compact_path))
+
+
+def assert_serialized_as_pydantic(message_json: str):
+    message = Message.model_validate(json.loads(message_json))
+    assert serialize_message(message) == message.model_dump_json(exclude_none=True, by_alias=True)
+
+
+@pytest.mark.parametrize(
+    "message_json_path",
+    sorted(samples_path.glob("*/*.ndjson")) or [pytest.param(None, marks=pytest.mark.skip("No compatibility kit"))],
+)
+def test_fast_path_serialization_of_compatibility_kit_samples(message_json_path):
+    with message_json_path.open(mode="r", encoding="utf-8") as f:
+        for message_json in f:
+            assert_serialized_as_pydantic(message_json)
+
+
+def test_fast_path_serialization_of_emitted_messages(testdir, tmp_path):
+    testdir.makeconftest(
+        # language=python
+        """\
+        from pytest_bdd import given
+
+        @given("passing step")
+        def passing():
+            ...
+
+        @given("failing step")
+        def failing():
+            assert False
+        """
+    )
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        steps="""
+        Feature: Steps
+
+          Scenario: Passing
+            Given passing step
+
+          Scenario: Failing
+            Given failing step
+        """,
+    )
+    messages_path = tmp_path / "messages.ndjson"
+    result = testdir.runpytest("--messages-ndjson", str(messages_path))
+    result.assert_outcomes(passed=1, failed=1)
+
+    with messages_path.open(mode="r", encoding="utf-8") as f:
+        message_jsons = f.read().splitlines()
+    assert {"testCaseStarted", "testCaseFinished", "testStepStarted", "testStepFinished"} <= {
+        next(iter(json.loads(message_json))) for message_json in message_jsons
+    }
+    for message_json in message_jsons:
+        assert_serialized_as_pydantic(message_json)
+        assert serialize_message(Message.model_validate(json.loads(message_json))) == message_json
+
+
+def test_fast_path_serialization_escapes_strings():
+    message = Message(
+        test_case_started=_TestCaseStarted(
+            attempt=1, id='"quoted" \\ \u00e9 \n \x01', test_case_id="0", timestamp=Timestamp(seconds=1, nanos=2)
+        )
+    )
+    assert serialize_message(message) == message.model_dump_json(exclude_none=True, by_alias=True)
+
+
+def test_big_attachments_are_streamed_into_attachments_dir(testdir, tmp_path):
+    testdir.makeconftest(
+        # language=python
+        """\
+        import io
+        from pathlib import Path
+
+        from pytest_bdd import given
+
+        @given("Attach files")
+        def attach_files(attach, tmp_path):
+            big_path = tmp_path / "capture.bin"
+            big_path.write_bytes(bytes(range(256)) * 64)
+            small_path = tmp_path / "small.txt"
+            small_path.write_text("small")
+
+            attach(big_path)
+            attach(small_path)
+            with big_path.open(mode="rb") as f:
+                attach(f, file_name="stream.bin")
+            attach(io.StringIO("é" * 10000))
+        """
+    )
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        attachment="""
+        Feature: Attachment
+
+          Scenario: Attach files
+            Given Attach files
+        """,
+    )
+    messages_path = tmp_path / "messages.ndjson"
+    attachments_path = tmp_path / "attachments"
+    result = testdir.runpytest(
+        "--messages-ndjson",
+        str(messages_path),
+        "--messages-attachment-threshold",
+        "4096",
+        "--messages-attachments-dir",
+        str(attachments_path),
+    )
+    result.assert_outcomes(passed=1)
+
+    path_attachment, small_attachment, stream_attachment, text_attachment = [
+        message["attachment"] for message in iter_messages(messages_path, rehydrate=False) if "attachment" in message
+    ]
+    assert path_attachment["fileName"] == "capture.bin"
+    assert path_attachment["mediaType"] == "application/octet-stream"
+    assert path_attachment["body"] == ""
+    assert path_attachment["url"].startswith("attachments/") and path_attachment["url"].endswith(".bin")
+    assert (tmp_path / path_attachment["url"]).read_bytes() == bytes(range(256)) * 64
+
+    assert small_attachment["mediaType"] == "text/plain"
+    assert small_attachment["body"] == "c21hbGw=" and "url" not in small_attachment
+
+    assert stream_attachment["fileName"] == "stream.bin"
+    assert (tmp_path / stream_attachment["url"]).read_bytes() == bytes(range(256)) * 64
+
+    assert text_attachment["contentEncoding"] == "IDENTITY"
+    assert (tmp_path / text_attachment["url"]).read_text(encoding="utf-8") == "é" * 10000
+
+    rehydrated_path = tmp_path / "rehydrated.ndjson"
+    rehydrate(messages_path, rehydrated_path)
+    with rehydrated_path.open(mode="r", encoding="utf-8") as f:
+        rehydrated_messages = [json.loads(line) for line in f]
+    path_attachment, _, stream_attachment, text_attachment = [
+        message["attachment"] for message in rehydrated_messages if "attachment" in message
+    ]
+    for attachment in (path_attachment, stream_attachment):
+        assert "url" not in attachment
+        assert b64decode(attachment["body"]) == bytes(range(256)) * 64
+    assert text_attachment["body"] == "é" * 10000
+    assert rehydrated_messages == list(iter_messages(messages_path))
+
+
+def test_attachments_are_complete_when_attached(testdir, tmp_path):
+    testdir.makeconftest(
+        # language=python
+        """\
+        import os
+
+        from pytest_bdd import given
+
+        def link(*args, **kwargs):
+            raise OSError("Hard links are not supported")
+
+        @given("Attach files")
+        def attach_files(attach, tmp_path, monkeypatch):
+            monkeypatch.setattr(os, "link", link)
+            big_path = tmp_path / "capture.bin"
+            big_path.write_bytes(bytes(range(256)) * 64)
+
+            attach(big_path)
+            # File is copied before the attach returns
+            big_path.unlink()
+            attach(bytearray(b"small"))
+
+        def pytest_bdd_message(config, message):
+            if message.attachment is not None:
+                print(f"attachment body: {message.attachment.body!r}")
+        """
+    )
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        attachment="""
+        Feature: Attachment
+
+          Scenario: Attach files
+            Given Attach files
+        """,
+    )
+    messages_path = tmp_path / "messages.ndjson"
+    result = testdir.runpytest("-s", "--messages-ndjson", str(messages_path), "--messages-attachment-threshold", "4096")
+    result.assert_outcomes(passed=1)
+    # Other hook implementations receive complete attachments
+    result.stdout.fnmatch_lines(["*attachment body: ''", "attachment body: 'c21hbGw='"])
+
+    path_attachment, bytes_attachment = [
+        message["attachment"] for message in iter_messages(messages_path, rehydrate=False) if "attachment" in message
+    ]
+    assert path_attachment["body"] == ""
+    assert (tmp_path / path_attachment["url"]).read_bytes() == bytes(range(256)) * 64
+    assert bytes_attachment["contentEncoding"] == "BASE64"
+    assert b64decode(bytes_attachment["body"]) == b"small"
@@ -587,3 +587,63 @@ def test_hook_type_messages(testdir, tmp_path):
 
     # after_tag hook
     assert any(map(lambda message: message.tag_expression == "tag" and message.name == "around", attachment_messages))
+
+
+def test_definition_messages_are_emitted_once_for_selected_items(testdir, tmp_path):
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        selected="""\
+            Feature: Selected feature
+                Scenario: First scenario
+                    Given Passing step
+
+                Scenario: Second scenario
+                    Given Passing step
+            """,
+    )
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        deselected="""\
+            Feature: Deselected feature
+                Scenario: Deselected scenario
+                    Given Passing step
+            """,
+    )
+    testdir.makeconftest(
+        # language=python
+        """\
+        from pytest_bdd import given
+
+        @given("Passing step")
+        def passing_step():
+            ...
+        """
+    )
+
+    ndjson_path = tmp_path / "selected.feature.ndjson"
+    result = testdir.runpytest("--messages-ndjson", str(ndjson_path), "-k", "not Deselected")
+    result.assert_outcomes(passed=2, deselected=1)
+
+    with ndjson_path.open(mode="r") as ndjson_file:
+        unfold_messages = parse_and_unflold_messages(ndjson_file.readlines())
+
+    assert [message.uri for message in list_filter_by_type(Source, unfold_messages)] == ["file:selected.feature"]
+    assert len(list_filter_by_type(GherkinDocument, unfold_messages)) == 1
+    assert len(list_filter_by_type(Pickle, unfold_messages)) == 2
+    assert len(list_filter_by_type(_TestCase, unfold_messages)) == 2
+
+    step_definition_messages = list_filter_by_type(StepDefinition, unfold_messages)
+    assert len({message.id for message in step_definition_messages}) == len(step_definition_messages)
+    assert [message.pattern.source for message in step_definition_messages].count("Passing step") == 1
+
+    # Definitions are emitted before the test run
+    test_run_started_index = next(
+        index for index, message in enumerate(unfold_messages) if isinstance(message, _TestRunStarted)
+    )
+    assert all(
+        index < test_run_started_index
+        for index, message in enumerate(unfold_messages)
+        if isinstance(message, (Source, GherkinDocument, Pickle, StepDefinition))
+    )
@@ -0,0 +1,148 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from textwrap import dedent
+
+from pytest_bdd.script.bdd_messages import SCHEMA, diff, index, index_messages
+
+FEATURE = dedent(
+    # language=gherkin
+    """\
+    Feature: Steps
+
+      Scenario: Passing
+        Given passing step
+        Then passing step
+
+      Scenario Outline: Outline
+        Given <result> step
+
+        Examples:
+          | result  |
+          | passing |
+          | {result} |
+    """
+)
+
+
+def run_and_index(testdir, tmp_path: Path, name: str, outline_result: str) -> Path:
+    testdir.makefile(".feature", steps=FEATURE.format(result=outline_result))
+    messages_path = tmp_path / f"{name}.ndjson.gz"
+    testdir.runpytest("--messages-ndjson", str(messages_path))
+    database_path = tmp_path / f"{name}.sqlite3"
+    index(database_path, [messages_path])
+    return database_path
+
+
+def test_index_and_diff_messages(testdir, tmp_path):
+    testdir.makeconftest(
+        # language=python
+        """\
+        from pytest_bdd import given, then
+
+        @given("passing step")
+        @then("passing step")
+        def passing(attach):
+            attach("passed")
+
+        @given("failing step")
+        def failing():
+            assert False
+        """
+    )
+    base_database_path = run_and_index(testdir, tmp_path, "base", "passing")
+    database_path = run_and_index(testdir, tmp_path, "current", "failing")
+
+    with closing(sqlite3.connect(str(database_path))) as connection:
+        statuses = connection.execute(
+            "SELECT line, position, step, status FROM step_results ORDER BY line, position"
+        ).fetchall()
+        attachments_count = connection.execute("SELECT COUNT(*) FROM attachments").fetchone()[0]
+    assert statuses == [
+        (3, 0, "passing step", "PASSED"),
+        (3, 1, "passing step", "PASSED"),
+        (12, 0, "passing step", "PASSED"),
+        (13, 0, "failing step", "FAILED"),
+    ]
+    assert attachments_count == 3
+
+    assert list(diff(base_database_path, database_path, min_duration=60)) == [
+        "status: file:steps.feature:13 Outline [1] failing step: PASSED -> FAILED"
+    ]
+    assert list(diff(base_database_path, base_database_path)) == []
+
+
+def build_messages(statuses):
+    """Messages of the single step scenario run once per given status, as retried attempts"""
+    yield {
+        "pickle": {
+            "id": "pickle",
+            "uri": "file:retried.feature",
+            "name": "Retried",
+            "steps": [{"id": "step", "text": "flaky step"}],
+        }
+    }
+    yield {
+        "testCase": {
+            "id": "test-case",
+            "pickleId": "pickle",
+            "testSteps": [{"id": "test-step", "pickleStepId": "step"}],
+        }
+    }
+    timestamp = {"seconds": 0}
+    for attempt, status in enumerate(statuses):
+        yield {
+            "testCaseStarted": {
+                "id": f"run-{attempt}",
+                "testCaseId": "test-case",
+                "attempt": attempt,
+                "timestamp": timestamp,
+            }
+        }
+        yield {
+            "testStepStarted": {
+                "testCaseStartedId": f"run-{attempt}",
+                "testStepId": "test-step",
+                "timestamp": timestamp,
+            }
+        }
+        yield {
+            "testStepFinished": {
+                "testCaseStartedId": f"run-{attempt}",
+                "testStepId": "test-step",
+                "timestamp": timestamp,
+                "testStepResult": {"status": status, "duration": timestamp},
+            }
+        }
+
+
+def index_statuses(database_path, statuses, attachments=()):
+    with closing(sqlite3.connect(str(database_path))) as connection:
+        connection.executescript(SCHEMA)
+        index_messages(connection, 1, [*build_messages(statuses), *attachments], base_path=database_path.parent)
+
+
+def test_diff_compares_latest_attempts(tmp_path):
+    index_statuses(tmp_path / "base.sqlite3", ["PASSED"])
+    index_statuses(tmp_path / "retried.sqlite3", ["FAILED", "PASSED"])
+    index_statuses(tmp_path / "failed.sqlite3", ["PASSED", "FAILED"])
+
+    assert list(diff(tmp_path / "base.sqlite3", tmp_path / "retried.sqlite3")) == []
+    assert list(diff(tmp_path / "base.sqlite3", tmp_path / "failed.sqlite3")) == [
+        "status: file:retried.feature:0 Retried [1] flaky step: PASSED -> FAILED"
+    ]
+
+
+def test_attachments_are_indexed_by_data_size(tmp_path):
+    (tmp_path / "stored.bin").write_bytes(b"12345")
+    attachments = [
+        {"attachment": {"body": "héllo", "contentEncoding": "IDENTITY", "mediaType": "text/plain"}},
+        {"attachment": {"body": "aGk=", "contentEncoding": "BASE64", "mediaType": "text/plain"}},
+        {"attachment": {"body": "", "contentEncoding": "BASE64", "mediaType": "image/png", "url": "stored.bin"}},
+    ]
+    database_path = tmp_path / "attachments.sqlite3"
+    index_statuses(database_path, ["PASSED"], attachments=[*attachments])
+
+    with closing(sqlite3.connect(str(database_path))) as connection:
+        sizes = [size for (size,) in connection.execute("SELECT size FROM attachments ORDER BY rowid")]
+    assert sizes == [6, 2, 5]
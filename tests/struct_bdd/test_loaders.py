@@ -0,0 +1,46 @@
+from pytest import mark
+
+from pytest_bdd.compatibility.struct_bdd import STRUCT_BDD_INSTALLED
+
+if STRUCT_BDD_INSTALLED:  # pragma: no cover
+    from pytest_bdd.struct_bdd.parser import StructBDDParser, get_loader, get_loader_backend
+else:  # pragma: no cover
+    from unittest.mock import Mock
+
+    StructBDDParser = Mock()  # type: ignore[misc] # just a stub
+
+pytestmark = [mark.skipif(not STRUCT_BDD_INSTALLED, reason="StructBDD is not installed")]
+
+
+def test_loaders_are_shared_between_parsers():
+    first_parser = StructBDDParser(kind=StructBDDParser.KIND.YAML.value)
+    second_parser = StructBDDParser(kind=StructBDDParser.KIND.YAML.value)
+
+    assert first_parser.loader is second_parser.loader
+    assert first_parser.loader is get_loader(StructBDDParser.KIND.YAML.value)
+
+
+def test_yaml_loader_prefers_libyaml():
+    import yaml
+
+    expected_backend = "libyaml" if yaml.__with_libyaml__ else "pyyaml"
+    assert get_loader_backend(StructBDDParser.KIND.YAML.value) == expected_backend
+
+
+def test_json_loader_accepts_stdlib_options():
+    loader = get_loader(StructBDDParser.KIND.JSON.value)
+
+    assert loader('{"Name": "Feature"}') == {"Name": "Feature"}
+    assert loader('{"Value": 1.5}', parse_float=str) == {"Value": "1.5"}
+
+
+def test_loader_backends_are_reported_in_header(testdir):
+    testdir.makepyfile(
+        # language=python
+        """\
+        def test_nothing():
+            ...
+        """
+    )
+    result = testdir.runpytest()
+    result.stdout.fnmatch_lines(["struct-bdd loaders: yaml=*, json=*"])
@@ -1,6 +1,13 @@
 import textwrap
+from types import ModuleType
 
+from pluggy import HookimplMarker, HookspecMarker, PluginManager
+from pytest import mark
 
+from pytest_bdd.runner import build_direct_hook_call
+
+
+@mark.usefixtures("hook_calls")
 def test_hooks(testdir):
     subdir = testdir.mkpydir("subdir")
     subdir.join("conftest.py").write(
@@ -64,3 +71,188 @@ def test_item_collection_does_not_break_on_non_function_items(testdir):
 
     result = testdir.runpytest()
     result.assert_outcomes(passed=1)
+
+
+def test_builtin_only_hooks_are_called_directly(testdir):
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        steps="""\
+            Feature: The feature
+                Scenario: Some scenario
+                    Given I have a bar
+            """,
+    )
+    testdir.makeconftest(
+        # language=python
+        """\
+        from pytest_bdd import given
+
+        @given("I have a bar")
+        def bar():
+            ...
+
+        def pytest_bdd_after_step(request, feature, scenario, step, step_func, step_func_args, step_definition):
+            print("\\npytest_bdd_after_step hook")
+
+        def pytest_sessionfinish(session):
+            plan = session.config.pluginmanager.getplugin("pytest_bdd_runner").execution_plan
+            print(f"\\ndirect hooks: {','.join(sorted(plan.direct_hook_names))}")
+        """
+    )
+
+    # Hook calls are monitored by in-process runs, so all of them are dispatched by pluggy there
+    result = testdir.runpytest_subprocess("-s")
+    result.assert_outcomes(passed=1)
+    assert result.stdout.lines.count("pytest_bdd_after_step hook") == 1
+
+    direct_hook_names = next(
+        line.partition(": ")[2] for line in result.stdout.lines if line.startswith("direct hooks: ")
+    ).split(",")
+    assert "pytest_bdd_run_step" in direct_hook_names
+    assert "pytest_bdd_get_step_caller" in direct_hook_names
+    assert "pytest_bdd_match_step_definition_to_step" in direct_hook_names
+    assert "pytest_bdd_after_step" not in direct_hook_names
+
+
+@mark.usefixtures("hook_calls")
+def test_hook_wrappers_are_dispatched_by_pluggy(testdir):
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        steps="""\
+            Feature: The feature
+                Scenario: Some scenario
+                    Given I have a bar
+            """,
+    )
+    testdir.makeconftest(
+        # language=python
+        """\
+        from pytest import hookimpl
+        from pytest_bdd import given
+
+        @given("I have a bar")
+        def bar():
+            ...
+
+        @hookimpl(hookwrapper=True)
+        def pytest_bdd_run_step(request, feature, scenario, step, previous_step):
+            print(f"\\nbefore {step.text}")
+            yield
+            print(f"\\nafter {step.text}")
+        """
+    )
+
+    result = testdir.runpytest("-s")
+    result.assert_outcomes(passed=1)
+    assert result.stdout.lines.count("before I have a bar") == 1
+    assert result.stdout.lines.count("after I have a bar") == 1
+
+
+def test_direct_hook_calls_are_ordered_as_by_pluggy():
+    hookspec, hookimpl = HookspecMarker("pytest"), HookimplMarker("pytest")
+
+    class HookSpecs:
+        @hookspec
+        def all_results(self, value):
+            ...
+
+        @hookspec(firstresult=True)
+        def first_result(self, value):
+            ...
+
+    plugin_manager = PluginManager("pytest")
+    plugin_manager.add_hookspecs(HookSpecs)
+    for name, opts in [("none", dict(tryfirst=True)), ("early", {}), ("late", {}), ("last", dict(trylast=True))]:
+        # Plugins are considered as built-in ones by names of their modules
+        plugin = ModuleType(f"pytest_bdd.{name}")
+        for hook_name in ("all_results", "first_result"):
+            setattr(
+                plugin,
+                hook_name,
+                hookimpl(**opts)(lambda value, name=name: None if name == "none" else f"{name} {value}"),
+            )
+        plugin_manager.register(plugin)
+
+    direct_all_results = build_direct_hook_call(plugin_manager.hook.all_results)
+    assert direct_all_results is not None
+    assert direct_all_results(value=1) == plugin_manager.hook.all_results(value=1) == ["late 1", "early 1", "last 1"]
+
+    direct_first_result = build_direct_hook_call(plugin_manager.hook.first_result)
+    assert direct_first_result is not None
+    assert direct_first_result(value=1) == plugin_manager.hook.first_result(value=1) == "late 1"
+
+
+def test_step_overhead_of_direct_hook_calls(testdir, record_property):
+    step_count = 200
+    testdir.makefile(
+        ".feature",
+        # language=gherkin
+        empty_steps=textwrap.dedent(
+            """\
+            Feature: Empty steps
+                Scenario Outline: Empty steps
+            {steps}
+                    Examples:
+                    | row |
+            {rows}
+            """
+        ).format(
+            steps="".join(" " * 8 + "Given empty step\n" for _ in range(step_count)),
+            rows="".join(f"        | {row} |\n" for row in range(10)),
+        ),
+    )
+    conftest = textwrap.dedent(
+        # language=python
+        """\
+        from pytest_bdd import given
+
+        @given("empty step")
+        def empty_step():
+            ...
+
+        def pytest_runtest_logreport(report):
+            if report.when == "call":
+                print(f"\\ncall duration: {report.duration}")
+
+        def pytest_sessionfinish(session):
+            plan = session.config.pluginmanager.getplugin("pytest_bdd_runner").execution_plan
+            print(f"\\ndirect hooks: {len(plan.direct_hook_names)}")
+        """
+    )
+
+    def get_step_overhead():
+        result = testdir.runpytest_subprocess("-s", "-p", "no:xdist")
+        result.assert_outcomes(passed=10)
+        direct_hook_count = next(
+            int(line.partition(": ")[2]) for line in result.stdout.lines if line.startswith("direct hooks: ")
+        )
+        durations = [
+            float(line.partition(": ")[2]) for line in result.stdout.lines if line.startswith("call duration: ")
+        ]
+        # The fastest scenario is the least disturbed by the environment
+        return direct_hook_count, min(durations) / step_count
+
+    testdir.makeconftest(conftest)
+    direct_hook_count, direct_step_overhead = get_step_overhead()
+    testdir.makeconftest(
+        conftest
+        # language=python
+        + textwrap.dedent(
+            """\
+
+            import pytest_bdd.runner
+
+            # All hooks are dispatched by pluggy, as if hook calls were monitored
+            pytest_bdd.runner.is_hook_call_monitored = lambda plugin_manager: True
+            """
+        )
+    )
+    dispatched_hook_count, dispatched_step_overhead = get_step_overhead()
+
+    # Timings are only recorded: they are too noisy on shared runners to be asserted
+    record_property("direct_step_overhead_us", round(direct_step_overhead * 1e6, 1))
+    record_property("dispatched_step_overhead_us", round(dispatched_step_overhead * 1e6, 1))
+    assert direct_hook_count > 0
+    assert dispatched_hook_count == 0
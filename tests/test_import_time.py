@@ -0,0 +1,48 @@
+"""Test plugin import time regressions."""
+import subprocess
+import sys
+
+LAZY_MODULES = [
+    "aiohttp",
+    "allure_commons",
+    "allure_pytest",
+    "ci_environment",
+    "filelock",
+    "mako",
+    "pathvalidate",
+    "pytest_bdd.struct_bdd.model",
+]
+
+
+def get_plugin_import_times():
+    """Import times of modules imported by the plugin on top of pytest, by ``python -X importtime``"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pytest; import pytest_bdd.plugin"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_time, module_name = map(str.strip, line[len("import time:") :].split("|"))
+        if module_name == "pytest":
+            # Modules imported by pytest itself are not a part of the plugin import
+            import_times.clear()
+        else:
+            import_times[module_name] = int(cumulative_time)
+    return import_times
+
+
+def test_plugin_imports_optional_dependencies_lazily(record_property):
+    import_times = get_plugin_import_times()
+    record_property("plugin_import_time_us", import_times["pytest_bdd.plugin"])
+
+    eagerly_imported_modules = [
+        module_name
+        for module_name in import_times
+        for lazy_module_name in LAZY_MODULES
+        if module_name == lazy_module_name or module_name.startswith(f"{lazy_module_name}.")
+    ]
+    assert not eagerly_imported_modules